@@ -0,0 +1,91 @@
+"""
+Benchmark Spec - a benchmark configuration sent inline with run_benchmark
+
+The same settings as a benchmark_config.sh file, as JSON, so the control
+path can send each run its own sweep instead of relying on the config file
+every agent was started with:
+
+{
+  "script": "./mlc_internal/mlc",           BENCHMARK_SCRIPT (required)
+  "cores": [1, 2, 4, 8],                     CORE_LIST (required)
+  "args": "--threads {CORES}",               SCRIPT_ARGS ({CORES}, {MACHINE})
+  "extraction": {                            EXTRACTION_METHOD and patterns (required)
+    "method": "regex",
+    "patterns": {"kpi": "KPI:[[:space:]]*([0-9.]+)"}
+  },
+  "timeout": 120,                            TEST_TIMEOUT (seconds, 0 = none)
+  "delay": 2,                                TEST_DELAY (seconds between steps)
+  "numactl": "--cpunodebind={NODE}",         NUMACTL_ARGS (USE_NUMACTL when set)
+  "numa_node": 0,                            NUMA_NODE
+  "fields": {"benchmark_type": "mlc"},       CUSTOM_FIELDS
+  "pre_exec": "...", "post_exec": "..."      PRE/POST_EXEC_COMMAND
+}
+
+Extraction methods: "regex" (patterns: {name: regex}), "grep" (patterns:
+{name: {"grep": regex, "field": N}}), "file" ("file": path with {CORES},
+"name": KPI name) and "json" (the benchmark prints the JSON itself).
+"""
+
+from typing import Dict
+
+METHODS = ('regex', 'grep', 'file', 'json')
+
+DEFAULTS = {
+    'args': '',
+    'timeout': 0,
+    'delay': 0,
+    'numactl': None,
+    'numa_node': 0,
+    'fields': {},
+    'pre_exec': '',
+    'post_exec': '',
+}
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise ValueError(message)
+
+
+def validate_spec(spec: Dict) -> Dict:
+    """Spec with defaults filled in; raises ValueError naming the bad field"""
+    _check(isinstance(spec, dict), "spec must be an object")
+    unknown = set(spec) - set(DEFAULTS) - {'script', 'cores', 'extraction'}
+    _check(not unknown, f"unknown spec fields: {', '.join(sorted(unknown))}")
+    spec = {**DEFAULTS, **spec}
+
+    _check(isinstance(spec.get('script'), str) and spec['script'], "spec.script is required")
+    cores = spec.get('cores')
+    _check(isinstance(cores, list) and cores and
+           all(isinstance(c, int) and not isinstance(c, bool) and c > 0 for c in cores),
+           "spec.cores must be a non-empty list of positive integers")
+    _check(isinstance(spec['args'], str), "spec.args must be a string")
+    for key in ('timeout', 'delay'):
+        _check(isinstance(spec[key], int) and not isinstance(spec[key], bool) and spec[key] >= 0,
+               f"spec.{key} must be a non-negative integer")
+    _check(isinstance(spec['numa_node'], int) and not isinstance(spec['numa_node'], bool),
+           "spec.numa_node must be an integer")
+    _check(spec['numactl'] is None or isinstance(spec['numactl'], str), "spec.numactl must be a string")
+    _check(isinstance(spec['fields'], dict), "spec.fields must be an object")
+    for key in ('pre_exec', 'post_exec'):
+        _check(isinstance(spec[key], str), f"spec.{key} must be a string")
+
+    extraction = spec.get('extraction')
+    _check(isinstance(extraction, dict) and extraction.get('method') in METHODS,
+           f"spec.extraction.method must be one of {', '.join(METHODS)}")
+    method = extraction['method']
+    if method in ('regex', 'grep'):
+        patterns = extraction.get('patterns')
+        _check(isinstance(patterns, dict) and patterns, "spec.extraction.patterns is required")
+        for name, pattern in patterns.items():
+            _check(name and ':' not in name, f"bad KPI name {name!r}")
+            if method == 'regex':
+                _check(isinstance(pattern, str), f"regex pattern for {name} must be a string")
+            else:
+                _check(isinstance(pattern, dict) and isinstance(pattern.get('grep'), str) and
+                       ':' not in pattern['grep'] and isinstance(pattern.get('field'), int),
+                       f"grep pattern for {name} must be {{\"grep\": regex without ':', \"field\": N}}")
+    elif method == 'file':
+        _check(isinstance(extraction.get('file'), str), "spec.extraction.file is required")
+    return spec
+
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Generic Benchmark Runner - Python port of generic_runner.sh
+
+Runs a benchmark script once per core count and extracts KPIs from its
+output while it runs: stdout/stderr are streamed in blocks of lines through
+precompiled extractors (regex, grep+field) that stop looking once they have
+their value, so a chatty benchmark never gets buffered and no process is
+forked per KPI. Regex patterns may span lines, as with bash's =~ on the
+whole output, as long as the match starts within the REGEX_CARRY_LINES lines
+before the block it ends in; "." does not match a newline. Results are
+proper JSON objects (values typed as in the bash runner: numeric-looking
+strings become numbers, everything else is escaped).
+
+Settings come from a benchmark spec (see benchmark_spec.py); a
+benchmark_config.sh file is read with load_config(), which sources it in
+one bash process and converts it to a spec.
+
+remote_agent.py imports GenericRunner; the module also works standalone:
+
+Usage: python3 generic_runner.py [config_file] [machine_id]
+Example: python3 generic_runner.py benchmark_config.sh server-02
+"""
+
+import asyncio
+import json
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from benchmark_spec import validate_spec
+
+# Prints each setting of a sourced config as NUL-separated "name value" or,
+# for arrays, "name count items...", so values may contain anything but NUL
+DUMP_CONFIG = r'''
+source "$1" >&2
+emit_array() { local name=$1; shift; printf '%s\0%s\0' "$name" "$#"; [ $# -eq 0 ] || printf '%s\0' "$@"; }
+for v in BENCHMARK_SCRIPT SCRIPT_ARGS EXTRACTION_METHOD TEST_DELAY TEST_TIMEOUT USE_NUMACTL \
+         NUMACTL_ARGS NUMA_NODE PRE_EXEC_COMMAND POST_EXEC_COMMAND KPI_FILE FILE_KPI_NAME; do
+    printf '%s\0%s\0' "$v" "${!v}"
+done
+emit_array CORE_LIST "${CORE_LIST[@]}"
+emit_array REGEX_PATTERNS "${REGEX_PATTERNS[@]}"
+emit_array GREP_AWK_PATTERNS "${GREP_AWK_PATTERNS[@]}"
+printf '%s\0%s\0' CUSTOM_FIELDS "$((${#CUSTOM_FIELDS[@]} * 2))"
+for k in "${!CUSTOM_FIELDS[@]}"; do printf '%s\0%s\0' "$k" "${CUSTOM_FIELDS[$k]}"; done
+'''
+ARRAYS = ('CORE_LIST', 'REGEX_PATTERNS', 'GREP_AWK_PATTERNS', 'CUSTOM_FIELDS')
+
+# POSIX bracket classes used in the bash (ERE) patterns, as Python regex
+POSIX_CLASSES = {
+    '[:space:]': r'\s', '[:digit:]': r'\d', '[:alpha:]': 'a-zA-Z', '[:alnum:]': 'a-zA-Z0-9',
+    '[:upper:]': 'A-Z', '[:lower:]': 'a-z', '[:blank:]': r' \t', '[:xdigit:]': '0-9A-Fa-f',
+}
+
+# Values matching this are emitted as JSON numbers (same test as the bash runner)
+NUMERIC = re.compile(r'^[0-9]+\.?[0-9]*$')
+
+READ_CHUNK = 65536
+
+# Lines of earlier output a regex match may start in (see RegexExtractor)
+REGEX_CARRY_LINES = 16
+
+
+class RunnerError(Exception):
+    pass
+
+
+def load_config(config_file: str) -> Dict:
+    """Read a benchmark_config.sh into a validated spec"""
+    if not os.path.isfile(config_file):
+        raise RunnerError(f"Config file not found: {config_file}")
+    result = subprocess.run(['bash', '-c', DUMP_CONFIG, 'load_config', config_file],
+                            capture_output=True)
+    if result.returncode != 0:
+        raise RunnerError(f"Could not source {config_file}: {result.stderr.decode().strip()}")
+
+    tokens = iter(result.stdout.decode().split('\0'))
+    settings = {}
+    for name in tokens:
+        if name in ARRAYS:
+            settings[name] = [next(tokens) for _ in range(int(next(tokens)))]
+        elif name:
+            settings[name] = next(tokens)
+
+    method = settings['EXTRACTION_METHOD']
+    extraction = {'method': 'grep' if method == 'awk' else method}
+    if method == 'regex':
+        extraction['patterns'] = dict(p.split(':', 1) for p in settings['REGEX_PATTERNS'])
+    elif method in ('grep', 'awk'):
+        extraction['patterns'] = {}
+        for p in settings['GREP_AWK_PATTERNS']:
+            name, grep, field = (p.split(':', 2) + ['', ''])[:3]
+            extraction['patterns'][name] = {'grep': grep, 'field': int(field or 0)}
+    elif method == 'file':
+        extraction['file'] = settings['KPI_FILE']
+        extraction['name'] = settings['FILE_KPI_NAME'] or 'kpi'
+
+    fields = settings['CUSTOM_FIELDS']
+    try:
+        return validate_spec({
+            'script': settings['BENCHMARK_SCRIPT'],
+            'cores': [int(c) for c in settings['CORE_LIST']],
+            'args': settings['SCRIPT_ARGS'],
+            'extraction': extraction,
+            'timeout': int(settings['TEST_TIMEOUT'] or 0),
+            'delay': int(settings['TEST_DELAY'] or 0),
+            'numactl': settings['NUMACTL_ARGS'] if settings['USE_NUMACTL'] == 'true' else None,
+            'numa_node': int(settings['NUMA_NODE'] or 0),
+            'fields': dict(zip(fields[::2], fields[1::2])),
+            'pre_exec': settings['PRE_EXEC_COMMAND'],
+            'post_exec': settings['POST_EXEC_COMMAND'],
+        })
+    except ValueError as e:
+        raise RunnerError(f"{config_file}: {e}")
+
+
+def compile_ere(pattern: str) -> re.Pattern:
+    """Compile a bash/grep -E pattern, translating POSIX bracket classes"""
+    for posix, python in POSIX_CLASSES.items():
+        pattern = pattern.replace(posix, python)
+    return re.compile(pattern, re.M)
+
+
+def typed(value):
+    """Number if the value looks numeric (as the bash runner decides), else the string"""
+    value = str(value)
+    if NUMERIC.match(value):
+        return float(value) if '.' in value else int(value)
+    return value
+
+
+# ==============================================================================
+# KPI EXTRACTORS: fed blocks of complete output lines (without the final
+# newline), done after the first match. Patterns are compiled with re.M, so
+# ^ and $ anchor at lines.
+# ==============================================================================
+
+class Extractor(ABC):
+    def __init__(self, name: str, pattern: str):
+        self.name = name
+        self.regex = compile_ere(pattern)
+        self.value = None
+
+    @abstractmethod
+    def feed(self, block: str):
+        """Look for the value in the next block of output"""
+
+    @abstractmethod
+    def result(self) -> str:
+        """The extracted value, or the bash runner's default when none was found"""
+
+
+class RegexExtractor(Extractor):
+    """First capture group of the first match.
+
+    Like bash's [[ $output =~ $pattern ]], a match may span lines (e.g. a
+    value printed on the line after its label): each block is searched
+    together with the last REGEX_CARRY_LINES lines of the previous ones.
+    """
+
+    def __init__(self, name: str, pattern: str):
+        super().__init__(name, pattern)
+        self.tail = None
+
+    def feed(self, block):
+        text = block if self.tail is None else self.tail + '\n' + block
+        match = self.regex.search(text)
+        if match:
+            self.value = match.group(1) if self.regex.groups else ""
+            return
+        lines = text.rsplit('\n', REGEX_CARRY_LINES)
+        self.tail = text if len(lines) <= REGEX_CARRY_LINES else '\n'.join(lines[1:])
+
+    def result(self):
+        return "0" if self.value is None else self.value
+
+
+class GrepFieldExtractor(Extractor):
+    """First line matching grep, whitespace-separated field N ($0 = whole line)"""
+
+    def __init__(self, name: str, grep: str, field: int):
+        super().__init__(name, grep)
+        self.field = field
+
+    def feed(self, block):
+        # Only split the block into lines when the pattern hits it somewhere
+        if not self.regex.search(block):
+            return
+        for line in block.split('\n'):
+            if self.regex.search(line):
+                if self.field == 0:
+                    self.value = line
+                else:
+                    fields = line.split()
+                    self.value = fields[self.field - 1] if self.field <= len(fields) else ""
+                return
+
+    def result(self):
+        return self.value or "0"
+
+
+def make_extractors(extraction: Dict):
+    patterns = extraction.get('patterns', {})
+    if extraction['method'] == 'regex':
+        return [RegexExtractor(name, pattern) for name, pattern in patterns.items()]
+    if extraction['method'] == 'grep':
+        return [GrepFieldExtractor(name, p['grep'], p['field']) for name, p in patterns.items()]
+    return []
+
+
+def log_stderr(message: str):
+    print(message, file=sys.stderr, flush=True)
+
+
+class GenericRunner:
+    """Runs one spec; iterate run() for one result per core count"""
+
+    def __init__(self, spec: Dict, machine_id: str, cwd: Optional[str] = None,
+                 cpus: Optional[set] = None, log: Callable[[str], None] = log_stderr):
+        self.spec = spec
+        self.machine_id = machine_id
+        self.cwd = cwd
+        self.cpus = cpus  # CPU set for everything the runner starts
+        self.log = log
+        self.step = None  # core count running now
+        self.process = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the running step (and its process group) and skip the rest"""
+        self.cancelled = True
+        if self.process and self.process.returncode is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _preexec(self):
+        if self.cpus:
+            os.sched_setaffinity(0, self.cpus)
+
+    async def _shell(self, command: str, cores: int):
+        """PRE/POST_EXEC_COMMAND; output goes to the log, failures are ignored"""
+        env = {**os.environ, 'MACHINE_ID': self.machine_id, 'CORES': str(cores), 'cores': str(cores)}
+        proc = await asyncio.create_subprocess_exec(
+            'bash', '-c', command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            cwd=self.cwd, env=env, preexec_fn=self._preexec)
+        output, _ = await proc.communicate()
+        for line in output.decode(errors='replace').splitlines():
+            self.log(line)
+
+    def _command(self, cores: int):
+        spec = self.spec
+        args = spec['args'].replace('{CORES}', str(cores)).replace('{MACHINE}', self.machine_id)
+        command = [spec['script'], *args.split()]
+        if spec['numactl']:
+            core_mask = ','.join(str(i) for i in range(cores))
+            numactl = (spec['numactl'].replace('{NODE}', str(spec['numa_node']))
+                       .replace('{CORES}', core_mask))
+            command = ['numactl', *numactl.split(), *command]
+        return command
+
+    async def _run_step(self, cores: int) -> Dict:
+        extraction = self.spec['extraction']
+        pending = make_extractors(extraction)
+        extractors = list(pending)
+        keep_output = extraction['method'] == 'json'
+        output = []
+
+        def feed(raw: bytes):
+            nonlocal pending
+            if not (pending or keep_output):
+                return
+            block = raw.decode(errors='replace')
+            if keep_output:
+                output.append(block)
+            for extractor in pending:
+                extractor.feed(block)
+            pending = [e for e in pending if e.value is None]
+
+        self.process = await asyncio.create_subprocess_exec(
+            *self._command(cores), stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            cwd=self.cwd, start_new_session=True, preexec_fn=self._preexec)
+
+        async def stream():
+            # Complete lines go to feed() a chunk at a time; a partial last line waits
+            buffer = b''
+            while True:
+                chunk = await self.process.stdout.read(READ_CHUNK)
+                if not chunk:
+                    break
+                buffer += chunk
+                end = buffer.rfind(b'\n')
+                if end >= 0:
+                    feed(buffer[:end])
+                    buffer = buffer[end + 1:]
+            if buffer:
+                feed(buffer)
+            return await self.process.wait()
+
+        try:
+            if self.spec['timeout'] > 0:
+                exit_code = await asyncio.wait_for(stream(), self.spec['timeout'])
+            else:
+                exit_code = await stream()
+        except asyncio.TimeoutError:
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            await self.process.wait()
+            exit_code = 124  # what timeout(1) reports
+        finally:
+            self.process = None
+
+        if exit_code != 0:
+            self.log(f"WARNING: Benchmark exited with code {exit_code}")
+            return {"machine": self.machine_id, "cores": cores, "error": f"exit_code_{exit_code}"}
+
+        result = {"machine": self.machine_id, "cores": cores}
+        if extraction['method'] == 'json':
+            try:
+                data = json.loads('\n'.join(output))
+                if isinstance(data, dict):
+                    return {**result, **data}
+            except ValueError:
+                pass
+        elif extraction['method'] == 'file':
+            kpi_file = extraction['file'].replace('{CORES}', str(cores))
+            name = extraction.get('name', 'kpi')
+            try:
+                with open(os.path.join(self.cwd or '', kpi_file)) as f:
+                    result[name] = int(round(float(f.read().split()[0])))
+            except FileNotFoundError:
+                self.log(f"WARNING: KPI file not found: {kpi_file}")
+                result[name] = 0
+            except (ValueError, IndexError):
+                result[name] = 0
+        for extractor in extractors:
+            result[extractor.name] = typed(extractor.result())
+        for key, value in self.spec['fields'].items():
+            result[key] = typed(value)
+        return result
+
+    async def run(self) -> AsyncIterator[Dict]:
+        spec = self.spec
+        script = os.path.join(self.cwd or '', spec['script'])
+        if not (os.path.isfile(script) and os.access(script, os.X_OK)):
+            raise RunnerError(f"Benchmark script not found or not executable: {spec['script']}")
+        if spec['numactl'] and not shutil.which('numactl'):
+            self.log("WARNING: numactl not found but numactl arguments are set")
+            spec = self.spec = {**spec, 'numactl': None}
+
+        self.log("===== Generic Benchmark Runner =====")
+        self.log(f"Machine: {self.machine_id}")
+        self.log(f"Script: {spec['script']}")
+        self.log(f"VMs: {' '.join(map(str, spec['cores']))}")
+        self.log("===================================")
+
+        for cores in spec['cores']:
+            if self.cancelled:
+                return
+            self.step = cores
+            self.log(f">>> Running benchmark with {cores} VMs")
+            if spec['pre_exec']:
+                await self._shell(spec['pre_exec'], cores)
+            result = await self._run_step(cores)
+            if spec['post_exec']:
+                await self._shell(spec['post_exec'], cores)
+            self.step = None
+            if self.cancelled:
+                return
+            yield result
+
+            # Delay between tests
+            if spec['delay'] > 0:
+                await asyncio.sleep(spec['delay'])
+
+        self.log("===== Benchmark Complete =====")
+
+
+def main():
+    config_file = sys.argv[1] if len(sys.argv) > 1 else "benchmark_config.sh"
+    machine_id = sys.argv[2] if len(sys.argv) > 2 else socket.gethostname()
+
+    async def run():
+        runner = GenericRunner(load_config(config_file), machine_id, cwd=os.getcwd())
+        async for result in runner.run():
+            print(json.dumps(result), flush=True)
+
+    try:
+        asyncio.run(run())
+    except RunnerError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
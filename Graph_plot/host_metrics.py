@@ -0,0 +1,156 @@
+"""
+Host Metrics - low-overhead sampler of host resource usage for remote_agent.py
+
+Keeps the /proc and sysfs files it needs open and re-reads them with pread()
+at offset 0 on every tick, so a sample costs a handful of syscalls and no
+open/close. Each sample is a flat dict of numbers (rates since the previous
+tick), which batches well in the struct wire encoding:
+
+  cpu_util, cpu<N>_util   busy % overall and per CPU         (/proc/stat)
+  softirq_pct             softirq share of all CPU time      (/proc/stat)
+  cpu<N>_mhz              current frequency per CPU          (cpufreq/scaling_cur_freq)
+  net_rx_pps, net_tx_pps  packets/s over all interfaces but lo (/proc/net/dev)
+  mem_bw_mbps             memory bandwidth, MB/s             (resctrl MBM, if mounted)
+
+Metrics whose source is missing on a host are left out.
+"""
+
+import asyncio
+import glob
+import os
+import re
+import time
+from typing import Callable, Dict, Optional
+
+CPUFREQ = "/sys/devices/system/cpu/cpu{}/cpufreq/scaling_cur_freq"
+RESCTRL_MBM = "/sys/fs/resctrl/mon_data/mon_L3_*/mbm_total_bytes"
+
+
+class ProcFile:
+    """A /proc or sysfs file kept open and re-read from the start with pread"""
+
+    def __init__(self, path: str, size: int = 16384):
+        self.path = path
+        self.size = size
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self) -> bytes:
+        while True:
+            data = os.pread(self.fd, self.size, 0)
+            if len(data) < self.size:
+                return data
+            self.size *= 2
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _open_optional(path: str) -> Optional[ProcFile]:
+    try:
+        return ProcFile(path)
+    except OSError:
+        return None
+
+
+class HostSampler:
+    def __init__(self, machine_id: str):
+        self.machine_id = machine_id
+        self.stat = ProcFile("/proc/stat")
+        self.net_dev = _open_optional("/proc/net/dev")
+        self.cpus = [int(m.group(1)) for m in re.finditer(rb"^cpu(\d+) ", self.stat.read(), re.M)]
+        self.freq = {cpu: f for cpu in self.cpus if (f := _open_optional(CPUFREQ.format(cpu)))}
+        self.mbm = [f for f in map(_open_optional, sorted(glob.glob(RESCTRL_MBM))) if f]
+        self.prev = None
+
+    def close(self):
+        for f in [self.stat, self.net_dev, *self.freq.values(), *self.mbm]:
+            if f:
+                f.close()
+
+    def _read_counters(self) -> Dict:
+        counters = {'t': time.monotonic(), 'cpu': {}}
+        for line in self.stat.read().split(b"\n"):
+            if not line.startswith(b"cpu"):
+                break
+            name, *fields = line.split()
+            values = [int(v) for v in fields[:8]]  # user nice system idle iowait irq softirq steal
+            counters['cpu'][name[3:].decode() or 'all'] = (
+                sum(values), values[3] + values[4], values[6])
+
+        if self.net_dev:
+            rx = tx = 0
+            for line in self.net_dev.read().split(b"\n")[2:]:
+                iface, _, stats = line.partition(b":")
+                if not stats or iface.strip() == b"lo":
+                    continue
+                fields = stats.split()
+                rx += int(fields[1])
+                tx += int(fields[9])
+            counters['net'] = (rx, tx)
+
+        mbm = 0
+        for f in self.mbm:
+            try:
+                mbm += int(f.read())
+            except (OSError, ValueError):  # "Unavailable" while the counter is unsupported
+                mbm = None
+                break
+        if self.mbm and mbm is not None:
+            counters['mbm'] = mbm
+        return counters
+
+    def sample(self, step=None) -> Optional[Dict]:
+        """Rates since the previous call (None on the first call)"""
+        counters = self._read_counters()
+        prev, self.prev = self.prev, counters
+        if prev is None:
+            return None
+        dt = counters['t'] - prev['t']
+        sample = {"machine": self.machine_id, "type": "host_metrics", "ts": time.time()}
+        if step is not None:
+            sample["step"] = step
+
+        for name, (total, idle, softirq) in counters['cpu'].items():
+            if name not in prev['cpu']:
+                continue
+            p_total, p_idle, p_softirq = prev['cpu'][name]
+            d_total = max(total - p_total, 1)
+            busy = 100.0 * (d_total - (idle - p_idle)) / d_total
+            if name == 'all':
+                sample["cpu_util"] = busy
+                sample["softirq_pct"] = 100.0 * (softirq - p_softirq) / d_total
+            else:
+                sample[f"cpu{name}_util"] = busy
+
+        for cpu, f in self.freq.items():
+            try:
+                sample[f"cpu{cpu}_mhz"] = int(f.read()) / 1000.0
+            except (OSError, ValueError):
+                pass
+
+        if 'net' in counters and 'net' in prev:
+            sample["net_rx_pps"] = (counters['net'][0] - prev['net'][0]) / dt
+            sample["net_tx_pps"] = (counters['net'][1] - prev['net'][1]) / dt
+        if 'mbm' in counters and 'mbm' in prev and counters['mbm'] >= prev['mbm']:
+            sample["mem_bw_mbps"] = (counters['mbm'] - prev['mbm']) / dt / 1e6
+        return sample
+
+    async def run(self, hz: float, emit: Callable, current_step: Callable):
+        """Sample every 1/hz seconds until cancelled; emit(sample) is awaited.
+
+        Ticks are scheduled on a fixed grid, so a slow emit skips ticks
+        instead of drifting.
+        """
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / hz
+        self.sample()
+        next_tick = loop.time() + interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            sample = self.sample(current_step())
+            if sample:
+                await emit(sample)
+            next_tick += interval
+            now = loop.time()
+            if next_tick < now:
+                next_tick += interval * ((now - next_tick) // interval + 1)
@@ -25,192 +25,435 @@ for var in proxy_vars:
 
 import asyncio
 import websockets
-import subprocess
+import itertools
 import json
 import socket
 import signal
+import time
+
+from benchmark_spec import validate_spec
+from generic_runner import GenericRunner, RunnerError, load_config
+from host_metrics import HostSampler
+from wire_protocol import encode_batch, supported_protocols
+
+# Data samples are batched into one binary frame per BATCH_INTERVAL seconds
+# (or BATCH_MAX_SAMPLES samples) once the server agreed on an encoding
+BATCH_MAX_SAMPLES = 256
+BATCH_INTERVAL = 0.1
+# Samples kept for the next connection while disconnected (oldest dropped first)
+OUTBOX_LIMIT = 100000
+# permessage-deflate on the agent connection: "deflate" or "none"
+COMPRESSION = os.environ.get("AGENT_COMPRESSION", "deflate")
+# Host metric samples per second while a benchmark runs (0 disables)
+SAMPLE_HZ = float(os.environ.get("AGENT_SAMPLE_HZ", "10"))
+# Jobs run at the same time; further run_benchmark commands wait in the queue
+MAX_JOBS = int(os.environ.get("AGENT_MAX_JOBS", "1"))
+# Finished jobs kept for progress reports
+JOB_HISTORY = 50
+
+
+def parse_cpus(spec):
+    """CPU list like "0-7,16,18" -> set of CPU ids (ValueError if malformed)"""
+    cpus = set()
+    try:
+        for part in str(spec).split(','):
+            first, _, last = part.strip().partition('-')
+            cpus.update(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise ValueError(f"bad CPU list: {spec!r}")
+    if not cpus:
+        raise ValueError(f"empty CPU list: {spec!r}")
+    return cpus
+
+
+class Job:
+    """One benchmark sweep requested by a run_benchmark command"""
+
+    def __init__(self, job_id, config_file, run_id=None, cpus=None, spec=None):
+        self.job_id = job_id
+        self.config_file = config_file
+        self.spec = spec  # inline benchmark spec, used instead of config_file
+        self.run_id = run_id
+        self.cpus = cpus  # CPU list as given, e.g. "0-15"
+        self.status = "queued"  # queued, running, done, failed, cancelled
+        self.runner = None  # GenericRunner once started
+        self.steps_done = 0
+        self.data_sent = 0
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def step(self):
+        """Core count of the step running now"""
+        return self.runner.step if self.runner else None
+
+    def info(self):
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "run_id": self.run_id,
+            "config": "(spec)" if self.spec else self.config_file,
+            "script": self.spec['script'] if self.spec else None,
+            "cpus": self.cpus,
+            "step": self.step,
+            "steps_done": self.steps_done,
+            "data_sent": self.data_sent,
+            "elapsed": round((self.finished or time.time()) - (self.started or self.submitted), 1)
+        }
+
 
 class RemoteAgent:
-    def __init__(self, server_url, machine_id, config_file="benchmark_config.sh"):
+    def __init__(self, server_url, machine_id, config_file="benchmark_config.sh", max_jobs=MAX_JOBS):
         self.server_url = server_url
         self.machine_id = machine_id
         self.config_file = config_file
+        self.max_jobs = max_jobs
         self.running = True
-        self.current_process = None
+        self.websocket = None
+        # Data encoding agreed with the server; "json" until it answers the register
+        self.protocol = "json"
+        self.outbox = []
+        # Jobs by id in submission order; the queue feeds max_jobs workers
+        self.jobs = {}
+        self.job_queue = None
+        self.job_ids = itertools.count(1)
+        self.workers = []
+        self.sampler_task = None
         # Get the directory where this script is located
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
         print(f"[DEBUG] Script directory: {self.script_dir}")
-        
-    async def run_mlc_benchmark(self, websocket):
-        """Run MLC benchmark and stream results"""
-        print(f"[AGENT] Starting benchmark with config: {self.config_file}")
-        
+
+    # ---------------------------------------------------------
+    # Sending: data samples are batched, events go out right away
+    # ---------------------------------------------------------
+    async def send_sample(self, data):
+        """Send one data sample, batched unless the server only speaks JSON.
+
+        Samples that can't be sent are kept and go out after reconnecting.
+        """
+        if self.protocol == "json" and self.websocket:
+            try:
+                await self.websocket.send(json.dumps(data))
+                return
+            except websockets.exceptions.ConnectionClosed:
+                pass
+        self.outbox.append(data)
+        if len(self.outbox) > OUTBOX_LIMIT:
+            del self.outbox[:len(self.outbox) - OUTBOX_LIMIT]
+        if len(self.outbox) >= BATCH_MAX_SAMPLES and self.protocol != "json":
+            await self.flush()
+
+    async def flush(self):
+        """Send the kept samples (binary frames, or one JSON message each)"""
+        if not self.websocket or not self.outbox:
+            return
+        samples, self.outbox = self.outbox, []
+        try:
+            if self.protocol == "json":
+                for sample in samples:
+                    await self.websocket.send(json.dumps(sample))
+            else:
+                for frame in encode_batch(samples, self.protocol):
+                    await self.websocket.send(frame)
+        except websockets.exceptions.ConnectionClosed:
+            self.outbox = samples + self.outbox
+
+    async def flush_periodically(self):
+        while True:
+            await asyncio.sleep(BATCH_INTERVAL)
+            await self.flush()
+
+    async def send_event(self, event):
+        """Send a control message (job events, status, pong); dropped while disconnected"""
+        if not self.websocket:
+            return
+        try:
+            await self.websocket.send(json.dumps({"machine": self.machine_id, **event}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    # ---------------------------------------------------------
+    # Host metrics: one sampler while any job runs
+    # ---------------------------------------------------------
+    def running_jobs(self):
+        return [job for job in self.jobs.values() if job.status == "running"]
+
+    def sole_job(self):
+        """The running job when exactly one runs (metrics are tagged with it)"""
+        running = self.running_jobs()
+        return running[0] if len(running) == 1 else None
+
+    def current_step(self):
+        job = self.sole_job()
+        return job.step if job else None
+
+    async def send_metrics(self, sample):
+        job = self.sole_job()
+        if job:
+            sample["job_id"] = job.job_id
+            if job.run_id:
+                sample["run_id"] = job.run_id
+        await self.send_sample(sample)
+
+    def start_sampler(self):
+        """Sample host metrics at SAMPLE_HZ until the returned task is cancelled"""
+        if SAMPLE_HZ <= 0:
+            return None
+        try:
+            sampler = HostSampler(self.machine_id)
+        except OSError as e:
+            print(f"[ERROR] Host metrics unavailable: {e}")
+            return None
+
+        async def sample_loop():
+            try:
+                await sampler.run(SAMPLE_HZ, self.send_metrics, self.current_step)
+            finally:
+                sampler.close()
+
+        return asyncio.create_task(sample_loop())
+
+    # ---------------------------------------------------------
+    # Jobs: queued by commands, run by max_jobs workers
+    # ---------------------------------------------------------
+    async def submit(self, command):
+        """Queue a run_benchmark command as a job"""
+        job_id = str(command.get('job_id') or f"{self.machine_id}-{next(self.job_ids)}")
+        cpus = command.get('cpus')
+        spec = command.get('spec')
+        try:
+            if job_id in self.jobs:
+                raise ValueError(f"duplicate job id {job_id}")
+            if cpus is not None:
+                parse_cpus(cpus)
+            if spec is not None:
+                spec = validate_spec(spec)
+        except ValueError as e:
+            print(f"[ERROR] Job {job_id} rejected: {e}")
+            await self.send_event({"type": "job_rejected", "job_id": job_id, "error": str(e)})
+            return
+
+        job = Job(job_id, command.get('config') or self.config_file, command.get('run_id'), cpus, spec)
+        self.jobs[job_id] = job
+        await self.job_queue.put(job)
+        position = sum(1 for j in self.jobs.values() if j.status == "queued")
+        print(f"[AGENT] Job {job_id} queued (position {position})")
+        await self.send_event({"type": "job_queued", "job_id": job_id, "position": position})
+
+    async def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if not job or job.status not in ("queued", "running"):
+            await self.send_event({"type": "job_rejected", "job_id": job_id,
+                                   "error": "no such queued or running job"})
+            return
+        if job.runner:
+            # Stops the running step's whole process group and skips the rest
+            job.runner.cancel()
+        job.status = "cancelled"
+        job.finished = time.time()
+        print(f"[AGENT] Job {job_id} cancelled")
+        await self.send_event({"type": "job_cancelled", "job_id": job_id})
+
+    def progress(self):
+        queued = [job for job in self.jobs.values() if job.status == "queued"]
+        jobs = []
+        for job in self.jobs.values():
+            info = job.info()
+            if job in queued:
+                info["position"] = queued.index(job) + 1
+            jobs.append(info)
+        return {"type": "progress", "jobs": jobs}
+
+    def prune_jobs(self):
+        finished = [job_id for job_id, job in self.jobs.items()
+                    if job.status not in ("queued", "running")]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    async def worker(self):
+        while True:
+            job = await self.job_queue.get()
+            if job.status != "queued":  # cancelled while waiting
+                continue
+            try:
+                await self.run_job(job)
+            finally:
+                self.prune_jobs()
+
+    async def run_job(self, job):
+        """Run a job's sweep with the in-process runner and stream its results"""
+        print(f"[AGENT] Starting job {job.job_id} with config: {'(spec)' if job.spec else job.config_file}")
+        if not self.running_jobs():
+            self.sampler_task = self.start_sampler()
+        job.status = "running"
+        job.started = time.time()
+        await self.send_event({"type": "job_started", "job_id": job.job_id})
+        error = None
+
         try:
-            # Build absolute paths for the script and config
-            runner_script = os.path.join(self.script_dir, 'generic_runner.sh')
-            
-            # If config is relative, make it absolute relative to script dir
-            if not os.path.isabs(self.config_file):
-                config_path = os.path.join(self.script_dir, self.config_file)
+            # An inline spec is used as is; a config file (relative to the
+            # script dir) is read into one
+            if job.spec:
+                spec = job.spec
             else:
-                config_path = self.config_file
-            
-            print(f"[DEBUG] Runner: {runner_script}")
-            print(f"[DEBUG] Config: {config_path}")
+                if not os.path.isabs(job.config_file):
+                    config_path = os.path.join(self.script_dir, job.config_file)
+                else:
+                    config_path = job.config_file
+                print(f"[DEBUG] Config: {config_path}")
+                spec = await asyncio.to_thread(load_config, config_path)
             print(f"[DEBUG] Working directory: {self.script_dir}")
-            
-            # Run the generic runner with the config, using script directory as cwd
-            self.current_process = await asyncio.create_subprocess_exec(
-                runner_script, config_path, self.machine_id,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                cwd=self.script_dir
-            )
-            
-            # Read stderr in background
-            async def read_stderr():
+
+            # Restrict the job (and everything it starts) to its CPU set
+            cpus = parse_cpus(job.cpus) if job.cpus is not None else None
+            job.runner = GenericRunner(spec, self.machine_id, cwd=self.script_dir, cpus=cpus,
+                                       log=lambda message: print(f"[DEBUG] [{job.job_id}] {message}"))
+            if job.status == "cancelled":  # cancelled while loading the config
+                job.runner.cancel()
+
+            # Stream results to dashboard, one per core count
+            async for data in job.runner.run():
+                data["job_id"] = job.job_id
+                if job.run_id:
+                    data["run_id"] = job.run_id
                 try:
-                    if self.current_process and self.current_process.stderr:
-                        while True:
-                            line = await self.current_process.stderr.readline()
-                            if not line:
-                                break
-                            print(f"[DEBUG] {line.decode().strip()}")
+                    await self.send_sample(data)
                 except Exception as e:
-                    print(f"[DEBUG] stderr reader error: {e}")
-            
-            stderr_task = asyncio.create_task(read_stderr())
-            
-            # Stream output to dashboard
-            data_sent = 0
-            while True:
-                line = await self.current_process.stdout.readline()
-                if not line:
-                    break
-                    
-                text = line.decode().strip()
-                
-                # Only send JSON lines
-                if text.startswith('{') and text.endswith('}'):
-                    try:
-                        data = json.loads(text)
-                        # Try to send data, catch if connection is closed
-                        await websocket.send(json.dumps(data))
-                        data_sent += 1
-                        vms = data.get('cores', data.get('vms', '?'))
-                        rps = data.get('requests', data.get('bandwidth', data.get('kpi', 0)))
-                        # ANSI color codes: Cyan for VMs, Green for RPS
-                        print(f"[AGENT] Sent data point {data_sent}: \033[96mVMs={vms}\033[0m, \033[92mRPS={rps}\033[0m")
-                    except json.JSONDecodeError as e:
-                        print(f"[ERROR] JSON decode error: {e}")
-                    except (websockets.exceptions.ConnectionClosed, ConnectionError) as e:
-                        print(f"[ERROR] Connection closed while sending data: {e}")
-                        break
-                    except Exception as e:
-                        print(f"[ERROR] Failed to send data: {e}")
-                        # Continue trying for other errors
-                        
-            await self.current_process.wait()
-            await stderr_task
-            
-            print(f"[AGENT] Benchmark complete! Exit code: {self.current_process.returncode}, Data points sent: {data_sent}")
-            
-            # Small delay to ensure all data is transmitted
-            await asyncio.sleep(0.5)
-            
+                    print(f"[ERROR] Failed to send data: {e}")
+                job.data_sent += 1
+                job.steps_done += 1
+                vms = data.get('cores', data.get('vms', '?'))
+                rps = data.get('requests', data.get('bandwidth', data.get('kpi', 0)))
+                # ANSI color codes: Cyan for VMs, Green for RPS
+                print(f"[AGENT] [{job.job_id}] Sent data point {job.data_sent}: \033[96mVMs={vms}\033[0m, \033[92mRPS={rps}\033[0m")
+
+            print(f"[AGENT] Job {job.job_id} complete! Data points sent: {job.data_sent}")
+
+        except RunnerError as e:
+            print(f"[ERROR] {e}")
+            error = str(e)
         except Exception as e:
             print(f"[ERROR] Benchmark execution error: {e}")
             import traceback
             traceback.print_exc()
-            await websocket.send(json.dumps({
-                "machine": self.machine_id,
-                "status": "error",
-                "error": str(e)
-            }))
+            error = str(e)
         finally:
-            self.current_process = None
-    
-    async def handle_command(self, command, websocket):
-        """Handle commands from dashboard server"""
+            if job.status == "running":
+                job.status = "failed" if error else "done"
+                job.finished = time.time()
+            if not self.running_jobs() and self.sampler_task:
+                self.sampler_task.cancel()
+                self.sampler_task = None
+            await self.flush()
+            event = {"type": "job_finished", "job_id": job.job_id, "status": job.status,
+                     "steps_done": job.steps_done, "data_sent": job.data_sent}
+            if error:
+                event["error"] = error
+            await self.send_event(event)
+
+    async def handle_command(self, command):
+        """Handle commands from dashboard server (never waits for a benchmark)"""
         cmd_type = command.get('command')
-        
-        if cmd_type == 'run_benchmark':
+
+        if command.get('type') == 'registered':
+            self.protocol = command.get('protocol', 'json')
+            print(f"[AGENT] Data protocol: {self.protocol}")
+
+        elif cmd_type == 'run_benchmark':
             print(f"[AGENT] Received run_benchmark command")
-            await self.run_mlc_benchmark(websocket)
-            
+            await self.submit(command)
+
+        elif cmd_type == 'cancel':
+            await self.cancel(str(command.get('job_id')))
+
+        elif cmd_type == 'progress':
+            await self.send_event(self.progress())
+
         elif cmd_type == 'status':
-            status = {
-                "machine": self.machine_id,
-                "status": "busy" if self.current_process else "idle",
-                "type": "status_response"
-            }
-            await websocket.send(json.dumps(status))
-            print(f"[AGENT] Status: {'busy' if self.current_process else 'idle'}")
-            
+            running = len(self.running_jobs())
+            queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+            await self.send_event({
+                "status": "busy" if running else "idle",
+                "type": "status_response",
+                "running": running,
+                "queued": queued
+            })
+            print(f"[AGENT] Status: {'busy' if running else 'idle'} ({running} running, {queued} queued)")
+
         elif cmd_type == 'ping':
-            await websocket.send(json.dumps({
-                "machine": self.machine_id,
-                "type": "pong"
-            }))
-            
+            await self.send_event({"type": "pong"})
+
         else:
             print(f"[AGENT] Unknown command: {cmd_type}")
-    
+
     async def connect_and_listen(self):
         """Connect to dashboard and listen for commands"""
         uri = f"ws://{self.server_url}/ws/agent"
         retry_delay = 5
-        
+
+        # Job workers outlive connections: a job keeps running across reconnects
+        self.job_queue = asyncio.Queue()
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.max_jobs)]
+
         while self.running:
             try:
                 print(f"[AGENT] Connecting to dashboard at {uri}...")
-                
-                async with websockets.connect(uri) as websocket:
-                    # Register with server
+
+                compression = None if COMPRESSION == "none" else COMPRESSION
+                async with websockets.connect(uri, compression=compression) as websocket:
+                    # Register with server, offering the batched encodings we support;
+                    # servers that don't answer with "registered" get plain JSON
+                    self.protocol = "json"
                     await websocket.send(json.dumps({
                         "type": "register",
                         "machine": self.machine_id,
-                        "hostname": socket.gethostname()
+                        "hostname": socket.gethostname(),
+                        "protocols": supported_protocols()
                     }))
+                    self.websocket = websocket
                     print(f"[AGENT] Connected and registered as '{self.machine_id}'")
-                    
-                    # Listen for commands
-                    while self.running:
-                        try:
-                            message = await asyncio.wait_for(websocket.recv(), timeout=30.0)
-                            command = json.loads(message)
-                            await self.handle_command(command, websocket)
-                            
-                        except asyncio.TimeoutError:
-                            # Send heartbeat
-                            await websocket.send(json.dumps({
-                                "machine": self.machine_id,
-                                "type": "heartbeat"
-                            }))
-                            
-                        except websockets.exceptions.ConnectionClosed:
-                            print("[AGENT] Connection closed by server")
-                            break
-                            
+                    flusher = asyncio.create_task(self.flush_periodically())
+
+                    try:
+                        # Listen for commands
+                        while self.running:
+                            try:
+                                message = await asyncio.wait_for(websocket.recv(), timeout=30.0)
+                                command = json.loads(message)
+                                await self.handle_command(command)
+
+                            except asyncio.TimeoutError:
+                                # Send heartbeat
+                                await websocket.send(json.dumps({
+                                    "machine": self.machine_id,
+                                    "type": "heartbeat"
+                                }))
+
+                            except websockets.exceptions.ConnectionClosed:
+                                print("[AGENT] Connection closed by server")
+                                break
+                    finally:
+                        self.websocket = None
+                        flusher.cancel()
+
             except websockets.exceptions.WebSocketException as e:
                 print(f"[ERROR] WebSocket error: {e}")
                 print(f"[AGENT] Retrying in {retry_delay} seconds...")
                 await asyncio.sleep(retry_delay)
-                
+
             except Exception as e:
                 print(f"[ERROR] Unexpected error: {e}")
                 print(f"[AGENT] Retrying in {retry_delay} seconds...")
                 await asyncio.sleep(retry_delay)
-    
+
     def shutdown(self):
         """Graceful shutdown"""
         print("\n[AGENT] Shutting down...")
         self.running = False
-        if self.current_process:
-            try:
-                self.current_process.terminate()
-            except:
-                pass
+        for job in self.running_jobs():
+            if job.runner:
+                job.runner.cancel()
 
 def main():
     if len(sys.argv) < 2:
@@ -0,0 +1,180 @@
+"""
+Run Store - durable, append-only history of benchmark results for server.py
+
+Every data message an agent streams is appended to a SQLite database in WAL
+mode, keyed by run, machine and cores. Writes are queued and committed in
+batches by a background thread, so the server's event loop never waits on
+disk; reads open their own connection (WAL lets them run next to the writer)
+and are meant to be called through asyncio.to_thread().
+"""
+
+import json
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Rows committed per transaction at most, and the longest a row waits
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id   TEXT PRIMARY KEY,
+    label    TEXT,
+    started  REAL NOT NULL,
+    machines TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    id      INTEGER PRIMARY KEY,
+    run_id  TEXT NOT NULL,
+    machine TEXT NOT NULL,
+    cores,
+    ts      REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_run_machine_cores ON samples (run_id, machine, cores);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+"""
+
+_STOP = object()
+
+
+class RunStore:
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---------------------------------------------------------
+    # Writes: enqueue only, committed in batches by the writer thread
+    # ---------------------------------------------------------
+    def start(self):
+        self._thread = threading.Thread(target=self._writer, name="run-store-writer", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Flush everything queued and stop the writer"""
+        if self._thread:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def new_run(self, machines: List[str], label: Optional[str] = None) -> str:
+        started = time.time()
+        run_id = "run-" + datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S-%f")
+        self._queue.put(("INSERT INTO runs (run_id, label, started, machines) VALUES (?, ?, ?, ?)",
+                         (run_id, label, started, json.dumps(sorted(machines)))))
+        return run_id
+
+    def append(self, run_id: str, machine: str, message: dict):
+        # Host metric samples are filed under the step (core count) they were taken in
+        cores = message.get('cores', message.get('vms', message.get('step')))
+        self._queue.put(("INSERT INTO samples (run_id, machine, cores, ts, payload) VALUES (?, ?, ?, ?, ?)",
+                         (run_id, machine, cores, time.time(), json.dumps(message))))
+
+    def _writer(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                with conn:
+                    for sql, params in batch:
+                        conn.execute(sql, params)
+            except sqlite3.Error as e:
+                print(f"[ERROR] Run store write failed ({len(batch)} rows lost): {e}")
+        conn.close()
+
+    # ---------------------------------------------------------
+    # Reads: blocking, call via asyncio.to_thread()
+    # ---------------------------------------------------------
+    def runs(self, machine: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Most recent runs first, with sample counts and last sample time"""
+        sql = ("SELECT r.run_id, r.label, r.started, r.machines, COUNT(s.id) AS samples, "
+               "MAX(s.ts) AS last_sample FROM runs r LEFT JOIN samples s ON s.run_id = r.run_id")
+        params: list = []
+        if machine:
+            sql += " WHERE r.run_id IN (SELECT DISTINCT run_id FROM samples WHERE machine = ?)"
+            params.append(machine)
+        sql += " GROUP BY r.run_id ORDER BY r.started DESC LIMIT ?"
+        params.append(limit)
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        return [{**dict(row), 'machines': json.loads(row['machines'])} for row in rows]
+
+    def samples(self, run_id: str, machine: Optional[str] = None, cores=None) -> List[Dict]:
+        """All samples of a run in arrival order, optionally for one machine / core count"""
+        sql = "SELECT machine, cores, ts, payload FROM samples WHERE run_id = ?"
+        params: list = [run_id]
+        if machine:
+            sql += " AND machine = ?"
+            params.append(machine)
+        if cores is not None:
+            sql += " AND cores = ?"
+            params.append(cores)
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql + " ORDER BY id", params).fetchall()
+        finally:
+            conn.close()
+        return [{'machine': row['machine'], 'cores': row['cores'], 'ts': row['ts'],
+                 'data': json.loads(row['payload'])} for row in rows]
+
+    def latest(self, run_ids: List[str]) -> List[Dict]:
+        """Latest data message (host metrics excluded) per (run, machine, cores), in arrival order"""
+        if not run_ids:
+            return []
+        marks = ",".join("?" * len(run_ids))
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT run_id, payload FROM samples WHERE id IN (SELECT MAX(id) FROM samples "
+                f"WHERE run_id IN ({marks}) AND json_extract(payload, '$.type') IS NOT 'host_metrics' "
+                f"GROUP BY run_id, machine, cores) ORDER BY id",
+                run_ids).fetchall()
+        finally:
+            conn.close()
+        return [{'run_id': row['run_id'], 'data': json.loads(row['payload'])} for row in rows]
+
+    def latest_run_ids(self) -> Dict[str, str]:
+        """{machine: run_id} of each machine's most recent run with data"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT s.machine, s.run_id FROM samples s JOIN "
+                "(SELECT machine, MAX(id) AS id FROM samples GROUP BY machine) m ON s.id = m.id"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row['machine']: row['run_id'] for row in rows}
@@ -1,13 +1,35 @@
 import asyncio
+import datetime
 import json
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
-from typing import Dict, Set
+from typing import Dict, List, Optional, Tuple
 
-app = FastAPI()
+from benchmark_spec import validate_spec
+from run_store import RunStore
+from wire_protocol import choose_protocol, decode_frame
+
+# SQLite file holding every run (override with the RUN_STORE environment variable)
+RUN_STORE_PATH = os.environ.get("RUN_STORE", "runs.db")
+store = RunStore(RUN_STORE_PATH)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    store.start()
+    # Dashboards opened after a restart still see each machine's last run
+    latest = await asyncio.to_thread(store.latest_run_ids)
+    for record in await asyncio.to_thread(store.latest, sorted(set(latest.values()))):
+        remember_point(record['data'].get('machine', ''), record['data'])
+    yield
+    store.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for all origins (adjust in production)
 app.add_middleware(
@@ -18,10 +40,120 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Messages buffered per dashboard viewer before the oldest are dropped
+VIEWER_QUEUE_SIZE = 256
+# Seconds a single send may take before the viewer is considered stalled
+VIEWER_SEND_TIMEOUT = 10.0
+
+
+class Viewer:
+    """One dashboard connection: a bounded queue drained by its own writer task"""
+
+    def __init__(self, ws: WebSocket, queue_size: int):
+        self.ws = ws
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.task = asyncio.create_task(self._writer())
+
+    def offer(self, text: str):
+        """Enqueue a serialized message without blocking; drop the oldest when full"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(text)
+
+    async def _writer(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                await asyncio.wait_for(self.ws.send_text(text), timeout=VIEWER_SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[SERVER] Dashboard writer stopped: {e!r}")
+            try:
+                await self.ws.close()
+            except Exception:
+                pass
+
+
+class BroadcastHub:
+    """Fan-out of agent data to dashboard viewers.
+
+    broadcast() serializes a message once and only enqueues it per viewer,
+    so the agent's receive loop never waits on a slow dashboard; each
+    viewer's writer task sends at its own pace, and a viewer that falls
+    more than VIEWER_QUEUE_SIZE messages behind loses the oldest ones.
+    """
+
+    def __init__(self, queue_size: int = VIEWER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.viewers: Dict[WebSocket, Viewer] = {}
+
+    def __len__(self):
+        return len(self.viewers)
+
+    def add(self, ws: WebSocket) -> Viewer:
+        viewer = Viewer(ws, self.queue_size)
+        self.viewers[ws] = viewer
+        return viewer
+
+    async def remove(self, ws: WebSocket):
+        viewer = self.viewers.pop(ws, None)
+        if viewer:
+            viewer.task.cancel()
+            try:
+                await viewer.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            if viewer.dropped:
+                print(f"[SERVER] Slow dashboard dropped {viewer.dropped} message(s)")
+
+    def broadcast(self, message: dict):
+        text = json.dumps(message)
+        for viewer in list(self.viewers.values()):
+            viewer.offer(text)
+
+
 # Store active WebSocket connections
-active_connections: Set[WebSocket] = set()  # Dashboard viewers
+hub = BroadcastHub()  # Dashboard viewers
 active_agents: Dict[str, WebSocket] = {}  # Remote agents {machine_id: websocket}
 
+# Run bookkeeping
+current_runs: Dict[str, str] = {}  # {machine_id: run_id} that incoming data belongs to
+live_points: Dict[Tuple[str, str], dict] = {}  # latest data per (machine, cores), replayed to new viewers
+
+# Agent messages forwarded to dashboards as they are (not benchmark data)
+AGENT_EVENTS = {'status_response', 'pong', 'progress',
+                'job_queued', 'job_started', 'job_finished', 'job_cancelled', 'job_rejected'}
+
+
+def start_run(machines: List[str], label: Optional[str] = None) -> str:
+    """Open a new run for machines; their points from earlier runs leave the replay"""
+    run_id = store.new_run(machines, label)
+    for machine_id in machines:
+        current_runs[machine_id] = run_id
+        for key in [key for key in live_points if key[0] == machine_id]:
+            del live_points[key]
+    return run_id
+
+
+def remember_point(machine_id: str, message: dict):
+    cores = message.get('cores', message.get('vms'))
+    if cores is not None:
+        live_points[(machine_id, str(cores))] = message
+
+
+def record_data(machine_id: str, message: dict):
+    """Persist a data message (batched, off the event loop) and keep it for replay"""
+    # Jobs queued on an agent report the run they were started for
+    run_id = message.get('run_id') or current_runs.get(machine_id) or start_run([machine_id], "adhoc")
+    store.append(run_id, machine_id, message)
+    remember_point(machine_id, message)
+
 # ---------------------------------------------------------
 # Serve the dashboard (index.html) from the project folder
 # ---------------------------------------------------------
@@ -33,6 +165,22 @@ async def root():
     return FileResponse(index_path)
 
 
+# ---------------------------------------------------------
+# HTTP: query past runs from the run store
+# ---------------------------------------------------------
+@app.get("/api/runs")
+async def api_runs(machine: Optional[str] = None, limit: int = 50):
+    """Most recent runs (optionally those with data from one machine)"""
+    return await asyncio.to_thread(store.runs, machine, limit)
+
+
+@app.get("/api/runs/{run_id}")
+async def api_run_samples(run_id: str, machine: Optional[str] = None, cores: Optional[int] = None):
+    """Samples of one run, optionally for one machine and/or core count"""
+    samples = await asyncio.to_thread(store.samples, run_id, machine, cores)
+    return {"run_id": run_id, "samples": samples}
+
+
 # ---------------------------------------------------------
 # WebSocket: streams JSON from your shell script
 # ---------------------------------------------------------
@@ -40,8 +188,11 @@ async def root():
 async def ws_dashboard(ws: WebSocket):
     """Dashboard viewer connection - receives data broadcast from agents"""
     await ws.accept()
-    active_connections.add(ws)
-    print(f"[SERVER] Dashboard connection accepted. Total connections: {len(active_connections)}")
+    viewer = hub.add(ws)
+    # Replay the current runs first; nothing can be broadcast in between
+    if live_points:
+        viewer.offer(json.dumps({"type": "snapshot", "samples": list(live_points.values())}))
+    print(f"[SERVER] Dashboard connection accepted. Total connections: {len(hub)}")
 
     try:
         # Keep connection open - receive messages if any (though dashboard doesn't send any)
@@ -55,22 +206,21 @@ async def ws_dashboard(ws: WebSocket):
             except asyncio.TimeoutError:
                 # No message in 30s, that's fine - connection is still alive
                 # Send a ping to keep connection alive
-                try:
-                    await ws.send_json({"type": "ping"})
-                except:
+                if viewer.task.done():
                     break
+                viewer.offer(json.dumps({"type": "ping"}))
             
     except WebSocketDisconnect:
         print("[SERVER] Dashboard disconnected")
     except Exception as e:
         print(f"[ERROR] Dashboard WebSocket error: {e}")
     finally:
-        active_connections.discard(ws)
+        await hub.remove(ws)
         try:
             await ws.close()
         except:
             pass
-        print(f"[SERVER] Dashboard connection closed. Remaining connections: {len(active_connections)}")
+        print(f"[SERVER] Dashboard connection closed. Remaining connections: {len(hub)}")
 
 
 # ---------------------------------------------------------
@@ -86,13 +236,10 @@ async def ws_push_data(ws: WebSocket):
             # Receive data from remote client
             data = await ws.receive_json()
             print(f"[SERVER] Received remote data: {data}")
+            record_data(data.get('machine', 'push'), data)
             
             # Broadcast to all dashboard connections
-            for connection in active_connections:
-                try:
-                    await connection.send_json(data)
-                except:
-                    pass
+            hub.broadcast(data)
                     
     except WebSocketDisconnect:
         print("[SERVER] Remote push connection closed")
@@ -118,48 +265,62 @@ async def ws_agent(ws: WebSocket):
             machine_id = reg_msg.get('machine')
             active_agents[machine_id] = ws
             print(f"[SERVER] Agent registered: {machine_id} (Total agents: {len(active_agents)})")
+
+            # Agents that offer encodings get batched binary data frames;
+            # older agents keep sending one JSON message per sample
+            if 'protocols' in reg_msg:
+                protocol = choose_protocol(reg_msg['protocols'])
+                await ws.send_json({"type": "registered", "protocol": protocol})
+                print(f"[SERVER] Agent {machine_id} data protocol: {protocol}")
             
             # Notify dashboards about new agent
-            agent_list_msg = {
+            hub.broadcast({
                 "type": "agent_list",
                 "agents": list(active_agents.keys())
-            }
-            for connection in active_connections:
-                try:
-                    await connection.send_json(agent_list_msg)
-                except:
-                    pass
+            })
         
         # Listen for messages from agent (benchmark results, status, etc.)
         while True:
             try:
                 # Increased timeout to 300s (5 minutes) for long-running benchmarks
-                message = await asyncio.wait_for(ws.receive_json(), timeout=300.0)
+                frame = await asyncio.wait_for(ws.receive(), timeout=300.0)
+                if frame['type'] == 'websocket.disconnect':
+                    raise WebSocketDisconnect(frame.get('code', 1000))
+
+                if frame.get('bytes') is not None:
+                    # Batch of samples - store each, broadcast the batch as one message
+                    try:
+                        samples = decode_frame(frame['bytes'])
+                    except Exception as e:
+                        print(f"[ERROR] Bad data frame from {machine_id}: {e}")
+                        continue
+                    for sample in samples:
+                        record_data(machine_id, sample)
+                    hub.broadcast({"type": "batch", "machine": machine_id, "samples": samples})
+                    if samples:
+                        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+                        last = samples[-1]
+                        vms = last.get('cores', last.get('vms', '?'))
+                        print(f"[{timestamp}] Agent {machine_id} batch: {len(samples)} samples, "
+                              f"last \033[96mVMs={vms}\033[0m")
+                    continue
+
+                message = json.loads(frame['text'])
                 msg_type = message.get('type')
                 
                 if msg_type == 'heartbeat':
                     # Just acknowledge, no action needed
                     pass
-                elif msg_type in ['status_response', 'pong']:
+                elif msg_type in AGENT_EVENTS:
                     # Forward to dashboards
-                    for connection in active_connections:
-                        try:
-                            await connection.send_json(message)
-                        except:
-                            pass
+                    hub.broadcast(message)
                 else:
-                    # Benchmark data - broadcast to all dashboards
-                    print(f"[DEBUG] Broadcasting to {len(active_connections)} dashboard(s)")
-                    for connection in active_connections:
-                        try:
-                            await connection.send_json(message)
-                            print(f"[DEBUG] Sent data to dashboard: {message}")
-                        except Exception as e:
-                            print(f"[DEBUG] Failed to send to dashboard: {e}")
+                    # Benchmark data - store, then broadcast to all dashboards
+                    record_data(machine_id, message)
+                    hub.broadcast(message)
                     
                     # Log if it's benchmark data
                     if 'cores' in message:
-                        import datetime
                         timestamp = datetime.datetime.now().strftime("%H:%M:%S")
                         vms = message.get('cores', message.get('vms', '?'))
                         rps = message.get('requests') or message.get('bandwidth') or message.get('kpi')
@@ -181,15 +342,10 @@ async def ws_agent(ws: WebSocket):
             print(f"[SERVER] Agent {machine_id} removed (Remaining: {len(active_agents)})")
             
             # Notify dashboards about agent removal
-            agent_list_msg = {
+            hub.broadcast({
                 "type": "agent_list",
                 "agents": list(active_agents.keys())
-            }
-            for connection in active_connections:
-                try:
-                    await connection.send_json(agent_list_msg)
-                except:
-                    pass
+            })
         
         await ws.close()
 
@@ -197,6 +353,15 @@ async def ws_agent(ws: WebSocket):
 # ---------------------------------------------------------
 # WebSocket: control endpoint to trigger benchmarks on agents
 # ---------------------------------------------------------
+def run_command(command: dict, run_id: str) -> dict:
+    """run_benchmark command for agents; job_id, cpus, config and spec pass through"""
+    job = {"command": "run_benchmark", "run_id": run_id}
+    for key in ('job_id', 'cpus', 'config', 'spec'):
+        if command.get(key) is not None:
+            job[key] = command[key]
+    return job
+
+
 @app.websocket("/ws/control")
 async def ws_control(ws: WebSocket):
     await ws.accept()
@@ -207,23 +372,35 @@ async def ws_control(ws: WebSocket):
             command = await ws.receive_json()
             cmd_type = command.get('command')
             
+            # An inline benchmark spec replaces the agents' config file; reject
+            # a malformed one here rather than on every agent
+            if cmd_type in ('run_all', 'run_specific') and command.get('spec') is not None:
+                try:
+                    validate_spec(command['spec'])
+                except ValueError as e:
+                    print(f"[WARNING] Rejected {cmd_type}: {e}")
+                    await ws.send_json({"type": "error", "command": cmd_type, "error": str(e)})
+                    continue
+            
             if cmd_type == 'run_all':
                 print(f"[SERVER] Running benchmark on all {len(active_agents)} agents")
-                for machine_id, agent_ws in active_agents.items():
+                run_id = start_run(list(active_agents), command.get('label'))
+                for machine_id, agent_ws in list(active_agents.items()):
                     try:
-                        await agent_ws.send_json({"command": "run_benchmark"})
-                        print(f"[SERVER] Sent run_benchmark to {machine_id}")
+                        await agent_ws.send_json(run_command(command, run_id))
+                        print(f"[SERVER] Sent run_benchmark to {machine_id} (run {run_id})")
                     except Exception as e:
                         print(f"[ERROR] Failed to send to {machine_id}: {e}")
                         
             elif cmd_type == 'run_specific':
                 machine_ids = command.get('machines', [])
                 print(f"[SERVER] Running benchmark on specific machines: {machine_ids}")
+                run_id = start_run([m for m in machine_ids if m in active_agents], command.get('label'))
                 for machine_id in machine_ids:
                     if machine_id in active_agents:
                         try:
-                            await active_agents[machine_id].send_json({"command": "run_benchmark"})
-                            print(f"[SERVER] Sent run_benchmark to {machine_id}")
+                            await active_agents[machine_id].send_json(run_command(command, run_id))
+                            print(f"[SERVER] Sent run_benchmark to {machine_id} (run {run_id})")
                         except Exception as e:
                             print(f"[ERROR] Failed to send to {machine_id}: {e}")
                     else:
@@ -237,12 +414,27 @@ async def ws_control(ws: WebSocket):
                 
             elif cmd_type == 'status_check':
                 print(f"[SERVER] Checking status of all agents")
-                for machine_id, agent_ws in active_agents.items():
+                for machine_id, agent_ws in list(active_agents.items()):
                     try:
                         await agent_ws.send_json({"command": "status"})
                     except:
                         pass
                         
+            elif cmd_type in ('cancel', 'progress'):
+                # Job control, for the listed machines (all agents by default);
+                # agents answer with job_cancelled / progress messages to dashboards
+                machine_ids = command.get('machines') or list(active_agents)
+                forward = {"command": cmd_type}
+                if cmd_type == 'cancel':
+                    forward["job_id"] = command.get('job_id')
+                print(f"[SERVER] Sending {cmd_type} to {machine_ids}")
+                for machine_id in machine_ids:
+                    if machine_id in active_agents:
+                        try:
+                            await active_agents[machine_id].send_json(forward)
+                        except Exception as e:
+                            print(f"[ERROR] Failed to send to {machine_id}: {e}")
+                        
     except WebSocketDisconnect:
         print("[SERVER] Control connection closed")
     except Exception as e:
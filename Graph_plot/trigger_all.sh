@@ -1,10 +1,15 @@
 #!/bin/bash
 # Simple script to trigger benchmarks on all connected remote agents via CLI
+# Usage: ./trigger_all.sh [server:port] [spec.json]
+#   spec.json: optional inline benchmark spec (see benchmark_spec.py) sent
+#   with the command instead of each agent's config file
 
 SERVER="${1:-localhost:8000}"
+SPEC_FILE="${2:-}"
 
 echo "Triggering benchmarks on all connected agents..."
 echo "Server: $SERVER"
+[ -n "$SPEC_FILE" ] && echo "Spec: $SPEC_FILE"
 echo ""
 
 python3 - <<EOF
@@ -30,7 +35,20 @@ async def trigger_benchmarks():
                 return
             
             # Trigger run_all
-            await websocket.send(json.dumps({"command": "run_all"}))
+            command = {"command": "run_all"}
+            if "${SPEC_FILE}":
+                with open("${SPEC_FILE}") as f:
+                    command["spec"] = json.load(f)
+            await websocket.send(json.dumps(command))
+            
+            # The server only answers when it rejects the spec
+            try:
+                reply = json.loads(await asyncio.wait_for(websocket.recv(), timeout=1.0))
+                if reply.get('type') == 'error':
+                    print(f"Rejected: {reply['error']}")
+                    sys.exit(1)
+            except asyncio.TimeoutError:
+                pass
             print(f"✓ Triggered benchmark on {len(agents)} agent(s)")
             
     except Exception as e:
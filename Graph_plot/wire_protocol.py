@@ -0,0 +1,108 @@
+"""
+Wire Protocol - batched binary frames between remote_agent.py and server.py
+
+Agents offer the encodings they support in their register message
+("protocols"); the server answers with the one it picked ("registered").
+Data samples then travel many per binary frame; control messages
+(register, heartbeat, status, pong) stay JSON text, and "json" (one text
+frame per sample) remains the fallback for older peers.
+
+Encodings:
+  struct   MAGIC_STRUCT | u32 header length | header JSON | u32 rows |
+           rows x len(fields) little-endian float64. The header names the
+           numeric fields, the fields that were ints, and the non-numeric
+           fields shared by every row ("const"). Samples with different
+           shapes go into separate frames.
+  msgpack  MAGIC_MSGPACK | msgpack list of samples (only when the msgpack
+           package is installed on both sides).
+"""
+
+import json
+import struct
+from typing import Dict, List
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MAGIC_STRUCT = b'BSF1'
+MAGIC_MSGPACK = b'BMP1'
+
+# Most to least compact; "json" is what agents without negotiation speak
+PROTOCOLS = ['msgpack', 'struct', 'json']
+
+
+def supported_protocols() -> List[str]:
+    return [p for p in PROTOCOLS if p != 'msgpack' or msgpack is not None]
+
+
+def choose_protocol(offered: List[str]) -> str:
+    """First of our supported encodings that the peer offered"""
+    for protocol in supported_protocols():
+        if protocol in offered:
+            return protocol
+    return 'json'
+
+
+def _numeric(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _encode_struct(samples: List[Dict]) -> List[bytes]:
+    groups: Dict[tuple, list] = {}
+    for sample in samples:
+        fields = tuple(sorted(k for k, v in sample.items() if _numeric(v)))
+        const = {k: v for k, v in sample.items() if not _numeric(v)}
+        groups.setdefault((fields, json.dumps(const, sort_keys=True)), []).append(sample)
+    frames = []
+    for (fields, const), rows in groups.items():
+        ints = [f for f in fields if all(isinstance(row[f], int) for row in rows)]
+        header = json.dumps({'fields': fields, 'ints': ints, 'const': json.loads(const)}).encode()
+        values = [float(row[f]) for row in rows for f in fields]
+        frames.append(MAGIC_STRUCT + struct.pack('<I', len(header)) + header +
+                      struct.pack('<I', len(rows)) + struct.pack(f'<{len(values)}d', *values))
+    return frames
+
+
+def _decode_struct(data: bytes) -> List[Dict]:
+    offset = len(MAGIC_STRUCT)
+    (header_len,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    header = json.loads(data[offset:offset + header_len])
+    offset += header_len
+    (rows,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    fields, ints, const = header['fields'], set(header['ints']), header['const']
+    values = struct.unpack_from(f'<{rows * len(fields)}d', data, offset)
+    samples = []
+    for r in range(rows):
+        sample = dict(const)
+        row = values[r * len(fields):(r + 1) * len(fields)]
+        for field, value in zip(fields, row):
+            sample[field] = int(value) if field in ints else value
+        samples.append(sample)
+    return samples
+
+
+def encode_batch(samples: List[Dict], protocol: str) -> List[bytes]:
+    """Binary frames carrying samples in the negotiated encoding"""
+    if not samples:
+        return []
+    if protocol == 'msgpack':
+        return [MAGIC_MSGPACK + msgpack.packb(samples, use_bin_type=True)]
+    if protocol == 'struct':
+        return _encode_struct(samples)
+    raise ValueError(f"{protocol} is not a batched encoding")
+
+
+def decode_frame(data: bytes) -> List[Dict]:
+    """Samples of one binary frame; raises ValueError on unknown frames"""
+    magic = data[:4]
+    if magic == MAGIC_STRUCT:
+        return _decode_struct(data)
+    if magic == MAGIC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack frame received but msgpack is not installed")
+        return msgpack.unpackb(data[4:], raw=False)
+    raise ValueError(f"unknown frame type {magic!r}")
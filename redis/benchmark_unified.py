@@ -4,345 +4,36 @@ Unified Redis Benchmark Script
 Supports multiple operation types: ping, read, write, readwrite
 """
 
-import paramiko
-import os
 import argparse
-import concurrent.futures
-import time
+import os
 import sys
 from datetime import datetime
-import re
-
-# Configuration for different benchmark types
-BENCHMARK_CONFIGS = {
-    'ping': {
-        'hostnames': ['192.168.200.2', '192.168.200.3', '192.168.200.4', 
-                      '192.168.200.5', '192.168.200.6', '192.168.200.7'],
-        'startports': ['16000', '16001', '16002', '16003', '16004', '16005'],
-        'redis_server': '192.168.200.1',
-        'test_time': 100,
-        'seq_step': 6,
-        'command': 'ping',
-        'ratio': None,
-    },
-    'read': {
-        'hostnames': ['192.168.100.2', '192.168.100.3'],
-        'startports': ['16000', '16001'],
-        'redis_server': '192.168.100.1',
-        'test_time': 80,
-        'seq_step': 2,
-        'command': None,
-        'ratio': '0:1',  # 100% read
-    },
-    'write': {
-        'hostnames': ['192.168.100.2', '192.168.100.3'],
-        'startports': ['16000', '16001'],
-        'redis_server': '192.168.100.1',
-        'test_time': 80,
-        'seq_step': 2,
-        'command': None,
-        'ratio': '1:0',  # 100% write
-    },
-    'readwrite': {
-        'hostnames': ['192.168.100.2', '192.168.100.3'],
-        'startports': ['16000', '16001'],
-        'redis_server': '192.168.100.1',
-        'test_time': 80,
-        'seq_step': 2,
-        'command': None,
-        'ratio': '1:1',  # 50/50 read/write
-    }
-}
-
-# Global statistics tracking
-benchmark_stats = {
-    'start_time': None,
-    'end_time': None,
-    'transfer_success': 0,
-    'transfer_failed': 0,
-    'benchmark_success': 0,
-    'benchmark_failed': 0,
-    'results': []
-}
-
-# Color codes for terminal output
-class Colors:
-    HEADER = '\033[95m'
-    OKBLUE = '\033[94m'
-    OKCYAN = '\033[96m'
-    OKGREEN = '\033[92m'
-    WARNING = '\033[93m'
-    FAIL = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
-
-def log_info(message):
-    """Print info message"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Colors.OKBLUE}[{timestamp}] [INFO]{Colors.ENDC} {message}")
-
-def log_success(message):
-    """Print success message"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Colors.OKGREEN}[{timestamp}] [SUCCESS]{Colors.ENDC} {message}")
 
-def log_warning(message):
-    """Print warning message"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Colors.WARNING}[{timestamp}] [WARNING]{Colors.ENDC} {message}")
+import topology
+from redis_bench import (BENCHMARK_CONFIGS, PREFILL_KEY_MAXIMUM, REMOTE_DIR, Colors, LocalPool,
+                         append_results_summary, benchmark_stats, distribute_scripts, local_config,
+                         local_plan, log_error, log_info, open_connections, print_header,
+                         print_summary, print_sweep_summary, run_benchmark_point, run_search,
+                         run_sweep, start_local_servers, stop_local_servers, summarize_point)
 
-def log_error(message):
-    """Print error message"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"{Colors.FAIL}[{timestamp}] [ERROR]{Colors.ENDC} {message}")
-
-def print_separator(char='=', length=80):
-    """Print a separator line"""
-    print(char * length)
-
-def print_header(title):
-    """Print a formatted header"""
-    print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{Colors.HEADER}{title.center(80)}{Colors.ENDC}")
-    print(f"{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}\n")
-
-def create_script_file(script_content, filename):
-    """Create a script file locally"""
+def parse_int_list(value):
+    """Parse "64", "1,8,16" or "start:stop:step" (inclusive) into a list of ints"""
+    values = []
     try:
-        with open(filename, 'w') as file:
-            file.write(script_content)
-        log_success(f"Created local script: {filename}")
-        return True
-    except Exception as e:
-        log_error(f"Failed to create script {filename}: {e}")
-        return False
-
-def transfer_file_to_remote(hostname, port, username, password, local_file, remote_file):
-    """Transfer a file to a remote server via SCP"""
-    try:
-        log_info(f"Transferring {local_file} to {hostname}...")
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(hostname, port=port, username=username, password=password, timeout=10)
-
-        scp = paramiko.SFTPClient.from_transport(client.get_transport())
-        scp.put(local_file, remote_file)
-        scp.close()
-        log_success(f"Transferred to {hostname}:{remote_file}")
-        benchmark_stats['transfer_success'] += 1
-        return True
-    except Exception as e:
-        log_error(f"Failed to transfer to {hostname}: {e}")
-        benchmark_stats['transfer_failed'] += 1
-        return False
-    finally:
-        client.close()
-
-def run_remote_command(hostname, port, username, password, command, collect_metrics=False):
-    """Run a remote command via SSH"""
-    try:
-        log_info(f"Executing command on {hostname}...")
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        client.connect(hostname, port=port, username=username, password=password, timeout=10)
-        
-        stdin, stdout, stderr = client.exec_command(command)
-        output = stdout.read().decode()
-        error = stderr.read().decode()
-        
-        if collect_metrics:
-            # Parse metrics from output
-            metrics = parse_benchmark_output(output, hostname)
-            if metrics:
-                benchmark_stats['results'].append(metrics)
-        
-        print(f"\n{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
-        print(f"{Colors.BOLD}Remote Output from {hostname}:{Colors.ENDC}")
-        print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
-        if output.strip():
-            print(output)
-        if error.strip():
-            log_warning(f"Stderr from {hostname}:")
-            print(error)
-        print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}\n")
-        
-        benchmark_stats['benchmark_success'] += 1
-        return True
-    except Exception as e:
-        log_error(f"Failed to execute on {hostname}: {e}")
-        benchmark_stats['benchmark_failed'] += 1
-        return False
-    finally:
-        client.close()
-
-def parse_benchmark_output(output, hostname):
-    """Parse benchmark metrics from output"""
-    try:
-        metrics = {'hostname': hostname}
-        
-        # Extract IOPS/throughput
-        iops_match = re.search(r'total number of IOPS.*?(\d+\.?\d*)', output)
-        if iops_match:
-            metrics['iops'] = float(iops_match.group(1))
-        
-        # Extract instance count
-        instance_match = re.search(r'for\s+(\d+)\s+Instance', output)
-        if instance_match:
-            metrics['instances'] = int(instance_match.group(1))
-        
-        return metrics if metrics.get('iops') else None
-    except Exception as e:
-        log_warning(f"Failed to parse metrics from {hostname}: {e}")
-        return None
-
-def generate_benchmark_script(operation, config, core, size, pipeline):
-    """Generate the benchmark script based on operation type"""
-    
-    # Unified log directory for all operations
-    log_dir_base = "/root/wls/redis/memtier_benchmark"
-    
-    if operation == 'ping':
-        # PING command benchmark
-        script_content = f"""#!/bin/bash
-
-pcpu=$1
-x=0
-REDIS_SERVER="{config['redis_server']}"
-LOG_DIR="{log_dir_base}/log_${{1}}"
-
-# Cleanup previous runs
-rm -rf "$LOG_DIR"
-mkdir -p "$LOG_DIR"
-killall -9 memtier_benchmark 2>/dev/null
-
-# Array to store PIDs
-declare -a pids
-
-for j in $(seq 1 {config['seq_step']} ${{pcpu}}); do
-    portp=$(($4 + j))
-    
-    taskset -c $x memtier_benchmark \\
-        -s $REDIS_SERVER -p ${{portp}} \\
-        --threads=1 --test-time {config['test_time']} --pipeline=$3 \\
-        --hide-histogram --command='ping' \\
-        --clients=100 --data-size=64 \\
-        --out-file=${{LOG_DIR}}/log_${{portp}} &
-    
-    pids[$x]=$!
-    let x+=1
-done
-
-# Wait for all processes to complete
-for pid in ${{pids[*]}}; do
-    wait $pid
-done
-
-echo "Benchmark completed. Results in $LOG_DIR"
-"""
-    else:
-        # GET/SET benchmarks
-        script_content = f"""#!/bin/bash
-
-pcpu=$1
-x=0
-REDIS_SERVER="{config['redis_server']}"
-LOG_DIR="{log_dir_base}/log_${{1}}"
-
-# Cleanup previous runs
-rm -rf "$LOG_DIR"
-mkdir -p "$LOG_DIR"
-killall -9 memtier_benchmark 2>/dev/null
-
-# Array to store PIDs
-declare -a pids
-
-for j in $(seq 1 {config['seq_step']} ${{pcpu}}); do
-    portp=$(($4 + j))
-    
-    taskset -c $x memtier_benchmark \\
-        -s $REDIS_SERVER -p ${{portp}} \\
-        --threads=1 --test-time {config['test_time']} \\
-        --clients=100 --data-size=$2 \\
-        --ratio={config['ratio']} --pipeline=$3 \\
-        --out-file=${{LOG_DIR}}/log_${{portp}} &
-    
-    pids[$x]=$!
-    let x+=1
-done
-
-# Wait for all processes to complete
-for pid in ${{pids[*]}}; do
-    wait $pid
-done
-
-echo "Benchmark completed. Results in $LOG_DIR"
-"""
-    
-    return script_content
-
-def generate_output_script():
-    """Generate the output aggregation script"""
-    return """#!/bin/bash
-grep -r "Total" $1 | awk '{sum += $2; print $2; next} END {print "total number of IOPS for",NR, " Instance ", sum/NR }'
-"""
-
-def print_summary(args, config):
-    """Print final benchmark summary"""
-    print_header("BENCHMARK SUMMARY")
-    
-    duration = (benchmark_stats['end_time'] - benchmark_stats['start_time']).total_seconds()
-    
-    # Configuration summary
-    print(f"{Colors.BOLD}Configuration:{Colors.ENDC}")
-    print(f"  Operation Type:    {args.operation.upper()}")
-    print(f"  Cores:             {args.core}")
-    print(f"  Data Size:         {args.size} bytes")
-    print(f"  Pipeline Depth:    {args.pipeline}")
-    print(f"  Test Duration:     {config['test_time']}s per client")
-    print(f"  Client Servers:    {len(config['hostnames'])}")
-    if config['ratio']:
-        print(f"  Read/Write Ratio:  {config['ratio']}")
-    print()
-    
-    # Execution summary
-    print(f"{Colors.BOLD}Execution Summary:{Colors.ENDC}")
-    print(f"  Total Runtime:     {duration:.2f}s")
-    print(f"  File Transfers:    {Colors.OKGREEN}{benchmark_stats['transfer_success']} succeeded{Colors.ENDC}, "
-          f"{Colors.FAIL}{benchmark_stats['transfer_failed']} failed{Colors.ENDC}")
-    print(f"  Benchmark Runs:    {Colors.OKGREEN}{benchmark_stats['benchmark_success']} succeeded{Colors.ENDC}, "
-          f"{Colors.FAIL}{benchmark_stats['benchmark_failed']} failed{Colors.ENDC}")
-    print()
-    
-    # Performance summary
-    if benchmark_stats['results']:
-        print(f"{Colors.BOLD}Performance Results:{Colors.ENDC}")
-        total_iops = 0
-        for result in benchmark_stats['results']:
-            if 'iops' in result:
-                print(f"  {result['hostname']:<20} {result.get('iops', 0):>15,.2f} ops/sec "
-                      f"({result.get('instances', 'N/A')} instances)")
-                total_iops += result['iops']
-        
-        if total_iops > 0:
-            print(f"\n  {Colors.BOLD}{Colors.OKGREEN}Total Throughput:   {total_iops:>15,.2f} ops/sec{Colors.ENDC}")
-            print(f"  {Colors.BOLD}Average per Client: {total_iops/len(benchmark_stats['results']):>15,.2f} ops/sec{Colors.ENDC}")
-    else:
-        log_warning("No performance metrics collected")
-    
-    print()
-    print_separator('=', 80)
-    
-    # Status indicator
-    if benchmark_stats['transfer_failed'] == 0 and benchmark_stats['benchmark_failed'] == 0:
-        log_success("All operations completed successfully!")
-    else:
-        log_warning("Some operations failed. Check logs above for details.")
-    
-    print_separator('=', 80)
-
-def parse_args():
-    """Parse command line arguments"""
+        for part in value.split(','):
+            if ':' in part:
+                start, stop, *step = (int(x) for x in part.split(':'))
+                values.extend(range(start, stop + 1, step[0] if step else 1))
+            else:
+                values.append(int(part))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer list: '{value}'")
+    if not values:
+        raise argparse.ArgumentTypeError(f"empty integer list: '{value}'")
+    return values
+
+def parse_args(argv=None):
+    """Parse command line arguments (sys.argv[1:] when argv is None)"""
     parser = argparse.ArgumentParser(
         description="Unified Redis Benchmark Script",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -353,11 +44,21 @@ Operation Types:
   write      - Write-only benchmark (2 clients, 192.168.100.x)
   readwrite  - Mixed 50/50 read/write benchmark (2 clients, 192.168.100.x)
 
+Sweep Mode:
+  -c/-s/-p accept comma lists and start:stop:step ranges. With more than one
+  point the whole grid runs in this process over one set of SSH connections,
+  and results go to one CSV table. --plateau-gain stops a core sweep early.
+  --search instead probes -p/--clients candidates per core count with short
+  runs (--probe-time) and confirms the best one with a full-length run.
+
 Examples:
   %(prog)s -o ping -c 288 -s 64 -p 1
   %(prog)s -o read -c 144 -s 1024 -p 16
   %(prog)s -o write -c 96 -s 512 -p 8
   %(prog)s -o readwrite -c 192 -s 256 -p 4
+  %(prog)s -o ping -c 16:288:16 -s 64 -p 1,8 --plateau-gain 2
+  %(prog)s -o read -c 32,64,144,288 -s 64 -p 1:64 --clients 10,25,50,100,200 --search
+  %(prog)s -o ping -c 1,2,4,8 -s 64 -p 1 --local --test-time 30
         """
     )
     parser.add_argument('-o', '--operation', 
@@ -366,17 +67,63 @@ Examples:
                         choices=['ping', 'read', 'write', 'readwrite'],
                         help="Benchmark operation type")
     parser.add_argument('-c', '--core', 
-                        type=int, 
+                        type=parse_int_list, 
                         required=True, 
-                        help="Number of cores")
+                        help="Number of cores (list/range for a sweep)")
     parser.add_argument('-s', '--size', 
-                        type=int, 
+                        type=parse_int_list, 
                         required=True, 
-                        help="Data size in bytes")
+                        help="Data size in bytes (list/range for a sweep)")
     parser.add_argument('-p', '--pipeline', 
-                        type=int, 
+                        type=parse_int_list, 
                         required=True, 
-                        help="Pipeline depth")
+                        help="Pipeline depth (list/range for a sweep)")
+    parser.add_argument('--clients',
+                        type=parse_int_list,
+                        default=[100],
+                        help="memtier --clients per instance (list/range for a sweep or search, "
+                             "default: 100)")
+    parser.add_argument('--search',
+                        action='store_true',
+                        help="Saturation search: find the best pipeline/clients per core count "
+                             "with short probes over the -p/--clients candidates")
+    parser.add_argument('--probe-time',
+                        type=int,
+                        default=15,
+                        help="Test time of each search probe in seconds (default: 15)")
+    parser.add_argument('--latency-slo',
+                        type=float,
+                        default=None,
+                        help="Reject search points whose p99 latency exceeds this many ms")
+    parser.add_argument('--topology',
+                        type=str,
+                        default=None,
+                        help="Topology JSON (see topology.example.json); replaces the built-in "
+                             "client/server addresses and pins instances NUMA-locally")
+    parser.add_argument('--local',
+                        action='store_true',
+                        help="Run redis-server and memtier on this machine over loopback, "
+                             "on disjoint cores (no SSH)")
+    parser.add_argument('--engine',
+                        choices=['memtier', 'python'],
+                        default='memtier',
+                        help="Load generator: memtier_benchmark, or the built-in asyncio "
+                             "resp_loadgen.py where memtier is unavailable (default: memtier)")
+    parser.add_argument('--test-time',
+                        type=int,
+                        default=None,
+                        help="Seconds per benchmark point (default: the operation's test_time)")
+    parser.add_argument('--prefill',
+                        action=argparse.BooleanOptionalAction,
+                        default=None,
+                        help="Load the key range with --data-size values before each point and "
+                             "check DBSIZE (default: on for read and readwrite)")
+    parser.add_argument('--key-maximum',
+                        type=int,
+                        default=None,
+                        help="memtier --key-maximum for read/write operations, i.e. the key "
+                             "range 0..N per instance (default: memtier's own; "
+                             f"{PREFILL_KEY_MAXIMUM} when prefilling)")
     parser.add_argument('--username',
                         type=str,
                         default='root',
@@ -385,137 +132,240 @@ Examples:
                         type=int,
                         default=22,
                         help="SSH port (default: 22)")
-    return parser.parse_args()
-
-def main():
-    """Main execution function"""
+    parser.add_argument('--results-dir',
+                        type=str,
+                        default='results/raw',
+                        help="Local directory for per-run raw memtier logs (default: results/raw)")
+    parser.add_argument('--run-name',
+                        type=str,
+                        default=None,
+                        help="Run name recorded in the results tables (default: timestamp)")
+    parser.add_argument('--sweep-csv',
+                        type=str,
+                        default=None,
+                        help="Sweep results table, also written for a single point when given "
+                             "(default: <results-dir>/sweep_<operation>_<run-name>.csv)")
+    parser.add_argument('--summary-csv',
+                        type=str,
+                        default=None,
+                        help="Global history CSV to append each point to (e.g. results_summary.csv)")
+    parser.add_argument('--plateau-gain',
+                        type=float,
+                        default=None,
+                        help="Stop a core sweep once throughput improves by less than this "
+                             "percent over the best point (default: run every point)")
+    parser.add_argument('--plateau-patience',
+                        type=int,
+                        default=1,
+                        help="Consecutive non-improving core points before stopping (default: 1)")
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=1,
+                        help="Run each point up to N times, in randomized rounds, and report the "
+                             "median with a confidence interval (default: 1)")
+    parser.add_argument('--min-repeat',
+                        type=int,
+                        default=5,
+                        help="Runs per point before --repeat may stop early (default: 5)")
+    parser.add_argument('--ci-width',
+                        type=float,
+                        default=2.0,
+                        help="Stop repeating a point once its median CI is within +/- this "
+                             "percent (default: 2)")
+    parser.add_argument('--confidence',
+                        type=float,
+                        default=0.95,
+                        help="Confidence level of the median CI (default: 0.95; needs at least "
+                             "6 runs per point)")
+    parser.add_argument('--seed',
+                        type=int,
+                        default=None,
+                        help="Seed of the randomized point order with --repeat (default: random)")
+    parser.add_argument('--cooldown',
+                        type=int,
+                        default=5,
+                        help="Seconds to pause between sweep points (default: 5)")
+    parser.add_argument('--steady-tolerance',
+                        type=float,
+                        default=10.0,
+                        help="Percent below the median per-second throughput that still counts "
+                             "as steady state (default: 10)")
+    parser.add_argument('--start-delay',
+                        type=float,
+                        default=5.0,
+                        help="Seconds between arming the clients and their common start "
+                             "instant (default: 5)")
+    return parser.parse_args(argv)
+
+def main(argv=None, default_password='Password123!23'):
+    """Main execution function; default_password is used when SSH_PASSWORD is unset"""
     benchmark_stats['start_time'] = datetime.now()
     
-    args = parse_args()
+    args = parse_args(argv)
     
     # Get operation configuration
     if args.operation not in BENCHMARK_CONFIGS:
         log_error(f"Unknown operation type '{args.operation}'")
         sys.exit(1)
     
-    config = BENCHMARK_CONFIGS[args.operation]
+    config = dict(BENCHMARK_CONFIGS[args.operation])
+    if args.local and args.topology:
+        log_error("--local and --topology cannot be combined")
+        sys.exit(1)
+    if args.repeat > 1 and (args.search or args.plateau_gain is not None):
+        log_error("--repeat cannot be combined with --search or --plateau-gain")
+        sys.exit(1)
+    if args.topology:
+        try:
+            topo = topology.load_topology(args.topology)
+            config = topology.operation_config(topo, args.operation)
+            topology.plan_clients(topo, args.operation, max(args.core))
+        except (topology.TopologyError, KeyError) as e:
+            log_error(f"Invalid topology {args.topology}: {e}")
+            sys.exit(1)
+        config['topology'] = topo
+    if args.local:
+        try:
+            local = local_plan(max(args.core))
+        except ValueError as e:
+            log_error(f"Local mode: {e}")
+            sys.exit(1)
+        config = local_config(config, local, os.path.abspath(os.path.join(args.results_dir, 'local')))
+    if args.test_time:
+        config['test_time'] = args.test_time
+    config['prefill'] = not config['command'] and (
+        config.get('prefill', False) if args.prefill is None else args.prefill)
+    # Left to memtier unless set, or prefilled (memtier must then stay in the loaded range)
+    config['key_maximum'] = args.key_maximum
+    if config['prefill'] and args.key_maximum is None:
+        config['key_maximum'] = PREFILL_KEY_MAXIMUM
     
     # Get SSH credentials
     port = args.port
     username = args.username
-    #password = os.getenv('SSH_PASSWORD', 'dcso@123')
-    password = os.getenv('SSH_PASSWORD', 'Password123!23')
+    password = os.getenv('SSH_PASSWORD', default_password)
     
     if not password:
         log_error("SSH_PASSWORD environment variable not set")
         sys.exit(1)
     
-    core = args.core
-    size = args.size
-    pipeline = args.pipeline
+    # An explicit --sweep-csv asks for the results table even for a single point
+    sweep = (args.search or args.repeat > 1 or args.sweep_csv
+             or len(args.core) * len(args.size) * len(args.pipeline) * len(args.clients) > 1)
+    run_name = args.run_name or benchmark_stats['start_time'].strftime('%Y-%m-%d_%H-%M-%S')
     
     # Print configuration
     print_header("REDIS UNIFIED BENCHMARK")
     
     print(f"{Colors.BOLD}Benchmark Configuration:{Colors.ENDC}")
     print(f"  Operation:         {Colors.OKCYAN}{args.operation.upper()}{Colors.ENDC}")
-    print(f"  Cores:             {core}")
-    print(f"  Data Size:         {size} bytes")
-    print(f"  Pipeline Depth:    {pipeline}")
+    print(f"  Cores:             {', '.join(map(str, args.core))}")
+    print(f"  Data Size:         {', '.join(map(str, args.size))} bytes")
+    print(f"  Pipeline Depth:    {', '.join(map(str, args.pipeline))}")
     print(f"  Test Duration:     {config['test_time']}s")
     print(f"  Client Servers:    {len(config['hostnames'])}")
     print(f"  Redis Server:      {config['redis_server']}")
+    if args.topology:
+        print(f"  Topology:          {args.topology} (NUMA-aligned instance plan)")
+    if args.engine != 'memtier':
+        print("  Load Generator:    resp_loadgen.py (pure Python, asyncio)")
+    if args.local:
+        print(f"  Mode:              Local loopback (server cores "
+              f"{','.join(str(e['server_cpu']) for e in config['local'][:8])}"
+              f"{'...' if len(config['local']) > 8 else ''})")
     if config['ratio']:
         print(f"  Read/Write Ratio:  {config['ratio']}")
     if config['command']:
         print(f"  Command:           {config['command'].upper()}")
+    elif config['key_maximum'] is not None:
+        print(f"  Keyspace:          0-{config['key_maximum']:,}"
+              f"{' (prefilled)' if config['prefill'] else ''}")
+    print(f"  Clients/Instance:  {', '.join(map(str, args.clients))}")
+    if args.search:
+        print(f"  Mode:              Saturation search ({args.probe_time}s probes)")
+    elif sweep:
+        print(f"  Sweep Points:      {len(args.core) * len(args.size) * len(args.pipeline) * len(args.clients)}")
+    if args.repeat > 1:
+        print(f"  Repetitions:       up to {args.repeat} per point, randomized order, stop at "
+              f"+/-{args.ci_width}% ({args.confidence * 100:.0f}% CI)")
     print()
     
     log_info(f"Clients: {', '.join(config['hostnames'])}")
     print()
     
-    # Generate scripts
-    log_info("Generating benchmark scripts...")
-    benchmark_script = generate_benchmark_script(args.operation, config, core, size, pipeline)
-    output_script = generate_output_script()
-    
-    # Create local script files
-    local_script_file = 'remote_script.sh'
-    local_script_file2 = 'output_script.sh'
-    
-    if not create_script_file(benchmark_script, local_script_file):
-        sys.exit(1)
-    if not create_script_file(output_script, local_script_file2):
-        sys.exit(1)
+    # The launcher takes the plan and memtier flags as arguments, so one
+    # upload serves every point of a sweep
+    local_launcher_file = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                       'memtier_launcher.py')
     
     # Define remote paths - unified directory for all operations
-    remote_dir = '/root/wls/redis/memtier_benchmark'
-    
-    remote_script_file = f'{remote_dir}/remote_script.sh'
-    remote_script_file2 = f'{remote_dir}/output_script.sh'
+    remote_dir = config.get('remote_dir', REMOTE_DIR)
+    
+    launcher_file = f'{remote_dir}/memtier_launcher.py'
+    transfers = [(local_launcher_file, launcher_file)]
+    if args.engine == 'python':
+        config['engine'] = f'{remote_dir}/resp_loadgen.py'
+        transfers.append((os.path.join(os.path.dirname(local_launcher_file), 'resp_loadgen.py'),
+                          config['engine']))
+    if config['prefill']:
+        config['prefill_file'] = f'{remote_dir}/redis_prefill.py'
+        transfers.append((os.path.join(os.path.dirname(local_launcher_file), 'redis_prefill.py'),
+                          config['prefill_file']))
     
     hostnames = config['hostnames']
-    startports = config['startports']
-    
-    # Phase 1: Transfer scripts
-    print_header("PHASE 1: SCRIPT DISTRIBUTION")
-    log_info(f"Transferring scripts to {len(hostnames)} client servers...")
     
-    transfer_start = time.time()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames)) as executor:
-        futures = []
-        for hostname in hostnames:
-            futures.append(executor.submit(transfer_file_to_remote, hostname, port, username, 
-                                          password, local_script_file, remote_script_file))
-            futures.append(executor.submit(transfer_file_to_remote, hostname, port, username, 
-                                          password, local_script_file2, remote_script_file2))
+    rows = []
+    servers = None
+    if args.local:
+        pool = LocalPool()
+        try:
+            servers = start_local_servers(config['local'],
+                                          state_dir=os.path.join(remote_dir, 'redis'))
+        except (OSError, RuntimeError) as e:
+            log_error(f"Could not start local redis-server instances: {e}")
+            sys.exit(1)
+    else:
+        from redis_bench.ssh import SSHConnectionPool  # paramiko is only needed for remote runs
+        pool = SSHConnectionPool(port, username, password)
+    try:
+        open_connections(pool, hostnames)
         
-        for future in concurrent.futures.as_completed(futures):
-            future.result()
-    
-    transfer_duration = time.time() - transfer_start
-    log_success(f"Script distribution completed in {transfer_duration:.2f}s")
-    print()
-    
-    # Phase 2: Execute benchmarks
-    print_header("PHASE 2: BENCHMARK EXECUTION")
-    log_info(f"Starting benchmark on {len(hostnames)} clients...")
-    log_info(f"Estimated time: ~{config['test_time'] + 20}s")
-    
-    time.sleep(2)
-    
-    bench_start = time.time()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames)) as executor:
-        futures = []
-        for i, hostname in enumerate(hostnames):
-            cmd = f'bash {remote_script_file} {core} {size} {pipeline} {startports[i]}'
-            log_info(f"Launching on {hostname} (port base: {startports[i]})")
-            futures.append(executor.submit(run_remote_command, hostname, port, username, password, cmd))
+        distribute_scripts(pool, hostnames, transfers)
         
-        for future in concurrent.futures.as_completed(futures):
-            future.result()
-    
-    bench_duration = time.time() - bench_start
-    log_success(f"Benchmark execution completed in {bench_duration:.2f}s")
-    print()
-    
-    # Phase 3: Collect results
-    print_header("PHASE 3: RESULTS COLLECTION")
-    log_info("Aggregating results from all clients...")
-    
-    time.sleep(10)
-    
-    log_dir = f'/root/wls/redis/memtier_benchmark/log_{core}'
-    for hostname in hostnames:
-        run_remote_command(hostname, port, username, password, 
-                          f'bash {remote_script_file2} {log_dir}',
-                          collect_metrics=True)
+        if args.search:
+            rows = run_search(pool, args, config, run_name, launcher_file)
+        elif sweep:
+            rows = run_sweep(pool, args, config, run_name, launcher_file)
+        else:
+            results = run_benchmark_point(pool, args, config, args.core[0], args.size[0],
+                                          args.pipeline[0], launcher_file,
+                                          clients=args.clients[0])
+            for metrics in results:
+                benchmark_stats.add_result(metrics)
+            if args.summary_csv:
+                row = summarize_point(results)
+                row.update({'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                            'run_name': run_name, 'operation': args.operation,
+                            'core': args.core[0], 'size': args.size[0],
+                            'pipe': args.pipeline[0], 'status': 'ok' if results else 'failed'})
+                append_results_summary(args.summary_csv, [row])
+    finally:
+        benchmark_stats['ssh_connects'] = pool.connects
+        benchmark_stats['ssh_reconnects'] = pool.reconnects
+        pool.close_all()
+        if servers:
+            stop_local_servers(servers)
     
     benchmark_stats['end_time'] = datetime.now()
     
     # Print summary
     print()
-    print_summary(args, config)
+    if sweep:
+        print_sweep_summary(rows)
+        duration = (benchmark_stats['end_time'] - benchmark_stats['start_time']).total_seconds()
+        log_info(f"Sweep finished in {duration:.2f}s over {benchmark_stats['ssh_connects']} SSH connection(s)")
+    else:
+        print_summary(args, config, args.core[0], args.size[0], args.pipeline[0])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+memtier_benchmark Launcher
+Runs on a client host: spawns one memtier_benchmark per plan entry, pins
+each to its CPU with sched_setaffinity before exec, reaps them with wait4
+and prints one JSON report (exit status, resource usage, start/end skew per
+instance) on stdout. Every instance is forked, pinned and parked on a gate
+pipe first, then all are released at once: with --start-at at that
+wall-clock instant (host clock), so several hosts can start in lockstep.
+--stop kills the instances of an aborted run. Standard library only, so it can be
+uploaded as-is.
+
+Usage: python3 memtier_launcher.py --log-dir DIR --plan "CPU:SERVER:PORT ..." [--start-at EPOCH] -- <memtier args>
+       python3 memtier_launcher.py --stop [--memtier BINARY]
+Example: python3 memtier_launcher.py --log-dir /tmp/log_2 --plan "0:192.168.200.1:16001 1:192.168.200.1:16007" \
+             -- --threads=1 --test-time 100 --command=ping --clients=100
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+
+def parse_plan(value):
+    """Parse "cpu:server:port" entries separated by whitespace"""
+    plan = []
+    for entry in value.split():
+        cpu, rest = entry.split(':', 1)
+        server, port = rest.rsplit(':', 1)
+        plan.append({'cpu': int(cpu), 'server': server, 'port': int(port)})
+    return plan
+
+
+def prepare_log_dir(log_dir):
+    """Start from an empty log directory, as the bash launcher did"""
+    shutil.rmtree(log_dir, ignore_errors=True)
+    os.makedirs(log_dir)
+
+
+def kill_stale(binary):
+    """Kill memtier processes left over from an aborted run"""
+    if binary.endswith('.py'):
+        # Python engines run as "python3 <script>"; match that command line only
+        pattern = r'^\S*python\S* \S*' + os.path.basename(binary).replace('.', r'\.')
+        cmd = ['pkill', '-9', '-f', pattern]
+    else:
+        cmd = ['killall', '-9', os.path.basename(binary)]
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def engine_command(binary):
+    """argv prefix running the load generator; .py engines run under this interpreter"""
+    return [sys.executable, binary] if binary.endswith('.py') else [binary]
+
+
+def wait_until(start_at, spin=0.005):
+    """Sleep until the epoch time start_at, spinning for the last few ms.
+
+    Returns how early we were ready (negative when start_at had passed).
+    """
+    lead = start_at - time.time()
+    if lead > spin:
+        time.sleep(lead - spin)
+    while time.time() < start_at:
+        pass
+    return lead
+
+
+def memtier_command(entry, binary, memtier_args, log_dir, json_out=False):
+    """Full memtier command line for one plan entry"""
+    log_file = os.path.join(log_dir, 'log_%d' % entry['port'])
+    cmd = engine_command(binary) + ['-s', entry['server'], '-p', str(entry['port'])] + memtier_args + [
+        f"--out-file={log_file}"]
+    if json_out:
+        cmd.append(f"--json-out-file={log_file}.json")
+    return cmd
+
+
+def _exec_armed(cpu, cmd, gate, stderr, status):
+    """Child side of arm(): pin, redirect, wait for the gate, exec. Never returns."""
+    try:
+        os.close(gate[1])
+        os.sched_setaffinity(0, {cpu})
+        devnull = os.open(os.devnull, os.O_RDWR)
+        os.dup2(devnull, 0)
+        os.dup2(devnull, 1)
+        os.dup2(stderr, 2)
+        os.read(gate[0], 1)  # EOF once the parent closes the gate
+        os.write(status, b'T%.6f' % time.time())
+        os.execvp(cmd[0], cmd)
+    except BaseException as e:
+        try:
+            os.write(status, b'E' + str(e).encode(errors='replace'))
+        finally:
+            os._exit(127)
+
+
+def arm(entry, cmd, log_dir, gate):
+    """Fork one pinned instance that waits on the gate pipe before exec.
+
+    The fork, pinning and redirection are done up front, so opening the
+    gate only wakes the children to exec. Returns (pid, status_fd): the
+    child writes its exec time (or an error) to status_fd, which closes
+    on a successful exec.
+    """
+    status_r, status_w = os.pipe()
+    try:
+        stderr = os.open(os.path.join(log_dir, f"stderr_{entry['port']}"),
+                         os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    except OSError:
+        os.close(status_r)
+        os.close(status_w)
+        raise
+    try:
+        pid = os.fork()
+        if pid == 0:
+            _exec_armed(entry['cpu'], cmd, gate, stderr, status_w)
+    except OSError:
+        os.close(status_r)
+        raise
+    finally:
+        os.close(stderr)
+        os.close(status_w)
+    return pid, status_r
+
+
+def read_status(fd):
+    """Everything an armed child wrote to its status pipe, up to exec or exit"""
+    chunks = []
+    while True:
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    os.close(fd)
+    return b''.join(chunks)
+
+
+def reap(pending):
+    """Wait for every child with wait4, returning {pid: (status, rusage, end_time)}"""
+    finished = {}
+    while len(finished) < len(pending):
+        try:
+            pid, status, rusage = os.wait4(-1, 0)
+        except ChildProcessError:
+            break
+        if pid in pending:
+            finished[pid] = (status, rusage, time.time())
+    return finished
+
+
+def run(plan, binary, memtier_args, log_dir, start_at=None, json_out=False):
+    """Launch every plan entry and return the JSON-serializable report.
+
+    Every instance is forked and pinned first, blocked on one gate pipe;
+    closing the gate releases them all at once, at start_at (an epoch
+    time on this host's clock) when given, else as soon as all are armed.
+    """
+    prepare_log_dir(log_dir)
+    kill_stale(binary)
+    commands = [memtier_command(entry, binary, memtier_args, log_dir, json_out) for entry in plan]
+
+    gate = os.pipe()
+    armed = []
+    instances = []
+    for entry, cmd in zip(plan, commands):
+        record = dict(entry)
+        try:
+            pid, status = arm(entry, cmd, log_dir, gate)
+            armed.append((record, pid, status))
+        except OSError as e:
+            record.update({'pid': None, 'error': str(e), 'exit_code': None})
+        instances.append(record)
+    os.close(gate[0])
+    lead = wait_until(start_at) if start_at else None
+    os.close(gate[1])
+
+    launched = {}
+    for record, pid, status in armed:
+        stamp, _, error = read_status(status).partition(b'E')
+        if error or not stamp:
+            # Missing binary, or the CPU is offline / outside our cpuset
+            os.waitpid(pid, 0)
+            record.update({'pid': None, 'exit_code': None,
+                           'error': error.decode(errors='replace') or 'exited before exec'})
+            continue
+        record.update({'pid': pid, 'spawn_time': float(stamp[1:])})
+        launched[pid] = record
+
+    for pid, (status, rusage, ended) in reap(launched).items():
+        record = launched[pid]
+        record['end_time'] = ended
+        record['exit_code'] = os.WEXITSTATUS(status) if os.WIFEXITED(status) else None
+        record['signal'] = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+        record['utime'] = rusage.ru_utime
+        record['stime'] = rusage.ru_stime
+        record['maxrss_kb'] = rusage.ru_maxrss
+        record['nvcsw'] = rusage.ru_nvcsw
+        record['nivcsw'] = rusage.ru_nivcsw
+
+    spawns = [r['spawn_time'] for r in instances if 'spawn_time' in r]
+    ends = [r['end_time'] for r in instances if 'end_time' in r]
+    first_spawn = min(spawns, default=0.0)
+    for record in instances:
+        if 'spawn_time' in record:
+            record['start_offset'] = record['spawn_time'] - first_spawn
+        if 'end_time' in record:
+            record['duration'] = record['end_time'] - record['spawn_time']
+
+    return {
+        'host': socket.gethostname(),
+        'log_dir': log_dir,
+        'first_spawn': first_spawn,
+        'start_at': start_at,
+        'start_lead': lead,
+        'start_skew': (max(spawns) - min(spawns)) if spawns else 0.0,
+        'end_skew': (max(ends) - min(ends)) if ends else 0.0,
+        'failed': sum(1 for r in instances if r.get('exit_code') != 0),
+        'instances': instances,
+    }
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Launch pinned memtier_benchmark instances")
+    parser.add_argument('--plan', help='Whitespace-separated "cpu:server:port" entries')
+    parser.add_argument('--log-dir', help="Directory for memtier --out-file logs")
+    parser.add_argument('--memtier', default='memtier_benchmark',
+                        help="memtier_benchmark binary, or a memtier-compatible .py engine "
+                             "such as resp_loadgen.py")
+    parser.add_argument('--start-at', type=float, default=None,
+                        help="Epoch time (this host's clock) at which to start all instances")
+    parser.add_argument('--json-out', action='store_true',
+                        help="Also write memtier --json-out-file logs (per-second time series)")
+    parser.add_argument('--stop', action='store_true',
+                        help="Kill running instances of --memtier instead of launching")
+    parser.add_argument('memtier_args', nargs=argparse.REMAINDER,
+                        help="Arguments passed to every memtier instance (after --)")
+    args = parser.parse_args()
+    if args.memtier_args and args.memtier_args[0] == '--':
+        args.memtier_args = args.memtier_args[1:]
+    if not args.stop and not (args.plan and args.log_dir):
+        parser.error("--plan and --log-dir are required")
+    return args
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    if args.stop:
+        kill_stale(args.memtier)
+        return 0
+    report = run(parse_plan(args.plan), args.memtier, args.memtier_args, args.log_dir,
+                 start_at=args.start_at, json_out=args.json_out)
+    json.dump(report, sys.stdout)
+    sys.stdout.write('\n')
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
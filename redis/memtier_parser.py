@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+memtier_benchmark Result Parser
+Parses memtier --out-file text logs and --json-out-file output into
+per-command metrics (ops/sec, latency percentiles, KB/sec) and aggregates
+them across instances.
+
+Usage: python3 memtier_parser.py [--json] <log_dir_or_file> [...]
+Example: python3 memtier_parser.py --json /root/wls/redis/memtier_benchmark/log_288
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+# Normalized metric keys, in table order
+METRIC_KEYS = ['ops_sec', 'hits_sec', 'misses_sec', 'avg_latency',
+               'p50_latency', 'p99_latency', 'p999_latency', 'kb_sec']
+
+# Metrics that add up across instances; everything else is a latency
+THROUGHPUT_KEYS = ['ops_sec', 'hits_sec', 'misses_sec', 'kb_sec']
+LATENCY_KEYS = ['avg_latency', 'p50_latency', 'p99_latency', 'p999_latency']
+
+# memtier text table header -> normalized key
+# ("Latency" is the average column of memtier 1.x, which has no percentiles)
+TEXT_COLUMNS = {
+    'Ops/sec': 'ops_sec',
+    'Hits/sec': 'hits_sec',
+    'Misses/sec': 'misses_sec',
+    'Avg. Latency': 'avg_latency',
+    'Latency': 'avg_latency',
+    'p50 Latency': 'p50_latency',
+    'p99 Latency': 'p99_latency',
+    'p99.9 Latency': 'p999_latency',
+    'KB/sec': 'kb_sec',
+}
+
+# memtier JSON keys -> normalized key
+JSON_COLUMNS = {
+    'Ops/sec': 'ops_sec',
+    'Hits/sec': 'hits_sec',
+    'Misses/sec': 'misses_sec',
+    'Average Latency': 'avg_latency',
+    'Latency': 'avg_latency',
+    'KB/sec': 'kb_sec',
+}
+JSON_PERCENTILES = {
+    'p50.00': 'p50_latency',
+    'p99.00': 'p99_latency',
+    'p99.90': 'p999_latency',
+}
+
+HEADER_RE = re.compile(r'^Type\s+Ops/sec')
+COLUMN_SPLIT_RE = re.compile(r'\s{2,}')
+
+
+def _to_float(value):
+    """Convert a table cell to float; '---' and garbage become None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_memtier_text(text):
+    """Parse the stats table of a memtier --out-file log.
+
+    Returns {row_type: {metric: value}} for rows such as Sets, Gets, Waits
+    and Totals (or the command name for --command runs). When the log holds
+    several tables (e.g. BEST/WORST/AGGREGATED with --run-count), the last
+    one wins, which is the aggregated result.
+    """
+    rows = {}
+    columns = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if HEADER_RE.match(stripped):
+            # Header columns are separated by two or more spaces
+            columns = [TEXT_COLUMNS.get(name) for name in COLUMN_SPLIT_RE.split(stripped)[1:]]
+            rows = {}
+            continue
+        if columns is None or not stripped or stripped.startswith('-'):
+            continue
+        fields = stripped.split()
+        if len(fields) != len(columns) + 1:
+            # End of table (histogram section or next banner)
+            if rows:
+                columns = None
+            continue
+        metrics = {}
+        for key, value in zip(columns, fields[1:]):
+            if key:
+                metrics[key] = _to_float(value)
+        rows[fields[0]] = metrics
+    return rows
+
+
+def parse_memtier_json(data):
+    """Parse memtier --json-out-file output (dict or JSON text).
+
+    Uses the "ALL STATS" section and returns the same shape as
+    parse_memtier_text().
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    stats = data.get('ALL STATS', {})
+    rows = {}
+    for row_type, values in stats.items():
+        if not isinstance(values, dict) or row_type == 'Runtime':
+            continue
+        metrics = {}
+        for name, key in JSON_COLUMNS.items():
+            if name in values and key not in metrics:
+                metrics[key] = _to_float(values[name])
+        percentiles = values.get('Percentile Latencies', {})
+        for name, key in JSON_PERCENTILES.items():
+            if name in percentiles:
+                metrics[key] = _to_float(percentiles[name])
+        rows[row_type] = metrics
+    return rows
+
+
+def parse_memtier_series(data):
+    """Extract the per-second Totals series from memtier JSON output.
+
+    Returns {'start': epoch seconds or None, 'ops': [...], 'avg_latency':
+    [...], 'p99_latency': [...]}, one entry per second of the run, built
+    from the "Time-Serie" of the Totals row. Latencies are None for seconds
+    without requests. Returns None when the output has no time series (text
+    logs, old memtier versions).
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    stats = data.get('ALL STATS', {})
+    series = stats.get('Totals', {}).get('Time-Serie')
+    if not isinstance(series, dict) or not series:
+        return None
+    length = max(int(k) for k in series) + 1
+    result = {'ops': [0.0] * length, 'avg_latency': [None] * length, 'p99_latency': [None] * length}
+    for key, values in series.items():
+        second = int(key)
+        result['ops'][second] = _to_float(values.get('Count')) or 0.0
+        result['avg_latency'][second] = _to_float(values.get('Average Latency'))
+        result['p99_latency'][second] = _to_float(values.get('p99.00'))
+    start = _to_float(stats.get('Runtime', {}).get('Start time'))
+    result['start'] = start / 1000.0 if start else None
+    return result
+
+
+def merge_series(spans, origin):
+    """Merge per-instance series onto one per-second timeline.
+
+    spans is a list of {'start': epoch seconds, 'series': parse_memtier_series()
+    result}; second i of an instance lands in bucket floor(start + i - origin).
+    Ops are summed per bucket and latencies weighted by ops. Returns a list
+    of {'second', 'ops_sec', 'avg_latency', 'p99_latency', 'instances'}.
+    """
+    buckets = {}
+    for span in spans:
+        series = span['series']
+        for i, ops in enumerate(series['ops']):
+            second = int((span['start'] + i - origin) // 1)
+            bucket = buckets.setdefault(second, {'ops_sec': 0.0, 'instances': 0,
+                                                 'avg_latency': [0.0, 0.0], 'p99_latency': [0.0, 0.0]})
+            bucket['ops_sec'] += ops
+            bucket['instances'] += 1
+            for key in ('avg_latency', 'p99_latency'):
+                if series[key][i] is not None and ops > 0:
+                    bucket[key][0] += series[key][i] * ops
+                    bucket[key][1] += ops
+    timeline = []
+    for second in sorted(buckets):
+        bucket = buckets[second]
+        point = {'second': second, 'ops_sec': bucket['ops_sec'], 'instances': bucket['instances']}
+        for key in ('avg_latency', 'p99_latency'):
+            total, weight = bucket[key]
+            point[key] = total / weight if weight else None
+        timeline.append(point)
+    return timeline
+
+
+def steady_state(values, tolerance=0.1):
+    """Steady-state mean of a per-second throughput series.
+
+    The reference level is the median of the middle half of the series.
+    Warm-up ends at the first second within tolerance of that level and
+    the tail starts after the last such second; the mean is taken over the
+    span in between. Seconds inside the span that fall below the band are
+    counted as dips (mid-run collapses). Returns {'start', 'end', 'mean',
+    'cv', 'dips'} with end exclusive, or None for an empty series.
+    """
+    if not values:
+        return None
+    middle = sorted(values[len(values) // 4:len(values) - len(values) // 4] or values)
+    level = middle[len(middle) // 2]
+    floor = level * (1 - tolerance)
+    inside = [i for i, value in enumerate(values) if value >= floor]
+    if not inside or level <= 0:
+        return None
+    start, end = inside[0], inside[-1] + 1
+    steady = values[start:end]
+    mean = sum(steady) / len(steady)
+    variance = sum((value - mean) ** 2 for value in steady) / len(steady)
+    return {'start': start, 'end': end, 'mean': mean,
+            'cv': variance ** 0.5 / mean if mean else 0.0,
+            'dips': sum(1 for value in steady if value < floor)}
+
+
+def window_rate(series, start, window_start, window_end):
+    """Ops/sec of one instance over the seconds that lie inside a window.
+
+    series is the 'ops' list of parse_memtier_series(); start is when its
+    second 0 began. Only whole seconds fully inside [window_start,
+    window_end] count. Returns None if no whole second fits.
+    """
+    first = max(0, int(-(-(window_start - start) // 1)))
+    last = min(len(series), int((window_end - start) // 1))
+    if last <= first:
+        return None
+    return sum(series[first:last]) / (last - first)
+
+
+def parse_memtier_output(text):
+    """Parse memtier output, auto-detecting JSON vs text"""
+    if text.lstrip().startswith('{'):
+        return parse_memtier_json(text)
+    return parse_memtier_text(text)
+
+
+def parse_memtier_file(path):
+    """Parse one memtier log file"""
+    with open(path, errors='replace') as f:
+        return parse_memtier_output(f.read())
+
+
+def aggregate_instances(instances):
+    """Aggregate per-instance parse results into one result.
+
+    Throughput metrics (ops/sec, hits/sec, misses/sec, KB/sec) are summed.
+    Latencies are weighted by each instance's ops/sec for that row, so a
+    slow instance with few requests does not skew the average. Weighted
+    percentiles are an approximation; exact merging needs the histograms.
+    """
+    totals = {}
+    weights = {}
+    for rows in instances:
+        for row_type, metrics in rows.items():
+            row = totals.setdefault(row_type, {})
+            row_weights = weights.setdefault(row_type, {})
+            ops = metrics.get('ops_sec') or 0.0
+            for key in THROUGHPUT_KEYS:
+                if metrics.get(key) is not None:
+                    row[key] = row.get(key, 0.0) + metrics[key]
+            for key in LATENCY_KEYS:
+                if metrics.get(key) is not None and ops > 0:
+                    row[key] = row.get(key, 0.0) + metrics[key] * ops
+                    row_weights[key] = row_weights.get(key, 0.0) + ops
+    for row_type, row in totals.items():
+        for key, weight in weights[row_type].items():
+            row[key] = row[key] / weight
+    return totals
+
+
+def find_log_files(path):
+    """Return memtier log files under path (a file or a directory).
+
+    When an instance wrote both a text log and a JSON file (log_<port> and
+    log_<port>.json), only the JSON file is returned so it is counted once.
+    """
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for root, _, names in os.walk(path):
+        for name in sorted(names):
+            if name.startswith('log_') or name.endswith('.json'):
+                if name + '.json' in names:
+                    continue
+                files.append(os.path.join(root, name))
+    return files
+
+
+def parse_log_dir(path):
+    """Parse every instance log under path.
+
+    Returns {'instances': {file_name: rows}, 'aggregate': rows,
+    'instance_count': n, 'series': {file_name: series}}. Instances are keyed
+    without the .json suffix; 'series' only holds instances whose JSON had a
+    time series. Files without a stats table are skipped and listed under
+    'unparsed'.
+    """
+    instances = {}
+    series = {}
+    unparsed = []
+    for log_file in find_log_files(path):
+        with open(log_file, errors='replace') as f:
+            text = f.read()
+        rows = parse_memtier_output(text)
+        name = (os.path.relpath(log_file, path) if os.path.isdir(path)
+                else os.path.basename(log_file))
+        if name.endswith('.json'):
+            name = name[:-len('.json')]
+        if rows:
+            instances[name] = rows
+            if text.lstrip().startswith('{'):
+                instance_series = parse_memtier_series(text)
+                if instance_series:
+                    series[name] = instance_series
+        else:
+            unparsed.append(log_file)
+    return {
+        'instance_count': len(instances),
+        'instances': instances,
+        'series': series,
+        'aggregate': aggregate_instances(instances.values()),
+        'unparsed': unparsed,
+    }
+
+
+def summary_row(rows):
+    """Return the Totals row of a parse result, or {} if absent"""
+    return rows.get('Totals', {})
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Parse memtier_benchmark result logs")
+    parser.add_argument('paths', nargs='+', help="Log directories or files")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the aggregate as a single JSON document")
+    parser.add_argument('--per-instance', action='store_true',
+                        help="Include per-instance results in the output")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    results = {path: parse_log_dir(path) for path in args.paths}
+
+    if args.json:
+        if not args.per_instance:
+            for result in results.values():
+                result.pop('instances')
+                result.pop('series')
+        print(json.dumps(results))
+        return 0
+
+    for path, result in results.items():
+        print(f"{path}: {result['instance_count']} instances")
+        if args.per_instance:
+            for name, rows in result['instances'].items():
+                print(f"  {name:<24} {summary_row(rows).get('ops_sec') or 0:>15,.2f} ops/sec")
+        for row_type, metrics in result['aggregate'].items():
+            values = '  '.join(f"{key}={metrics[key]:.2f}" for key in METRIC_KEYS
+                               if metrics.get(key) is not None)
+            print(f"  {row_type:<8} {values}")
+    return 0 if any(r['instance_count'] for r in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Redis Benchmark Orchestration Core
+Pooled SSH connections, parallel fan-out to the memtier clients and
+structured result collection, shared by benchmark_unified.py and the
+per-operation entry points (benchmarkR.py, benchmarkW.py, benchmarkRW.py,
+benchmarkAliPing1.py). SSHConnectionPool (redis_bench.ssh) needs paramiko
+and is not imported here, so --local runs work without it.
+"""
+
+from .config import BENCHMARK_CONFIGS, PREFILL_KEY_MAXIMUM
+from .console import Colors, log_info, log_success, log_warning, log_error, print_header, print_separator
+from .local import LocalPool, local_config, local_plan, start_local_servers, stop_local_servers
+from .remote import (open_connections, distribute_scripts, run_remote_command, transfer_file_to_remote,
+                     sync_clocks)
+from .report import print_summary, print_sweep_summary
+from .results import collect_host_results, summarize_point
+from .runner import REMOTE_DIR, run_benchmark_point
+from .stats import StatsAggregator, PhaseTimer, benchmark_stats
+from .sweep import append_results_summary, run_search, run_sweep
+
+__all__ = [
+    'BENCHMARK_CONFIGS', 'PREFILL_KEY_MAXIMUM',
+    'Colors', 'log_info', 'log_success', 'log_warning', 'log_error', 'print_header', 'print_separator',
+    'LocalPool', 'local_config', 'local_plan', 'start_local_servers', 'stop_local_servers',
+    'open_connections', 'distribute_scripts', 'run_remote_command', 'transfer_file_to_remote',
+    'sync_clocks',
+    'print_summary', 'print_sweep_summary',
+    'collect_host_results', 'summarize_point',
+    'REMOTE_DIR', 'run_benchmark_point',
+    'StatsAggregator', 'PhaseTimer', 'benchmark_stats',
+    'append_results_summary', 'run_search', 'run_sweep',
+]
@@ -0,0 +1,52 @@
+"""
+Benchmark Configurations
+Client hosts, ports and memtier settings for each operation type.
+"""
+
+# Key range 0..N per instance loaded by the prefill, and then used by memtier,
+# when --key-maximum is not given (memtier's own default is 10,000,000)
+PREFILL_KEY_MAXIMUM = 1000000
+
+# Configuration for different benchmark types
+BENCHMARK_CONFIGS = {
+    'ping': {
+        'hostnames': ['192.168.200.2', '192.168.200.3', '192.168.200.4', 
+                      '192.168.200.5', '192.168.200.6', '192.168.200.7'],
+        'startports': ['16000', '16001', '16002', '16003', '16004', '16005'],
+        'redis_server': '192.168.200.1',
+        'test_time': 100,
+        'seq_step': 6,
+        'command': 'ping',
+        'ratio': None,
+    },
+    'read': {
+        'hostnames': ['192.168.100.2', '192.168.100.3'],
+        'startports': ['16000', '16001'],
+        'redis_server': '192.168.100.1',
+        'test_time': 80,
+        'seq_step': 2,
+        'command': None,
+        'ratio': '0:1',  # 100% read
+        'prefill': True,  # GETs must hit
+    },
+    'write': {
+        'hostnames': ['192.168.100.2', '192.168.100.3'],
+        'startports': ['16000', '16001'],
+        'redis_server': '192.168.100.1',
+        'test_time': 80,
+        'seq_step': 2,
+        'command': None,
+        'ratio': '1:0',  # 100% write
+    },
+    'readwrite': {
+        'hostnames': ['192.168.100.2', '192.168.100.3'],
+        'startports': ['16000', '16001'],
+        'redis_server': '192.168.100.1',
+        'test_time': 80,
+        'seq_step': 2,
+        'command': None,
+        'ratio': '1:1',  # 50/50 read/write
+        'prefill': True,
+    }
+}
+
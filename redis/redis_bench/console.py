@@ -0,0 +1,52 @@
+"""
+Console Output
+Colored, timestamped log lines and section headers shared by all entry points.
+"""
+
+import threading
+from datetime import datetime
+
+# Keeps multi-line remote output blocks from interleaving across threads
+output_lock = threading.Lock()
+
+# Color codes for terminal output
+class Colors:
+    HEADER = '\033[95m'
+    OKBLUE = '\033[94m'
+    OKCYAN = '\033[96m'
+    OKGREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+def log_info(message):
+    """Print info message"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{Colors.OKBLUE}[{timestamp}] [INFO]{Colors.ENDC} {message}")
+
+def log_success(message):
+    """Print success message"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{Colors.OKGREEN}[{timestamp}] [SUCCESS]{Colors.ENDC} {message}")
+
+def log_warning(message):
+    """Print warning message"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{Colors.WARNING}[{timestamp}] [WARNING]{Colors.ENDC} {message}")
+
+def log_error(message):
+    """Print error message"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"{Colors.FAIL}[{timestamp}] [ERROR]{Colors.ENDC} {message}")
+
+def print_separator(char='=', length=80):
+    """Print a separator line"""
+    print(char * length)
+
+def print_header(title):
+    """Print a formatted header"""
+    print(f"\n{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}{title.center(80)}{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.HEADER}{'='*80}{Colors.ENDC}\n")
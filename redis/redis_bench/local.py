@@ -0,0 +1,138 @@
+"""
+Local Loopback Mode
+Runs the redis-server instances and the memtier clients on this machine,
+on disjoint cores of the same NUMA nodes. LocalPool stands in for
+SSHConnectionPool, so launch, log streaming and parsing are unchanged.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+
+import redis_fleet
+import topology
+
+from .console import log_info, log_success, log_warning
+
+LOCAL_HOST = 'localhost'
+LOCAL_SERVER = '127.0.0.1'
+NODE_ROOT = '/sys/devices/system/node'
+
+class LocalPool:
+    """SSHConnectionPool stand-in that runs every command on this machine"""
+
+    def __init__(self):
+        self.connects = 0
+        self.reconnects = 0
+
+    def open_all(self, hostnames):
+        return []
+
+    def exec_command(self, hostname, command, timeout=None):
+        """Run a shell command locally, return (rc, stdout, stderr)"""
+        proc = subprocess.run(command, shell=True, capture_output=True, timeout=timeout)
+        return (proc.returncode, proc.stdout.decode(errors='replace'),
+                proc.stderr.decode(errors='replace'))
+
+    def stream_command(self, hostname, command, sink, chunk_size=1 << 20):
+        """Run a shell command locally, feeding stdout to sink in chunks"""
+        with tempfile.TemporaryFile() as errors:
+            proc = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=errors)
+            try:
+                for data in iter(lambda: proc.stdout.read(chunk_size), b''):
+                    sink(data)
+            finally:
+                proc.stdout.close()
+                exit_code = proc.wait()
+            errors.seek(0)
+            return exit_code, errors.read().decode(errors='replace')
+
+    def put(self, hostname, local_file, remote_file):
+        """Copy a file into place (no-op when it already is the same file)"""
+        os.makedirs(os.path.dirname(remote_file), exist_ok=True)
+        if not (os.path.exists(remote_file) and os.path.samefile(local_file, remote_file)):
+            shutil.copy(local_file, remote_file)
+
+    def close_all(self):
+        pass
+
+def numa_nodes():
+    """Return {node: [cpus]} for the CPUs this process may run on.
+
+    Read from sysfs; machines without NUMA information are one node 0.
+    """
+    allowed = os.sched_getaffinity(0)
+    nodes = {}
+    try:
+        names = os.listdir(NODE_ROOT)
+    except OSError:
+        names = []
+    for name in names:
+        if not (name.startswith('node') and name[4:].isdigit()):
+            continue
+        with open(os.path.join(NODE_ROOT, name, 'cpulist')) as f:
+            cpus = [cpu for cpu in topology.parse_cpu_list(f.read().strip()) if cpu in allowed]
+        if cpus:
+            nodes[int(name[4:])] = cpus
+    return nodes or {0: sorted(allowed)}
+
+def local_plan(count, port_base=16000):
+    """Pair count redis instances with memtier cores on the same NUMA node.
+
+    Each node's CPUs are split in half: redis-server takes the lower half,
+    memtier the upper half, so the two sets never overlap. Instances are
+    spread round-robin over the nodes and listen on port_base + 1, + 2, ...
+    like server_script.sh. Returns [{'port', 'node', 'server_cpu',
+    'client_cpu'}]; raises ValueError if the machine has too few cores.
+    """
+    slots = []
+    for node, cpus in sorted(numa_nodes().items()):
+        half = len(cpus) // 2
+        slots.append([(node, server, client) for server, client in zip(cpus[:half], cpus[half:])])
+    order = []
+    for i in range(max((len(s) for s in slots), default=0)):
+        order.extend(s[i] for s in slots if i < len(s))
+    if count > len(order):
+        raise ValueError(f"{count} local instances need {2 * count} cores, "
+                         f"only {2 * len(order)} usable")
+    return [{'port': port_base + j, 'node': node, 'server_cpu': server, 'client_cpu': client}
+            for j, (node, server, client) in enumerate(order[:count], start=1)]
+
+def start_local_servers(plan, redis_server='redis-server', timeout=30, state_dir=None):
+    """Start one redis-server per plan entry and wait until all answer PING.
+
+    Delegates to redis_fleet: instances start in parallel, pinned to their
+    server core and NUMA node, with persistence off. Returns the fleet state
+    directory for stop_local_servers().
+    """
+    state_dir = state_dir or redis_fleet.DEFAULT_STATE_DIR
+    if not shutil.which('numactl'):
+        log_warning("numactl not found; pinning redis-server to cores without memory binding")
+    instances = [{'port': e['port'], 'cpu': e['server_cpu'], 'node': e['node']} for e in plan]
+    result = redis_fleet.start_fleet(instances, {'appendonly': 'no'}, redis_server=redis_server,
+                                     state_dir=state_dir, timeout=timeout, host=LOCAL_SERVER)
+    if result['failed']:
+        stop_local_servers(state_dir)
+        raise RuntimeError(f"redis-server did not answer on ports {result['failed'][:8]}")
+    log_success(f"Started {len(plan)} local redis-server instances "
+                f"(ports {plan[0]['port']}-{plan[-1]['port']}) in {result['elapsed']:.2f}s")
+    return state_dir
+
+def stop_local_servers(state_dir, timeout=10):
+    """Stop the local redis-server fleet, killing any instance that lingers"""
+    if state_dir:
+        log_info(f"Stopped {redis_fleet.stop_fleet(state_dir, timeout)} local redis-server instances")
+
+def local_config(base, plan, remote_dir):
+    """BENCHMARK_CONFIGS-style dict for a loopback run of plan"""
+    config = dict(base)
+    config.update({
+        'hostnames': [LOCAL_HOST],
+        'startports': [str(plan[0]['port'] - 1)],
+        'seq_step': 1,
+        'redis_server': LOCAL_SERVER,
+        'local': plan,
+        'remote_dir': remote_dir,
+    })
+    return config
@@ -0,0 +1,68 @@
+"""
+Keyspace Prefill
+Loads the key range memtier will read into every redis instance of a point
+before the timed run (redis_prefill.py on each client, all hosts at once),
+and verifies the key counts with DBSIZE.
+"""
+
+import concurrent.futures
+import json
+import shlex
+
+from .console import log_info, log_success, log_warning, log_error, print_header
+from .stats import PhaseTimer
+
+def prefill_on_host(pool, hostname, prefill_file, entries, size, key_maximum):
+    """Run redis_prefill.py for entries on one host; returns its JSON report (None on failure)"""
+    plan_arg = ' '.join(f"{e['cpu']}:{e['ip']}:{e['port']}" for e in entries)
+    cmd = (f'python3 {prefill_file} --plan {shlex.quote(plan_arg)} --data-size {size} '
+           f'--key-maximum {key_maximum}')
+    try:
+        exit_code, output, error = pool.exec_command(hostname, cmd)
+        return json.loads(output)
+    except Exception as e:
+        log_error(f"Prefill failed on {hostname}: {e}")
+        return None
+
+def prefill_keyspace(pool, config, plan, size):
+    """Prefill the instances of plan ({hostname: entries}) with size-byte values.
+
+    Instances already filled at this size during this process are skipped
+    (config['prefilled'] tracks them). Returns False if any instance could
+    not be filled or DBSIZE came up short.
+    """
+    filled = config.setdefault('prefilled', {})
+    todo = {host: [e for e in entries if filled.get((e['ip'], e['port'])) != size]
+            for host, entries in plan.items()}
+    todo = {host: entries for host, entries in todo.items() if entries}
+    if not todo:
+        return True
+
+    key_maximum = config['key_maximum']
+    count = sum(len(entries) for entries in todo.values())
+    print_header(f"KEYSPACE PREFILL ({count} instances x {key_maximum + 1:,} keys, size={size})")
+    ok = True
+    with PhaseTimer('prefill') as timer:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(todo)) as executor:
+            futures = {executor.submit(prefill_on_host, pool, host, config['prefill_file'], entries,
+                                       size, key_maximum): host for host, entries in todo.items()}
+            for future in concurrent.futures.as_completed(futures):
+                host = futures[future]
+                report = future.result()
+                if report is None:
+                    ok = False
+                    continue
+                for r in report['instances']:
+                    if r.get('error') or r['set_errors'] or r.get('dbsize', 0) < r['keys']:
+                        ok = False
+                        log_warning(f"{host} -> {r['server']}:{r['port']}: DBSIZE {r.get('dbsize')} "
+                                    f"of {r['keys']:,} keys ({r['set_errors']} SET errors) "
+                                    f"{r.get('error', '')}")
+                    else:
+                        filled[(r['server'], r['port'])] = size
+                rate = report['keys'] * len(report['instances']) / max(report['seconds'], 1e-9)
+                log_info(f"{host}: {len(report['instances'])} instances filled in "
+                         f"{report['seconds']:.1f}s ({rate:,.0f} SET/s)")
+    if ok:
+        log_success(f"Keyspace prefill completed in {timer.duration:.2f}s")
+    return ok
@@ -0,0 +1,179 @@
+"""
+Remote Operations
+Parallel uploads, remote commands, log archive streaming and clock
+offset estimation over an SSHConnectionPool.
+"""
+
+import concurrent.futures
+import os
+import subprocess
+import tempfile
+import time
+
+from .console import Colors, output_lock, log_info, log_success, log_warning, log_error, print_header
+from .stats import benchmark_stats, PhaseTimer
+
+# Remote clock reads per host; the one with the shortest round trip is used
+CLOCK_SAMPLES = 5
+
+def open_connections(pool, hostnames):
+    """Phase 0: open persistent SSH connections; returns hosts that failed"""
+    print_header("PHASE 0: CONNECTION SETUP")
+    log_info(f"Opening SSH connections to {len(hostnames)} client servers...")
+    with PhaseTimer('connect') as timer:
+        failed_hosts = pool.open_all(hostnames)
+    if failed_hosts:
+        log_warning(f"Could not connect to: {', '.join(failed_hosts)}")
+    log_success(f"Connection setup completed in {timer.duration:.2f}s")
+    print()
+    return failed_hosts
+
+def transfer_file_to_remote(pool, hostname, local_file, remote_file):
+    """Transfer a file to a remote server via SFTP over the pooled connection"""
+    try:
+        log_info(f"Transferring {local_file} to {hostname}...")
+        pool.put(hostname, local_file, remote_file)
+        log_success(f"Transferred to {hostname}:{remote_file}")
+        benchmark_stats.increment('transfer_success')
+        return True
+    except Exception as e:
+        log_error(f"Failed to transfer to {hostname}: {e}")
+        benchmark_stats.increment('transfer_failed')
+        return False
+
+def run_remote_command(pool, hostname, command):
+    """Run a remote command via SSH over the pooled connection"""
+    try:
+        log_info(f"Executing command on {hostname}...")
+        exit_code, output, error = pool.exec_command(hostname, command)
+        
+        with output_lock:
+            print(f"\n{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
+            print(f"{Colors.BOLD}Remote Output from {hostname}:{Colors.ENDC}")
+            print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
+            if output.strip():
+                print(output)
+            if error.strip():
+                log_warning(f"Stderr from {hostname}:")
+                print(error)
+            print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}\n")
+        
+        if exit_code != 0:
+            log_warning(f"Command on {hostname} exited with code {exit_code}")
+        
+        benchmark_stats.increment('benchmark_success')
+        return True
+    except Exception as e:
+        log_error(f"Failed to execute on {hostname}: {e}")
+        benchmark_stats.increment('benchmark_failed')
+        return False
+
+def distribute_scripts(pool, hostnames, transfers):
+    """Phase 1: upload (local_file, remote_file) pairs to every host in parallel"""
+    print_header("PHASE 1: SCRIPT DISTRIBUTION")
+    log_info(f"Transferring scripts to {len(hostnames)} client servers...")
+    
+    with PhaseTimer('transfer') as timer:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames)) as executor:
+            futures = []
+            for hostname in hostnames:
+                for local_file, remote_file in transfers:
+                    futures.append(executor.submit(transfer_file_to_remote, pool, hostname,
+                                                  local_file, remote_file))
+            
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+    
+    log_success(f"Script distribution completed in {timer.duration:.2f}s")
+    print()
+
+def remote_archive_command(log_dir):
+    """Shell command that writes log_dir as a tar stream to stdout.
+
+    zstd is used when the client has it, gzip otherwise.
+    """
+    return (f'cd {log_dir} && if command -v zstd >/dev/null 2>&1; then '
+            f'tar -cf - . | zstd -q -1 -T0 -c; '
+            f'else tar -cf - . | gzip -1 -c; fi')
+
+def fetch_remote_logs(pool, hostname, log_dir, local_dir):
+    """Stream a client's memtier log directory into local_dir as one archive.
+
+    The tar+zstd stream goes straight from the SSH channel into a local
+    tar process, so no temporary archive is written on either side. tar's
+    stderr goes to a temporary file, so its warnings can never fill a pipe
+    and stall the stream.
+    """
+    os.makedirs(local_dir, exist_ok=True)
+    # Pick the decompressor from the magic bytes of the first chunk
+    extractor = None
+    received = 0
+
+    with tempfile.TemporaryFile() as extract_errors:
+        def sink(data):
+            nonlocal extractor, received
+            if extractor is None:
+                codec = '--zstd' if data[:4] == b'\x28\xb5\x2f\xfd' else '--gzip'
+                extractor = subprocess.Popen(['tar', '-x', codec, '-C', local_dir],
+                                             stdin=subprocess.PIPE, stderr=extract_errors)
+            extractor.stdin.write(data)
+            received += len(data)
+
+        try:
+            exit_code, error = pool.stream_command(hostname, remote_archive_command(log_dir), sink)
+        except BrokenPipeError:
+            # The local tar exited early; its own error is reported below
+            exit_code, error = None, ''
+        finally:
+            if extractor is not None:
+                try:
+                    extractor.stdin.close()
+                except BrokenPipeError:
+                    pass
+                extractor.wait()
+        if extractor is not None and extractor.returncode != 0:
+            extract_errors.seek(0)
+            raise RuntimeError(f"local extract failed (exit {extractor.returncode}): "
+                               f"{extract_errors.read().decode(errors='replace').strip()}")
+    if exit_code != 0 or extractor is None:
+        raise RuntimeError(f"remote archive failed (exit {exit_code}): {error.strip()}")
+    return received
+
+def estimate_clock_offset(pool, hostname, samples=CLOCK_SAMPLES):
+    """Estimate a host's clock offset (remote minus local, seconds) over SSH.
+
+    Each sample reads the remote clock in one exec round trip and assumes
+    it was read at the midpoint; the sample with the shortest round trip
+    wins. Returns (offset, uncertainty), uncertainty being half that trip.
+    """
+    best = None
+    for _ in range(samples):
+        t0 = time.time()
+        exit_code, output, error = pool.exec_command(hostname, 'date +%s.%N')
+        t1 = time.time()
+        if exit_code != 0:
+            raise RuntimeError(f"date failed (exit {exit_code}): {error.strip()}")
+        if best is None or t1 - t0 < best[1]:
+            best = (float(output) - (t0 + t1) / 2, t1 - t0)
+    return best[0], best[1] / 2
+
+def sync_clocks(pool, hostnames):
+    """Return {hostname: clock offset} for all hosts, measured in parallel.
+
+    Hosts whose clock cannot be read are assumed to be in sync (offset 0).
+    """
+    offsets = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames)) as executor:
+        futures = {executor.submit(estimate_clock_offset, pool, hostname): hostname
+                   for hostname in hostnames}
+        for future in concurrent.futures.as_completed(futures):
+            hostname = futures[future]
+            try:
+                offset, uncertainty = future.result()
+                offsets[hostname] = offset
+                log_info(f"Clock offset {hostname}: {offset * 1000:+.1f} ms "
+                         f"(±{uncertainty * 1000:.1f} ms)")
+            except Exception as e:
+                log_warning(f"Could not read the clock of {hostname}, assuming it is in sync: {e}")
+                offsets[hostname] = 0.0
+    return offsets
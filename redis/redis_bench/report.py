@@ -0,0 +1,128 @@
+"""
+Result Reports
+End-of-run summaries for single points and for sweeps.
+"""
+
+import memtier_parser
+
+from .console import Colors, log_success, log_warning, print_header, print_separator
+from .stats import benchmark_stats
+
+def print_summary(args, config, core, size, pipeline):
+    """Print final benchmark summary"""
+    print_header("BENCHMARK SUMMARY")
+    
+    duration = (benchmark_stats['end_time'] - benchmark_stats['start_time']).total_seconds()
+    
+    # Configuration summary
+    print(f"{Colors.BOLD}Configuration:{Colors.ENDC}")
+    print(f"  Operation Type:    {args.operation.upper()}")
+    print(f"  Cores:             {core}")
+    print(f"  Data Size:         {size} bytes")
+    print(f"  Pipeline Depth:    {pipeline}")
+    print(f"  Test Duration:     {config['test_time']}s per client")
+    print(f"  Client Servers:    {len(config['hostnames'])}")
+    if config['ratio']:
+        print(f"  Read/Write Ratio:  {config['ratio']}")
+    print()
+    
+    # Execution summary
+    print(f"{Colors.BOLD}Execution Summary:{Colors.ENDC}")
+    print(f"  Total Runtime:     {duration:.2f}s")
+    print(f"  File Transfers:    {Colors.OKGREEN}{benchmark_stats['transfer_success']} succeeded{Colors.ENDC}, "
+          f"{Colors.FAIL}{benchmark_stats['transfer_failed']} failed{Colors.ENDC}")
+    print(f"  Benchmark Runs:    {Colors.OKGREEN}{benchmark_stats['benchmark_success']} succeeded{Colors.ENDC}, "
+          f"{Colors.FAIL}{benchmark_stats['benchmark_failed']} failed{Colors.ENDC}")
+    print(f"  Result Collection: {Colors.OKGREEN}{benchmark_stats['collect_success']} succeeded{Colors.ENDC}, "
+          f"{Colors.FAIL}{benchmark_stats['collect_failed']} failed{Colors.ENDC}")
+    print(f"  SSH Connections:   {benchmark_stats['ssh_connects']} opened, "
+          f"{benchmark_stats['ssh_reconnects']} reconnected")
+    print()
+    
+    # Per-phase timing
+    if benchmark_stats['phase_timings']:
+        print(f"{Colors.BOLD}Phase Timings:{Colors.ENDC}")
+        for phase, seconds in benchmark_stats['phase_timings'].items():
+            print(f"  {phase.capitalize():<18} {seconds:>8.2f}s")
+        print()
+    
+    # Performance summary
+    results = benchmark_stats['results']
+    if results:
+        print(f"{Colors.BOLD}Performance Results:{Colors.ENDC}")
+        print(f"  {'Client':<20} {'Ops/sec':>15} {'Avg Lat':>9} {'p99 Lat':>9} {'KB/sec':>13}  Instances  Skew(ms)  Stragglers")
+        for result in results:
+            print(f"  {result['hostname']:<20} {result['iops']:>15,.2f} "
+                  f"{result.get('avg_latency', 0):>9.3f} {result.get('p99_latency', 0):>9.3f} "
+                  f"{result.get('kb_sec', 0):>13,.2f}  {result.get('instances', 'N/A'):>9}  "
+                  f"{result.get('start_skew', 0) * 1000:>8.1f}  {len(result.get('stragglers', []))}")
+        
+        # Throughput sums across hosts, latency is weighted by each host's ops/sec
+        overall = memtier_parser.aggregate_instances(r['commands'] for r in results)
+        totals = memtier_parser.summary_row(overall)
+        # Host figures are trimmed to the common measurement window when available
+        total_iops = sum(r['iops'] for r in results)
+        if total_iops > 0:
+            print(f"\n  {Colors.BOLD}{Colors.OKGREEN}Total Throughput:   {total_iops:>15,.2f} ops/sec{Colors.ENDC}")
+            print(f"  {Colors.BOLD}Average per Client: {total_iops/len(results):>15,.2f} ops/sec{Colors.ENDC}")
+            if all('steady_iops' in r for r in results):
+                steady_iops = sum(r['steady_iops'] for r in results)
+                print(f"  Steady-State:       {steady_iops:>15,.2f} ops/sec "
+                      f"(warm-up and tail excluded, {sum(r['dips'] for r in results)} dip(s))")
+            if any('run_iops' in r for r in results):
+                print(f"  Full-Run Throughput:{totals.get('ops_sec', 0):>15,.2f} ops/sec "
+                      f"(window {results[0]['window']:.1f}s)")
+            print(f"  Total Bandwidth:    {totals.get('kb_sec', 0):>15,.2f} KB/sec")
+            latencies = '  '.join(f"{label}={totals[key]:.3f}ms" for label, key in
+                                  [('avg', 'avg_latency'), ('p50', 'p50_latency'),
+                                   ('p99', 'p99_latency'), ('p99.9', 'p999_latency')]
+                                  if totals.get(key) is not None)
+            if latencies:
+                print(f"  Latency:            {latencies}")
+        
+        # Per-command split (Sets/Gets) for data benchmarks
+        for row_type in ('Sets', 'Gets'):
+            row = overall.get(row_type, {})
+            if row.get('ops_sec'):
+                print(f"  {row_type + ':':<19} {row['ops_sec']:>15,.2f} ops/sec, "
+                      f"avg {row.get('avg_latency', 0):.3f}ms, p99 {row.get('p99_latency', 0):.3f}ms")
+        
+        # Machine-readable per-client lines consumed by scaling.sh
+        print()
+        for result in results:
+            print(f"total number of IOPS for {result['instances']} Instance {result['iops']:.2f}")
+    else:
+        log_warning("No performance metrics collected")
+    
+    print()
+    print_separator('=', 80)
+    
+    # Status indicator
+    if (benchmark_stats['transfer_failed'] == 0 and benchmark_stats['benchmark_failed'] == 0
+            and benchmark_stats['collect_failed'] == 0):
+        log_success("All operations completed successfully!")
+    else:
+        log_warning("Some operations failed. Check logs above for details.")
+    
+    print_separator('=', 80)
+
+def print_sweep_summary(rows):
+    """Print the results table of a sweep or search (with CIs for repeated points)"""
+    print_header("SWEEP SUMMARY")
+    repeated = any(row.get('repeats') for row in rows)
+    ci_header = f" {'Runs':>4} {'CI Low':>16} {'CI High':>16}" if repeated else ""
+    print(f"  {'Core':>6} {'Size':>6} {'Pipe':>5} {'Clients':>7} {'Total IOPS':>16}{ci_header} "
+          f"{'Avg Lat':>9} {'p99 Lat':>9}  Status")
+    best = max((r for r in rows if r['status'] in ('ok', 'median')), key=lambda r: r['total_iops'],
+               default=None)
+    for row in rows:
+        marker = f" {Colors.OKGREEN}<- peak{Colors.ENDC}" if row is best else ""
+        ci = ""
+        if repeated:
+            ci = (f" {row.get('repeats', 0):>4} {row.get('ci_low') or 0:>16,.2f} "
+                  f"{row.get('ci_high') or 0:>16,.2f}")
+        print(f"  {row['core']:>6} {row['size']:>6} {row['pipe']:>5} {row.get('memtier_clients', ''):>7} "
+              f"{row['total_iops']:>16,.2f}{ci} "
+              f"{row.get('avg_latency') or 0:>9.3f} {row.get('p99_latency') or 0:>9.3f}  "
+              f"{row['status']}{marker}")
+    print()
@@ -0,0 +1,222 @@
+"""
+Result Collection
+Fetches and parses each host's memtier logs and reduces them to per-host
+metrics, measurement windows, time series and per-point summary rows.
+"""
+
+import csv
+import os
+import time
+
+import memtier_parser
+
+from .console import log_info, log_success, log_warning, log_error
+from .remote import fetch_remote_logs
+from .stats import benchmark_stats
+
+# Latency/bandwidth columns written per sweep point
+SWEEP_LATENCY_COLUMNS = ['avg_latency', 'p50_latency', 'p99_latency', 'p999_latency', 'kb_sec']
+
+# Instances below this fraction of their host's median ops/sec are stragglers
+STRAGGLER_RATIO = 0.8
+
+def collect_host_results(pool, hostname, log_dir, local_dir, launch_report=None):
+    """Pull one host's raw logs back and parse them locally.
+
+    launch_report is the host's memtier_launcher.py report, used to attach
+    start skew and to flag straggler instances. Returns the host's metrics
+    dict, or None if nothing could be collected.
+    """
+    try:
+        log_info(f"Fetching logs from {hostname}:{log_dir}...")
+        fetch_start = time.time()
+        received = fetch_remote_logs(pool, hostname, log_dir, local_dir)
+        result = memtier_parser.parse_log_dir(local_dir)
+        log_success(f"Fetched {result['instance_count']} instance logs from {hostname} "
+                    f"({received / 1024:.1f} KiB compressed, {time.time() - fetch_start:.2f}s) "
+                    f"-> {local_dir}")
+        if result['unparsed']:
+            log_warning(f"{len(result['unparsed'])} unparsable log(s) from {hostname}")
+        metrics = build_host_metrics(hostname, result['aggregate'], result['instance_count'])
+        if not metrics:
+            log_warning(f"No throughput found in logs from {hostname}")
+        elif launch_report:
+            metrics['spans'] = instance_spans(result['series'], launch_report)
+            metrics['start_skew'] = launch_report['start_skew']
+            metrics['failed_instances'] = launch_report['failed']
+            metrics['stragglers'] = find_stragglers(result['instances'], launch_report)
+            for s in metrics['stragglers']:
+                log_warning(f"Straggler on {hostname}: port {s['port']} (cpu {s['cpu']}) "
+                            f"{s['ops_sec']:,.0f} ops/sec vs host median {s['median']:,.0f}, "
+                            f"started +{s['start_offset']:.3f}s, exit {s['exit_code']}")
+        benchmark_stats.increment('collect_success')
+        return metrics
+    except Exception as e:
+        log_error(f"Failed to collect results from {hostname}: {e}")
+        benchmark_stats.increment('collect_failed')
+        return None
+
+def instance_spans(series, launch_report):
+    """Each launched instance's run interval on the orchestrator's clock.
+
+    Returns [{'port', 'start', 'end', 'series'}] where 'series' is the
+    instance's per-second series (None if its log had none). memtier's own start time
+    is preferred over the launcher's spawn time when the JSON log has it.
+    """
+    offset = launch_report.get('clock_offset', 0.0)
+    by_port = {}
+    for name, instance_series in series.items():
+        port = os.path.basename(name).rsplit('_', 1)[-1]
+        if port.isdigit():
+            by_port[int(port)] = instance_series
+    spans = []
+    for record in launch_report['instances']:
+        if 'end_time' not in record:
+            continue
+        instance_series = by_port.get(record['port'])
+        start = record['spawn_time']
+        if instance_series and instance_series['start']:
+            start = instance_series['start']
+        spans.append({'port': record['port'], 'start': start - offset,
+                      'end': record['end_time'] - offset,
+                      'series': instance_series})
+    return spans
+
+def apply_measurement_window(results):
+    """Trim every host's throughput to the interval when all instances ran.
+
+    The window runs from the last instance start to the first instance end
+    across all hosts (clock-offset corrected). Each host's 'iops' becomes
+    the sum of its instances' rates over the whole seconds inside that
+    window, with memtier's full-run figure kept as 'run_iops'. Hosts whose
+    logs lack per-second series keep the full-run figure. Returns the
+    window length in seconds, or None if no spans were collected.
+    """
+    spans = [span for r in results for span in r.get('spans', [])]
+    if not spans:
+        return None
+    window_start = max(span['start'] for span in spans)
+    window_end = min(span['end'] for span in spans)
+    window = max(0.0, window_end - window_start)
+    for r in results:
+        r['window'] = window
+        rates = [memtier_parser.window_rate(span['series']['ops'], span['start'],
+                                            window_start, window_end)
+                 if span['series'] else None for span in r.get('spans', [])]
+        if rates and None not in rates:
+            r['run_iops'] = r['iops']
+            r['iops'] = sum(rates)
+        else:
+            log_warning(f"{r['hostname']}: no per-second series, throughput not trimmed to the window")
+    return window
+
+def record_timeseries(results, path, origin, tolerance):
+    """Merge the per-second series of a point and compute steady-state throughput.
+
+    Writes one row per second (total ops/sec, weighted latencies, running
+    instances and each host's ops/sec) to path, with seconds counted from
+    origin. Each host gets 'steady_iops', 'steady_cv' and 'dips' from its
+    own series (see memtier_parser.steady_state). Returns the steady-state
+    dict of the combined series, or None if no series were collected.
+    """
+    host_spans = {r['hostname']: [span for span in r.get('spans', []) if span['series']]
+                  for r in results}
+    spans = [span for host in host_spans.values() for span in host]
+    if not spans:
+        return None
+    timeline = memtier_parser.merge_series(spans, origin)
+    host_ops = {}
+    for r in results:
+        if not host_spans[r['hostname']]:
+            continue
+        host_timeline = memtier_parser.merge_series(host_spans[r['hostname']], origin)
+        host_ops[r['hostname']] = {p['second']: p['ops_sec'] for p in host_timeline}
+        steady = memtier_parser.steady_state([p['ops_sec'] for p in host_timeline], tolerance)
+        if steady:
+            r['steady_iops'] = steady['mean']
+            r['steady_cv'] = steady['cv']
+            r['dips'] = steady['dips']
+    
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['second', 'ops_sec', 'avg_latency', 'p99_latency', 'instances']
+                        + [f'{hostname}_ops' for hostname in host_ops])
+        for point in timeline:
+            writer.writerow([point['second'], f"{point['ops_sec']:.0f}",
+                             '' if point['avg_latency'] is None else f"{point['avg_latency']:.3f}",
+                             '' if point['p99_latency'] is None else f"{point['p99_latency']:.3f}",
+                             point['instances']]
+                            + [f"{ops.get(point['second'], 0):.0f}" for ops in host_ops.values()])
+    
+    steady = memtier_parser.steady_state([p['ops_sec'] for p in timeline], tolerance)
+    if steady:
+        steady['first_second'] = timeline[steady['start']]['second']
+        steady['last_second'] = timeline[steady['end'] - 1]['second']
+    return steady
+
+def find_stragglers(instances, launch_report, ratio=STRAGGLER_RATIO):
+    """Instances whose ops/sec falls below ratio x the host median.
+
+    instances is memtier_parser's {log_<port>: rows} map; launch_report
+    supplies each instance's CPU, start offset and exit status.
+    """
+    ops = {}
+    for name, rows in instances.items():
+        port = os.path.basename(name).rsplit('_', 1)[-1]
+        if port.isdigit():
+            ops[int(port)] = memtier_parser.summary_row(rows).get('ops_sec') or 0.0
+    by_port = {r['port']: r for r in launch_report['instances']}
+    # Instances that produced no log at all are stragglers too
+    for port in by_port:
+        ops.setdefault(port, 0.0)
+    if not ops:
+        return []
+    values = sorted(ops.values())
+    median = values[len(values) // 2]
+    stragglers = []
+    for port, value in sorted(ops.items()):
+        if value < median * ratio:
+            record = by_port.get(port, {})
+            stragglers.append({'port': port, 'cpu': record.get('cpu'), 'ops_sec': value,
+                               'median': median, 'start_offset': record.get('start_offset', 0.0),
+                               'exit_code': record.get('exit_code')})
+    return stragglers
+
+def build_host_metrics(hostname, aggregate, instance_count):
+    """Build a per-host result entry from aggregated memtier rows"""
+    totals = memtier_parser.summary_row(aggregate)
+    if not totals.get('ops_sec'):
+        return None
+    metrics = {
+        'hostname': hostname,
+        'iops': totals['ops_sec'],
+        'instances': instance_count,
+        'commands': aggregate,
+    }
+    for key in memtier_parser.METRIC_KEYS:
+        if totals.get(key) is not None:
+            metrics[key] = totals[key]
+    return metrics
+
+def summarize_point(results):
+    """Reduce per-host metrics of one benchmark point to a single row"""
+    overall = memtier_parser.summary_row(
+        memtier_parser.aggregate_instances(r['commands'] for r in results))
+    # Host figures may be trimmed to the common window; sum those instead
+    total_iops = sum(r['iops'] for r in results)
+    row = {
+        'clients': len(results),
+        'instances': sum(r.get('instances', 0) for r in results),
+        'total_iops': total_iops,
+        'avg_iops_per_client': total_iops / len(results) if results else 0.0,
+    }
+    for key in SWEEP_LATENCY_COLUMNS:
+        row[key] = overall.get(key)
+    row['window'] = min((r['window'] for r in results if 'window' in r), default=None)
+    # Only meaningful when every host had a per-second series
+    if results and all('steady_iops' in r for r in results):
+        row['steady_iops'] = sum(r['steady_iops'] for r in results)
+        row['dips'] = sum(r['dips'] for r in results)
+    row['client_iops'] = {r['hostname']: r['iops'] for r in results}
+    return row
@@ -0,0 +1,236 @@
+"""
+Benchmark Runner
+Plans memtier instances across the clients, launches them in lockstep
+and collects the results of one benchmark point.
+"""
+
+import concurrent.futures
+import json
+import os
+import shlex
+import time
+from datetime import datetime
+
+import topology
+
+from .console import Colors, output_lock, log_info, log_success, log_warning, log_error, print_header
+from .prefill import prefill_keyspace
+from .remote import sync_clocks
+from .results import collect_host_results, apply_measurement_window, record_timeseries
+from .stats import benchmark_stats, PhaseTimer
+
+# Where the launcher and the per-point memtier logs live on the clients
+REMOTE_DIR = '/root/wls/redis/memtier_benchmark'
+
+# Seconds a launch may take beyond start delay + test time before the
+# orchestrator gives up on the host and stops its instances
+LAUNCH_GRACE = 120
+
+def build_plan(args, config, core):
+    """Return {hostname: [{cpu, ip, port}]} for core redis instances.
+
+    With a topology the plan is NUMA-aligned (topology.plan_clients); in
+    local mode the first core entries of the loopback plan are used;
+    otherwise it reproduces the legacy layout: host i drives ports
+    startport_i + 1, + 1 + seq_step, ... on cores 0, 1, 2, ...
+    """
+    if config.get('local'):
+        return {config['hostnames'][0]: [{'cpu': e['client_cpu'], 'ip': config['redis_server'],
+                                          'port': e['port']} for e in config['local'][:core]]}
+    if config.get('topology'):
+        plan = topology.plan_clients(config['topology'], args.operation, core)
+        if plan['cross_numa']:
+            log_warning(f"{plan['cross_numa']} of {core} instances are paired across NUMA nodes")
+        else:
+            log_info(f"All {core} instances are NUMA-aligned with their redis-server")
+        return {host: entries for host, entries in plan['hosts'].items() if entries}
+    
+    plan = {}
+    for hostname, startport in zip(config['hostnames'], config['startports']):
+        ports = range(int(startport) + 1, int(startport) + core + 1, config['seq_step'])
+        plan[hostname] = [{'cpu': x, 'ip': config['redis_server'], 'port': port}
+                          for x, port in enumerate(ports)]
+    return plan
+
+def memtier_arguments(config, size, pipeline, test_time, clients):
+    """memtier_benchmark flags shared by every instance of a point"""
+    memtier_args = ['--threads=1', f'--test-time={test_time}', f'--pipeline={pipeline}',
+                    f'--clients={clients}']
+    if config['command']:
+        memtier_args += ['--hide-histogram', f"--command={config['command']}", '--data-size=64']
+    else:
+        memtier_args += [f'--data-size={size}', f"--ratio={config['ratio']}"]
+        if config.get('key_maximum') is not None:
+            memtier_args.append(f"--key-maximum={config['key_maximum']}")
+    return memtier_args
+
+def stop_on_host(pool, hostname, launcher_file, engine=None):
+    """Kill a host's load generators after a failed or abandoned launch (best effort)"""
+    cmd = f'python3 {launcher_file} --stop'
+    if engine:
+        cmd += f' --memtier {shlex.quote(engine)}'
+    try:
+        pool.exec_command(hostname, cmd, timeout=30)
+        log_warning(f"Stopped the memtier instances on {hostname}")
+    except Exception as e:
+        log_error(f"Could not stop the memtier instances on {hostname}: {e}")
+
+def launch_on_host(pool, hostname, launcher_file, entries, log_dir, memtier_args, report_file,
+                   start_at=None, clock_offset=0.0, engine=None, timeout=None):
+    """Run memtier_launcher.py on a host and return its JSON report (None on failure).
+
+    start_at is the agreed start instant on the local clock; the host is
+    given it on its own clock (start_at + clock_offset) and the offset is
+    recorded in the report. The report is also saved to report_file, next
+    to the host's raw logs. engine replaces memtier_benchmark with another
+    memtier-compatible load generator (e.g. resp_loadgen.py) on the host.
+    If the launch fails or outlasts timeout, the host's instances are
+    stopped explicitly, since closing the SSH channel does not kill them.
+    """
+    plan_arg = ' '.join(f"{e['cpu']}:{e['ip']}:{e['port']}" for e in entries)
+    cmd = (f'python3 {launcher_file} --log-dir {shlex.quote(log_dir)} --json-out '
+           f'--plan {shlex.quote(plan_arg)}')
+    if start_at:
+        cmd += f' --start-at {start_at + clock_offset:.6f}'
+    if engine:
+        cmd += f' --memtier {shlex.quote(engine)}'
+    cmd += f' -- {" ".join(shlex.quote(a) for a in memtier_args)}'
+    try:
+        log_info(f"Arming {len(entries)} instances on {hostname}...")
+        exit_code, output, error = pool.exec_command(hostname, cmd, timeout=timeout)
+        report = json.loads(output)
+        report['clock_offset'] = clock_offset
+        os.makedirs(os.path.dirname(report_file), exist_ok=True)
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        with output_lock:
+            print(f"\n{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
+            print(f"{Colors.BOLD}Launcher Report from {hostname}:{Colors.ENDC}")
+            print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}")
+            durations = [r['duration'] for r in report['instances'] if 'duration' in r]
+            print(f"  Instances:   {len(report['instances'])} ({report['failed']} failed)")
+            if report.get('start_lead') is not None:
+                print(f"  Armed:       {report['start_lead']:.2f}s before the start instant")
+            print(f"  Start skew:  {report['start_skew'] * 1000:.1f} ms")
+            print(f"  End skew:    {report['end_skew'] * 1000:.1f} ms")
+            if durations:
+                print(f"  Duration:    {min(durations):.2f}s - {max(durations):.2f}s")
+            for r in report['instances']:
+                if r.get('exit_code') != 0:
+                    print(f"  {Colors.FAIL}port {r['port']} (cpu {r['cpu']}): exit {r.get('exit_code')} "
+                          f"signal {r.get('signal')} {r.get('error', '')}{Colors.ENDC}")
+            if error.strip():
+                log_warning(f"Stderr from {hostname}:")
+                print(error)
+            print(f"{Colors.OKCYAN}{'─'*80}{Colors.ENDC}\n")
+        
+        if report['failed']:
+            log_warning(f"{report['failed']} memtier instance(s) failed on {hostname}")
+        if report.get('start_lead') is not None and report['start_lead'] < 0:
+            log_warning(f"{hostname} was armed {-report['start_lead']:.2f}s after the start "
+                        f"instant; raise --start-delay")
+        benchmark_stats.increment('benchmark_success')
+        return report
+    except Exception as e:
+        log_error(f"Failed to execute on {hostname}: {e}")
+        benchmark_stats.increment('benchmark_failed')
+        stop_on_host(pool, hostname, launcher_file, engine)
+        return None
+
+def run_benchmark_point(pool, args, config, core, size, pipeline, launcher_file,
+                        test_time=None, clients=100):
+    """Run one (core, size, pipeline) point on all clients and collect results.
+
+    test_time defaults to the operation's configured duration; clients is
+    memtier's --clients per instance. Returns the list of per-host metrics
+    collected for this point.
+    """
+    test_time = test_time or config['test_time']
+    plan = build_plan(args, config, core)
+    hostnames = [h for h in config['hostnames'] if h in plan]
+    memtier_args = memtier_arguments(config, size, pipeline, test_time, clients)
+    
+    # Reads against empty instances would only measure misses
+    if config.get('prefill_file') and not prefill_keyspace(pool, config, plan, size):
+        log_error("Keyspace prefill incomplete; skipping this point")
+        return []
+    
+    # Phase 2: Execute benchmarks; each host's results are collected as
+    # soon as its memtier processes exit (the launcher waits on them)
+    print_header(f"PHASE 2: BENCHMARK EXECUTION (core={core} size={size} pipe={pipeline})")
+    log_info(f"Starting benchmark on {len(hostnames)} clients ({clients} connections per instance)...")
+    log_info(f"Estimated time: ~{test_time + args.start_delay + 20}s")
+    
+    # Every host arms its instances, then all start at one agreed instant
+    offsets = sync_clocks(pool, hostnames)
+    start_at = time.time() + args.start_delay
+    log_info(f"All clients start at {datetime.fromtimestamp(start_at).strftime('%H:%M:%S.%f')[:-3]} "
+             f"(in {args.start_delay:.1f}s)")
+    
+    log_dir = f"{config.get('remote_dir', REMOTE_DIR)}/log_{core}"
+    run_dir = os.path.join(args.results_dir, datetime.now().strftime('%Y-%m-%d_%H-%M-%S') +
+                           f'_{args.operation}_core-{core}_size-{size}_pipe-{pipeline}'
+                           f'_clients-{clients}_time-{test_time}')
+    log_info(f"Raw memtier logs will be saved to: {run_dir}")
+    
+    bench_executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames))
+    collect_executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(hostnames))
+    collect_futures = []
+    results = []
+    try:
+        with PhaseTimer('benchmark') as timer:
+            futures = {}
+            for hostname in hostnames:
+                futures[bench_executor.submit(launch_on_host, pool, hostname, launcher_file,
+                                              plan[hostname], log_dir, memtier_args,
+                                              os.path.join(run_dir, f'{hostname}.launch.json'),
+                                              start_at, offsets[hostname],
+                                              config.get('engine'),
+                                              args.start_delay + test_time + LAUNCH_GRACE)] = hostname
+            
+            for future in concurrent.futures.as_completed(futures):
+                hostname = futures[future]
+                report = future.result()
+                if report:
+                    collect_futures.append(collect_executor.submit(
+                        collect_host_results, pool, hostname, log_dir,
+                        os.path.join(run_dir, hostname), report))
+        
+        log_success(f"Benchmark execution completed in {timer.duration:.2f}s")
+        print()
+        
+        # Phase 3: Wait for the collections still in flight
+        print_header("PHASE 3: RESULTS COLLECTION")
+        log_info("Aggregating results from all clients...")
+        
+        with PhaseTimer('collect') as timer:
+            for future in concurrent.futures.as_completed(collect_futures):
+                metrics = future.result()
+                if metrics:
+                    results.append(metrics)
+        log_success(f"Results collection completed {timer.duration:.2f}s after the last benchmark")
+    finally:
+        bench_executor.shutdown(wait=True)
+        collect_executor.shutdown(wait=True)
+    
+    # Keep the table in configured client order regardless of finish order
+    results.sort(key=lambda r: hostnames.index(r['hostname']))
+    
+    window = apply_measurement_window(results)
+    if window is not None:
+        log_info(f"Measurement window: {window:.1f}s of {test_time}s with all "
+                 f"{sum(r['instances'] for r in results)} instances running")
+        if window < test_time * 0.9:
+            log_warning("Less than 90% of the test ran with every instance active")
+    
+    steady = record_timeseries(results, os.path.join(run_dir, 'timeseries.csv'), start_at,
+                               args.steady_tolerance / 100.0)
+    if steady:
+        log_info(f"Steady state: {steady['mean']:,.2f} ops/sec over seconds "
+                 f"{steady['first_second']}-{steady['last_second']} (cv {steady['cv'] * 100:.1f}%)")
+        if steady['dips']:
+            log_warning(f"Throughput dipped below the steady band for {steady['dips']} second(s)")
+    for r in results:
+        r.pop('spans', None)
+    return results
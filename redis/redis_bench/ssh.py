@@ -0,0 +1,167 @@
+"""
+SSH Connection Pool
+One persistent, health-checked paramiko connection per client host.
+"""
+
+import concurrent.futures
+import socket
+import threading
+
+import paramiko
+
+from .console import log_success, log_warning, log_error
+
+class SSHConnectionPool:
+    """Persistent SSH connections keyed by hostname.
+
+    One connection is opened per client host and reused for SFTP uploads,
+    benchmark execution and result collection. Connections are health-checked
+    before each use and transparently re-established if the transport died.
+    """
+
+    def __init__(self, port, username, password, timeout=10, keepalive=30):
+        self.port = port
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.keepalive = keepalive
+        self.clients = {}
+        self.connects = 0
+        self.reconnects = 0
+        self._lock = threading.Lock()
+        self._host_locks = {}
+
+    def _host_lock(self, hostname):
+        with self._lock:
+            return self._host_locks.setdefault(hostname, threading.Lock())
+
+    def _connect(self, hostname):
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(hostname, port=self.port, username=self.username,
+                       password=self.password, timeout=self.timeout)
+        transport = client.get_transport()
+        if self.keepalive:
+            transport.set_keepalive(self.keepalive)
+        with self._lock:
+            self.connects += 1
+        return client
+
+    @staticmethod
+    def is_alive(client):
+        """Return True if the client's transport is still usable"""
+        transport = client.get_transport() if client else None
+        if transport is None or not transport.is_active():
+            return False
+        try:
+            # Cheap round-trip-free probe: fails fast on a half-closed socket
+            transport.send_ignore()
+            return True
+        except (paramiko.SSHException, EOFError, OSError):
+            return False
+
+    def get(self, hostname):
+        """Return a healthy SSH client for hostname, (re)connecting if needed"""
+        with self._host_lock(hostname):
+            client = self.clients.get(hostname)
+            if self.is_alive(client):
+                return client
+            if client is not None:
+                log_warning(f"SSH connection to {hostname} is dead, reconnecting...")
+                client.close()
+                with self._lock:
+                    self.reconnects += 1
+            client = self._connect(hostname)
+            self.clients[hostname] = client
+            return client
+
+    def invalidate(self, hostname):
+        """Drop the cached connection so the next get() reconnects"""
+        with self._host_lock(hostname):
+            client = self.clients.pop(hostname, None)
+        if client is not None:
+            client.close()
+
+    def open_all(self, hostnames):
+        """Connect to every host in parallel; return the hosts that failed"""
+        failed = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(len(hostnames), 1)) as executor:
+            futures = {executor.submit(self.get, hostname): hostname for hostname in hostnames}
+            for future in concurrent.futures.as_completed(futures):
+                hostname = futures[future]
+                try:
+                    future.result()
+                    log_success(f"SSH connection established to {hostname}")
+                except Exception as e:
+                    log_error(f"Failed to connect to {hostname}: {e}")
+                    failed.append(hostname)
+        return failed
+
+    def run(self, hostname, operation):
+        """Run operation(client) with one reconnect-and-retry on SSH failure.
+
+        A command timeout is not retried: the command may still be running.
+        """
+        try:
+            return operation(self.get(hostname))
+        except socket.timeout:
+            raise
+        except (paramiko.SSHException, EOFError, OSError):
+            self.invalidate(hostname)
+            return operation(self.get(hostname))
+
+    def put(self, hostname, local_file, remote_file):
+        """Upload a file over the pooled connection"""
+        def _put(client):
+            sftp = client.open_sftp()
+            try:
+                sftp.put(local_file, remote_file)
+            finally:
+                sftp.close()
+        self.run(hostname, _put)
+
+    def exec_command(self, hostname, command, timeout=None):
+        """Execute a command over the pooled connection, return (rc, stdout, stderr)"""
+        def _exec(client):
+            stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
+            output = stdout.read().decode()
+            error = stderr.read().decode()
+            return stdout.channel.recv_exit_status(), output, error
+        return self.run(hostname, _exec)
+
+    def stream_command(self, hostname, command, sink, chunk_size=1 << 20, poll_interval=0.1):
+        """Execute a command and feed its stdout to sink(bytes) as it arrives.
+
+        Returns (rc, stderr). stderr is drained while stdout streams, so a
+        command that writes a lot of it cannot stall on a full channel
+        window. Not retried on failure, since sink may already have
+        consumed part of the stream.
+        """
+        channel = self.get(hostname).get_transport().open_session()
+        try:
+            channel.settimeout(poll_interval)
+            channel.exec_command(command)
+            error = bytearray()
+            while True:
+                while channel.recv_stderr_ready():
+                    error += channel.recv_stderr(chunk_size)
+                try:
+                    data = channel.recv(chunk_size)
+                except socket.timeout:
+                    continue
+                if not data:
+                    break
+                sink(data)
+            channel.settimeout(None)
+            error += channel.makefile_stderr().read()
+            return channel.recv_exit_status(), error.decode(errors='replace')
+        finally:
+            channel.close()
+
+    def close_all(self):
+        """Close every pooled connection"""
+        with self._lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            client.close()
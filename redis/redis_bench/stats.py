@@ -0,0 +1,78 @@
+"""
+Run Statistics
+Thread-safe counters, results and phase timings of one benchmark process.
+"""
+
+import threading
+import time
+
+# Global statistics tracking
+class StatsAggregator:
+    """Thread-safe benchmark statistics shared by the phase thread pools.
+
+    Counters, results and phase timings are only mutated under a lock so
+    concurrent transfers, benchmark runs and collections never lose updates.
+    Reads return snapshots, so callers can iterate without holding the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {
+            'start_time': None,
+            'end_time': None,
+            'transfer_success': 0,
+            'transfer_failed': 0,
+            'benchmark_success': 0,
+            'benchmark_failed': 0,
+            'collect_success': 0,
+            'collect_failed': 0,
+            'results': [],
+            'phase_timings': {},
+            'ssh_connects': 0,
+            'ssh_reconnects': 0
+        }
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = self._data[key]
+            if isinstance(value, (list, dict)):
+                return value.copy()
+            return value
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def increment(self, key, amount=1):
+        """Atomically add amount to a counter"""
+        with self._lock:
+            self._data[key] += amount
+
+    def add_result(self, metrics):
+        """Append one host's parsed metrics"""
+        with self._lock:
+            self._data['results'].append(metrics)
+
+    def add_timing(self, phase, seconds):
+        """Accumulate wall time for a phase"""
+        with self._lock:
+            timings = self._data['phase_timings']
+            timings[phase] = timings.get(phase, 0.0) + seconds
+
+benchmark_stats = StatsAggregator()
+
+class PhaseTimer:
+    """Context manager recording wall time of a phase in benchmark_stats"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.time() - self.start
+        benchmark_stats.add_timing(self.name, self.duration)
+        return False
@@ -0,0 +1,343 @@
+"""
+Sweeps and Saturation Search
+Runs grids of benchmark points and golden-section searches over
+pipeline depth and client count, writing results tables as it goes.
+"""
+
+import csv
+import math
+import os
+import random
+import statistics
+import time
+from datetime import datetime
+
+from .console import log_info, log_success, log_warning, print_header
+from .results import SWEEP_LATENCY_COLUMNS, summarize_point
+from .runner import run_benchmark_point
+
+# Golden-section split points used by the saturation search
+GOLDEN_HIGH = (5 ** 0.5 - 1) / 2
+GOLDEN_LOW = 1 - GOLDEN_HIGH
+
+class SweepTable:
+    """Incrementally written CSV table of sweep results.
+
+    Each row is flushed as soon as its point finishes, so an interrupted
+    sweep still leaves every completed point on disk.
+    """
+
+    def __init__(self, path, hostnames):
+        self.path = path
+        self.hostnames = hostnames
+        self.columns = (['timestamp', 'run_name', 'operation', 'core', 'size', 'pipe',
+                         'memtier_clients', 'test_time', 'window', 'status', 'clients', 'instances',
+                         'total_iops', 'avg_iops_per_client', 'steady_iops', 'dips']
+                        + SWEEP_LATENCY_COLUMNS + ['duration', 'repeat', 'repeats', 'ci_low',
+                                                   'ci_high', 'ci_coverage']
+                        + [f'client{i + 1}_iops' for i in range(len(hostnames))])
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+
+    def write(self, row):
+        record = dict(row)
+        for i, hostname in enumerate(self.hostnames):
+            record[f'client{i + 1}_iops'] = row.get('client_iops', {}).get(hostname, 0)
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def append_results_summary(path, rows):
+    """Append completed points to the global results_summary.csv history"""
+    columns = ['timestamp', 'run_name', 'operation', 'core', 'size', 'pipe',
+               'total_iops', 'avg_iops_per_client']
+    new_file = not os.path.exists(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+            log_info(f"Global results summary created: {path}")
+        for row in rows:
+            if row['status'] == 'ok':
+                writer.writerow({**row, 'total_iops': f"{row['total_iops']:.2f}",
+                                 'avg_iops_per_client': f"{row['avg_iops_per_client']:.2f}"})
+
+def is_plateau(history, gain_pct, patience):
+    """Return True once the last `patience` points failed to beat the prior best.
+
+    history is the list of total_iops values of the successful points of one
+    core sweep, in order.
+    A point "fails" if it does not exceed the best earlier point by at least
+    gain_pct percent; a drop always counts as a failure.
+    """
+    if len(history) <= patience:
+        return False
+    best = max(history[:-patience])
+    threshold = best * (1 + gain_pct / 100.0)
+    return all(value < threshold for value in history[-patience:])
+
+def measure_point(pool, args, config, run_name, launcher_file, core, size, pipe,
+                  clients, test_time=None, status='ok'):
+    """Run one point and return its results-table row"""
+    point_start = time.time()
+    results = run_benchmark_point(pool, args, config, core, size, pipe, launcher_file,
+                                  test_time=test_time, clients=clients)
+    row = summarize_point(results)
+    row.update({
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'run_name': run_name,
+        'operation': args.operation,
+        'core': core,
+        'size': size,
+        'pipe': pipe,
+        'memtier_clients': clients,
+        'test_time': test_time or config['test_time'],
+        'status': status if results else 'failed',
+        'duration': f"{time.time() - point_start:.1f}",
+    })
+    log_success(f"core={core} size={size} pipe={pipe} clients={clients}: "
+                f"{row['total_iops']:,.2f} ops/sec")
+    return row
+
+def run_sweep(pool, args, config, run_name, launcher_file):
+    """Run the core/size/pipeline/clients grid over one set of connections.
+
+    Core counts are swept innermost and in ascending order so that, with
+    --plateau-gain, the remaining larger core counts of a series are
+    skipped once throughput stops improving. With --repeat the grid runs
+    in randomized repetition rounds instead (run_repeated_sweep).
+    """
+    sweep_csv = args.sweep_csv or os.path.join(
+        args.results_dir, f'sweep_{args.operation}_{run_name}.csv')
+    table = SweepTable(sweep_csv, config['hostnames'])
+    log_info(f"Sweep results table: {sweep_csv}")
+    
+    if args.repeat > 1:
+        measured = []
+        try:
+            return run_repeated_sweep(pool, args, config, run_name, launcher_file, table, measured)
+        finally:
+            table.close()
+            if args.summary_csv:
+                append_results_summary(args.summary_csv, measured)
+    
+    cores = sorted(set(args.core))
+    points = [(pipe, size, clients) for pipe in args.pipeline for size in args.size
+              for clients in args.clients]
+    total = len(points) * len(cores)
+    rows = []
+    done = 0
+    try:
+        for pipe, size, clients in points:
+            history = []
+            for core in cores:
+                if args.plateau_gain is not None and is_plateau(
+                        history, args.plateau_gain, args.plateau_patience):
+                    log_warning(f"Throughput plateaued for pipe={pipe} size={size} "
+                                f"clients={clients}; skipping core={core}")
+                    row = {'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                           'run_name': run_name, 'operation': args.operation,
+                           'core': core, 'size': size, 'pipe': pipe,
+                           'memtier_clients': clients, 'status': 'skipped',
+                           'total_iops': 0.0, 'client_iops': {}}
+                    table.write(row)
+                    rows.append(row)
+                    continue
+                
+                if done:
+                    time.sleep(args.cooldown)
+                done += 1
+                log_info(f"Sweep point {done}/{total}: core={core} size={size} pipe={pipe} "
+                         f"clients={clients}")
+                row = measure_point(pool, args, config, run_name, launcher_file,
+                                    core, size, pipe, clients)
+                table.write(row)
+                rows.append(row)
+                # A failed point says nothing about scaling; it must not end the series
+                if row['status'] == 'ok':
+                    history.append(row['total_iops'])
+    finally:
+        table.close()
+        if args.summary_csv:
+            append_results_summary(args.summary_csv, rows)
+    return rows
+
+def median_ci(values, confidence):
+    """Distribution-free confidence interval of the median.
+
+    Uses order statistics: [x(k+1), x(n-k)] covers the true median with
+    probability 1 - 2 * P(Binomial(n, 1/2) <= k), for the largest k that
+    keeps this at or above confidence. Returns (median, low, high,
+    coverage); with too few samples for the requested confidence the
+    interval is [min, max] and coverage is below it.
+    """
+    data = sorted(values)
+    n = len(data)
+    k, tail = 0, 0.5 ** n
+    while k + 1 <= (n - 1) // 2 and 1 - 2 * (tail + math.comb(n, k + 1) * 0.5 ** n) >= confidence:
+        k += 1
+        tail += math.comb(n, k) * 0.5 ** n
+    return statistics.median(data), data[k], data[n - 1 - k], 1 - 2 * tail
+
+def run_repeated_sweep(pool, args, config, run_name, launcher_file, table, measured):
+    """Measure every grid point up to --repeat times in randomized rounds.
+
+    Each round runs the points still open once, in a fresh random order
+    (--seed), so slow drift of the lab spreads evenly over all points. A
+    point closes once it has --min-repeat samples and its median CI at
+    --confidence is within +/- --ci-width percent of the median. Every
+    repetition is written to the table and appended to measured; the
+    returned rows are the per-point medians (status 'median') with their CI.
+    """
+    rng = random.Random(args.seed)
+    points = [(core, size, pipe, clients) for core in sorted(set(args.core)) for size in args.size
+              for pipe in args.pipeline for clients in args.clients]
+    samples = {point: [] for point in points}
+    last = {}
+    open_points = list(points)
+    runs = 0
+    for repeat in range(1, args.repeat + 1):
+        order = list(open_points)
+        rng.shuffle(order)
+        print_header(f"REPETITION ROUND {repeat}/{args.repeat} ({len(order)} points)")
+        for core, size, pipe, clients in order:
+            if runs:
+                time.sleep(args.cooldown)
+            runs += 1
+            log_info(f"Run {runs}: core={core} size={size} pipe={pipe} clients={clients} "
+                     f"(repetition {repeat})")
+            row = measure_point(pool, args, config, run_name, launcher_file, core, size, pipe,
+                                clients)
+            row['repeat'] = repeat
+            table.write(row)
+            measured.append(row)
+            if row['status'] == 'ok':
+                samples[(core, size, pipe, clients)].append(row['total_iops'])
+                last[(core, size, pipe, clients)] = row
+        
+        for point in list(open_points):
+            values = samples[point]
+            if len(values) < max(2, args.min_repeat):
+                continue
+            center, low, high, coverage = median_ci(values, args.confidence)
+            if coverage >= args.confidence and center and (high - low) / 2 <= center * args.ci_width / 100:
+                log_success(f"core={point[0]} size={point[1]} pipe={point[2]} clients={point[3]}: "
+                            f"{center:,.2f} ops/sec [{low:,.2f}, {high:,.2f}] after {len(values)} runs")
+                open_points.remove(point)
+        if not open_points:
+            break
+    
+    if open_points:
+        log_warning(f"{len(open_points)} point(s) did not reach +/-{args.ci_width}% at "
+                    f"{args.confidence * 100:.0f}% confidence within {args.repeat} runs")
+    medians = []
+    for point in points:
+        core, size, pipe, clients = point
+        values = samples[point]
+        row = dict(last.get(point, {}))
+        row.update({'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'run_name': run_name,
+                    'operation': args.operation, 'core': core, 'size': size, 'pipe': pipe,
+                    'memtier_clients': clients, 'repeat': '', 'repeats': len(values)})
+        if values:
+            center, low, high, coverage = median_ci(values, args.confidence)
+            row.update({'status': 'median', 'total_iops': center, 'ci_low': low, 'ci_high': high,
+                        'ci_coverage': f"{coverage:.3f}"})
+        else:
+            row.update({'status': 'failed', 'total_iops': 0.0})
+        table.write(row)
+        medians.append(row)
+    log_info(f"{runs} runs for {len(points)} points "
+             f"({len(points) * args.repeat - runs} saved by early stopping)")
+    return medians
+
+def search_unimodal(candidates, evaluate):
+    """Golden-section search for the maximum of evaluate() over sorted candidates.
+
+    Assumes the objective rises to a single peak and then falls (or
+    flattens), which holds for throughput vs. pipeline depth and vs.
+    connection count. Evaluations are cached, so the golden-ratio split
+    reuses one interior probe per iteration. Returns (best_candidate, cache).
+    """
+    cache = {}
+
+    def f(i):
+        if i not in cache:
+            cache[i] = evaluate(candidates[i])
+        return cache[i]
+
+    a, b = 0, len(candidates) - 1
+    while b - a > 2:
+        span = b - a
+        c = max(a + 1, min(a + int(round(span * GOLDEN_LOW)), b - 2))
+        d = max(c + 1, min(a + int(round(span * GOLDEN_HIGH)), b - 1))
+        if f(c) >= f(d):
+            b = d
+        else:
+            a = c
+    best = max(range(a, b + 1), key=f)
+    return candidates[best], {candidates[i]: value for i, value in cache.items()}
+
+def run_search(pool, args, config, run_name, launcher_file):
+    """Find the saturation point per core count with short probe runs.
+
+    For each (core, size), pipeline depth is searched first at the first
+    --clients value, then --clients at the best depth. Probes last
+    --probe-time seconds; a point whose p99 latency exceeds --latency-slo
+    scores zero. The winner is confirmed with one full-length run.
+    """
+    sweep_csv = args.sweep_csv or os.path.join(
+        args.results_dir, f'search_{args.operation}_{run_name}.csv')
+    table = SweepTable(sweep_csv, config['hostnames'])
+    log_info(f"Search results table: {sweep_csv}")
+    
+    pipelines = sorted(set(args.pipeline))
+    client_counts = sorted(set(args.clients))
+    rows = []
+    probes = 0
+    
+    def probe(core, size, pipe, clients):
+        nonlocal probes
+        if probes:
+            time.sleep(args.cooldown)
+        probes += 1
+        log_info(f"Probe {probes}: core={core} size={size} pipe={pipe} clients={clients} "
+                 f"({args.probe_time}s)")
+        row = measure_point(pool, args, config, run_name, launcher_file, core, size,
+                            pipe, clients, test_time=args.probe_time, status='probe')
+        table.write(row)
+        rows.append(row)
+        p99 = row.get('p99_latency')
+        if args.latency_slo is not None and p99 is not None and p99 > args.latency_slo:
+            log_warning(f"p99 {p99:.3f}ms exceeds SLO {args.latency_slo}ms")
+            return 0.0
+        return row['total_iops']
+    
+    confirmed = []
+    try:
+        for size in args.size:
+            for core in sorted(set(args.core)):
+                print_header(f"SATURATION SEARCH: core={core} size={size}")
+                best_pipe, _ = search_unimodal(
+                    pipelines, lambda pipe: probe(core, size, pipe, client_counts[0]))
+                best_clients, _ = search_unimodal(
+                    client_counts, lambda clients: probe(core, size, best_pipe, clients))
+                log_success(f"Knee for core={core} size={size}: pipe={best_pipe} "
+                            f"clients={best_clients}; confirming with a full run")
+                time.sleep(args.cooldown)
+                row = measure_point(pool, args, config, run_name, launcher_file, core,
+                                    size, best_pipe, best_clients, status='ok')
+                table.write(row)
+                rows.append(row)
+                confirmed.append(row)
+    finally:
+        table.close()
+        if args.summary_csv:
+            append_results_summary(args.summary_csv, confirmed)
+    log_info(f"Search used {probes} probe run(s) of {args.probe_time}s plus "
+             f"{len(confirmed)} confirmation run(s)")
+    return rows
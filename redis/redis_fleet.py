@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Redis Server Fleet Manager
+Starts many redis-server instances in parallel, each pinned to one core
+with its memory bound to that core's NUMA node (both read from sysfs, or
+from a topology file), refuses ports that are already taken, waits until
+every port answers PING, and tears the whole fleet down in bulk.
+Per-instance config overrides (io-threads, maxmemory, jemalloc-bg-thread,
+any redis.conf directive) are supported.
+
+Usage: python3 redis_fleet.py <start|stop|status> [options]
+Example: python3 redis_fleet.py start -n 288 --io-threads 1 --override 16001-16008:maxmemory=4gb
+         python3 redis_fleet.py stop
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import topology
+
+SYSFS_NODES = '/sys/devices/system/node'
+SYSFS_ONLINE = '/sys/devices/system/cpu/online'
+
+# pidfiles and logs of running instances, one pair per port
+DEFAULT_STATE_DIR = '/tmp/redis_fleet'
+
+
+class FleetError(RuntimeError):
+    """Raised when the fleet cannot be planned or started"""
+
+
+def read_sysfs(path):
+    with open(path) as f:
+        return f.read().strip()
+
+
+def numa_layout():
+    """Return {node: [online cpus]} from sysfs.
+
+    Machines without NUMA information are reported as a single node 0.
+    """
+    try:
+        online = set(topology.parse_cpu_list(read_sysfs(SYSFS_ONLINE)))
+    except OSError:
+        online = set(os.sched_getaffinity(0))
+    nodes = {}
+    try:
+        names = os.listdir(SYSFS_NODES)
+    except OSError:
+        names = []
+    for name in names:
+        if name.startswith('node') and name[4:].isdigit():
+            cpus = [cpu for cpu in topology.parse_cpu_list(
+                read_sysfs(os.path.join(SYSFS_NODES, name, 'cpulist'))) if cpu in online]
+            if cpus:
+                nodes[int(name[4:])] = cpus
+    return nodes or {0: sorted(online)}
+
+
+def plan_instances(count, port_base=16000, layout=None):
+    """Return [{port, cpu, node}] for count instances.
+
+    Instance j (1-based) listens on port_base + j and gets the j-th CPU,
+    node by node and ascending within a node, as topology.server_instances
+    does for a topology file.
+    """
+    layout = layout or numa_layout()
+    cpus = [(cpu, node) for node in sorted(layout) for cpu in layout[node]]
+    if count > len(cpus):
+        raise FleetError(f"{count} instances requested, only {len(cpus)} online cpus")
+    return [{'port': port_base + j, 'cpu': cpu, 'node': node}
+            for j, (cpu, node) in enumerate(cpus[:count], start=1)]
+
+
+def parse_override(value):
+    """Parse "PORTS:key=value" (PORTS as a cpulist-style port list)"""
+    try:
+        ports, setting = value.split(':', 1)
+        key, val = setting.split('=', 1)
+        return set(topology.parse_cpu_list(ports)), key, val
+    except (ValueError, topology.TopologyError):
+        raise argparse.ArgumentTypeError(f"invalid override '{value}', expected PORTS:key=value")
+
+
+def parse_setting(value):
+    """Parse "key=value" into a (key, value) pair"""
+    if '=' not in value:
+        raise argparse.ArgumentTypeError(f"invalid setting '{value}', expected key=value")
+    return tuple(value.split('=', 1))
+
+
+def instance_settings(port, settings, overrides):
+    """Effective redis config directives of one instance, overrides last"""
+    effective = dict(settings)
+    for ports, key, value in overrides:
+        if port in ports:
+            effective[key] = value
+    return effective
+
+
+def redis_command(instance, settings, redis_server, config_file, state_dir, numactl):
+    """argv for one daemonized, pinned redis-server instance"""
+    port = instance['port']
+    cmd = [redis_server]
+    if config_file:
+        cmd.append(config_file)
+    cmd += ['--port', str(port), '--daemonize', 'yes',
+            '--pidfile', os.path.join(state_dir, f'redis_{port}.pid'),
+            '--logfile', os.path.join(state_dir, f'redis_{port}.log'),
+            '--save', '', '--protected-mode', 'no']
+    for key, value in settings.items():
+        cmd += [f'--{key}', value]
+    if numactl:
+        cmd = [numactl, f"--physcpubind={instance['cpu']}", f"--membind={instance['node']}"] + cmd
+    return cmd
+
+
+async def _probe(port, host, deadline, interval):
+    """PING one port until it answers +PONG or the deadline passes"""
+    while True:
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1.0)
+            try:
+                writer.write(b'*1\r\n$4\r\nPING\r\n')
+                reply = await asyncio.wait_for(reader.readline(), 1.0)
+            finally:
+                writer.close()
+            if reply.startswith(b'+PONG'):
+                return True
+        except (OSError, asyncio.TimeoutError):
+            pass
+        if time.time() >= deadline:
+            return False
+        await asyncio.sleep(interval)
+
+
+async def _listening(port, host):
+    """True if something already accepts connections on the port"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), 1.0)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+async def _listening_all(ports, host):
+    results = await asyncio.gather(*(_listening(port, host) for port in ports))
+    return [port for port, busy in zip(ports, results) if busy]
+
+
+def ports_in_use(ports, host='127.0.0.1'):
+    """Return the ports that already accept connections, checked concurrently"""
+    return asyncio.run(_listening_all(list(ports), host))
+
+
+async def _probe_all(ports, host, timeout, interval):
+    deadline = time.time() + timeout
+    results = await asyncio.gather(*(_probe(port, host, deadline, interval) for port in ports))
+    return dict(zip(ports, results))
+
+
+def probe_ports(ports, host='127.0.0.1', timeout=30, interval=0.05):
+    """Probe every port concurrently; return {port: ready}"""
+    return asyncio.run(_probe_all(list(ports), host, timeout, interval))
+
+
+def start_fleet(instances, settings=None, overrides=(), redis_server='redis-server',
+                config_file=None, state_dir=DEFAULT_STATE_DIR, timeout=30, host='127.0.0.1'):
+    """Start all instances in parallel and wait until each answers PING.
+
+    Instances are pinned with numactl (core and memory node), or with
+    sched_setaffinity when numactl is missing. Raises FleetError if any
+    planned port is already in use: a stale server there would answer the
+    PING probe although the new, pinned instance never came up. Returns
+    {'ready': [ports], 'failed': [ports], 'elapsed': seconds}.
+    """
+    busy = ports_in_use([i['port'] for i in instances], host)
+    if busy:
+        raise FleetError(f"ports already in use: {busy[:16]}{' ...' if len(busy) > 16 else ''} "
+                         f"(stop the servers listening there first)")
+    os.makedirs(state_dir, exist_ok=True)
+    numactl = shutil.which('numactl')
+    started = time.time()
+    procs = []
+    for instance in instances:
+        effective = instance_settings(instance['port'], settings or {}, overrides)
+        cmd = redis_command(instance, effective, redis_server, config_file, state_dir, numactl)
+        preexec = None if numactl else (lambda cpu=instance['cpu']: os.sched_setaffinity(0, {cpu}))
+        procs.append(subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                      preexec_fn=preexec))
+    # The foreground processes exit once redis has daemonized
+    for proc in procs:
+        proc.wait()
+    ready = probe_ports([i['port'] for i in instances], host, timeout)
+    return {'ready': [port for port, ok in ready.items() if ok],
+            'failed': [port for port, ok in ready.items() if not ok],
+            'elapsed': time.time() - started}
+
+
+def fleet_pids(state_dir=DEFAULT_STATE_DIR):
+    """Return {port: pid} from the pidfiles in state_dir"""
+    pids = {}
+    try:
+        names = os.listdir(state_dir)
+    except OSError:
+        return pids
+    for name in names:
+        if name.startswith('redis_') and name.endswith('.pid'):
+            try:
+                pids[int(name[6:-4])] = int(read_sysfs(os.path.join(state_dir, name)))
+            except (OSError, ValueError):
+                continue
+    return pids
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def stop_fleet(state_dir=DEFAULT_STATE_DIR, timeout=10):
+    """SIGTERM every instance at once, SIGKILL the ones still alive after timeout.
+
+    Returns the number of instances stopped.
+    """
+    pids = fleet_pids(state_dir)
+    for pid in pids.values():
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.time() + timeout
+    remaining = [pid for pid in pids.values() if alive(pid)]
+    while remaining and time.time() < deadline:
+        time.sleep(0.05)
+        remaining = [pid for pid in remaining if alive(pid)]
+    for pid in remaining:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    for port in pids:
+        try:
+            os.remove(os.path.join(state_dir, f'redis_{port}.pid'))
+        except OSError:
+            pass
+    return len(pids)
+
+
+def settings_from_args(args):
+    """Global config directives from the convenience flags and --set"""
+    settings = {}
+    if args.io_threads is not None:
+        settings['io-threads'] = str(args.io_threads)
+    if args.maxmemory:
+        settings['maxmemory'] = args.maxmemory
+    if args.jemalloc_bg_thread:
+        settings['jemalloc-bg-thread'] = args.jemalloc_bg_thread
+    settings.update(args.set)
+    return settings
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Start, probe and stop a fleet of redis-server instances")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--state-dir', default=DEFAULT_STATE_DIR,
+                        help=f"Directory for pidfiles and logs (default: {DEFAULT_STATE_DIR})")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    start = sub.add_parser('start', parents=[common],
+                           help="Start instances and wait until they answer PING")
+    start.add_argument('-n', '--instances', type=int, required=True)
+    start.add_argument('--port-base', type=int, default=16000,
+                       help="Instance j listens on port-base + j (default: 16000)")
+    start.add_argument('--topology', default=None,
+                       help="Take ports, cores and NUMA nodes from a topology file instead of sysfs")
+    start.add_argument('--redis-server', default='redis-server', help="redis-server binary")
+    start.add_argument('--config', default=None, help="redis.conf passed to every instance")
+    start.add_argument('--io-threads', type=int, default=None)
+    start.add_argument('--maxmemory', default=None, help="e.g. 4gb")
+    start.add_argument('--jemalloc-bg-thread', choices=['yes', 'no'], default=None)
+    start.add_argument('--set', type=parse_setting, action='append', default=[],
+                       help="Extra redis.conf directive for every instance (key=value, repeatable)")
+    start.add_argument('--override', type=parse_override, action='append', default=[],
+                       help="Per-instance directive: PORTS:key=value, e.g. 16001-16008:io-threads=4")
+    start.add_argument('--timeout', type=float, default=30,
+                       help="Seconds to wait for every port to answer PING (default: 30)")
+    stop = sub.add_parser('stop', parents=[common],
+                          help="Stop every instance started from --state-dir")
+    stop.add_argument('--timeout', type=float, default=10,
+                      help="Seconds before stragglers get SIGKILL (default: 10)")
+    sub.add_parser('status', parents=[common], help="Report which instances answer PING")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    if args.cmd == 'stop':
+        print(f"Stopped {stop_fleet(args.state_dir, args.timeout)} redis-server instances")
+        return 0
+    if args.cmd == 'status':
+        pids = fleet_pids(args.state_dir)
+        ready = probe_ports(sorted(pids), timeout=1)
+        for port in sorted(pids):
+            print(f"{port} pid {pids[port]} {'ready' if ready[port] else 'DOWN'}")
+        return 0 if all(ready.values()) else 1
+
+    try:
+        if args.topology:
+            topo = topology.load_topology(args.topology)
+            instances = [{'port': i['port'], 'cpu': i['cpu'], 'node': i['node']}
+                         for i in topology.server_instances(topo, args.instances)]
+        else:
+            instances = plan_instances(args.instances, args.port_base)
+    except (FleetError, topology.TopologyError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    for instance in instances:
+        print(f"Starting Redis on core {instance['cpu']} (NUMA node {instance['node']}) "
+              f"using port {instance['port']}")
+    try:
+        result = start_fleet(instances, settings_from_args(args), args.override, args.redis_server,
+                             args.config, args.state_dir, args.timeout)
+    except FleetError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    print(f"{len(result['ready'])}/{len(instances)} instances ready in {result['elapsed']:.2f}s")
+    if result['failed']:
+        print(f"ERROR: no PING reply from ports {result['failed']} "
+              f"(see {args.state_dir}/redis_<port>.log)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Redis Keyspace Prefill
+Runs on a client host before a timed run: loads every key memtier will
+touch (--key-prefix, --key-minimum..--key-maximum) with --data-size byte
+values into each planned redis instance, so GETs measure hits instead of
+misses. One worker process per plan entry, pinned to the entry's CPU,
+streams pipelined SET batches; each instance is then checked with DBSIZE.
+Prints one JSON report on stdout. Standard library only, so it can be
+uploaded as-is.
+
+Usage: python3 redis_prefill.py --plan "CPU:SERVER:PORT ..." --data-size N [--key-maximum K]
+Example: python3 redis_prefill.py --plan "0:192.168.100.1:16001 1:192.168.100.1:16003" \
+             --data-size 64 --key-maximum 1000000
+"""
+
+import argparse
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import time
+
+from memtier_launcher import parse_plan
+
+# SET commands sent per write; two batches are kept in flight
+BATCH = 1000
+
+# Redis' DBSIZE reply is read from at most this many bytes
+REPLY_BYTES = 64
+
+
+def encode_set(key, value):
+    """RESP encoding of SET key value"""
+    return b'*3\r\n$3\r\nSET\r\n$%d\r\n%s\r\n$%d\r\n%s\r\n' % (len(key), key, len(value), value)
+
+
+def read_replies(sock, buf, count):
+    """Consume count simple-string replies from sock; returns (errors, leftover)"""
+    while buf.count(b'\r\n') < count:
+        data = sock.recv(1 << 16)
+        if not data:
+            raise ConnectionError("connection closed during prefill")
+        buf += data
+    end = 0
+    for _ in range(count):
+        end = buf.index(b'\r\n', end) + 2
+    replies, buf = buf[:end], buf[end:]
+    errors = 0 if replies == b'+OK\r\n' * count else count - replies.count(b'+OK\r\n')
+    return errors, buf
+
+
+def fill(entry, prefix, key_min, key_max, size, batch=BATCH):
+    """Fill one instance; runs in a worker process pinned to entry['cpu']"""
+    record = dict(entry)
+    try:
+        os.sched_setaffinity(0, {entry['cpu']})
+    except OSError:
+        pass
+    started = time.time()
+    value = b'x' * size
+    prefix = prefix.encode()
+    errors = 0
+    try:
+        with socket.create_connection((entry['server'], entry['port']), timeout=60) as sock:
+            buf = b''
+            in_flight = []
+            for first in range(key_min, key_max + 1, batch):
+                last = min(first + batch, key_max + 1)
+                sock.sendall(b''.join(encode_set(b'%s%d' % (prefix, key), value)
+                                      for key in range(first, last)))
+                in_flight.append(last - first)
+                if len(in_flight) > 1:
+                    failed, buf = read_replies(sock, buf, in_flight.pop(0))
+                    errors += failed
+            for count in in_flight:
+                failed, buf = read_replies(sock, buf, count)
+                errors += failed
+            sock.sendall(b'*1\r\n$6\r\nDBSIZE\r\n')
+            reply = buf
+            while not reply.endswith(b'\r\n'):
+                reply += sock.recv(REPLY_BYTES)
+            record['dbsize'] = int(reply[1:].strip())
+    except (OSError, ValueError) as e:
+        record['error'] = str(e)
+    record['keys'] = key_max - key_min + 1
+    record['set_errors'] = errors
+    record['seconds'] = time.time() - started
+    return record
+
+
+def run(plan, prefix, key_min, key_max, size):
+    """Prefill every plan entry in parallel and return the report"""
+    started = time.time()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max(1, len(plan))) as executor:
+        instances = list(executor.map(fill, plan, [prefix] * len(plan), [key_min] * len(plan),
+                                      [key_max] * len(plan), [size] * len(plan)))
+    keys = key_max - key_min + 1
+    short = [r for r in instances if r.get('dbsize', 0) < keys or r['set_errors']]
+    return {
+        'host': socket.gethostname(),
+        'keys': keys,
+        'data_size': size,
+        'seconds': time.time() - started,
+        'failed': len(short),
+        'instances': instances,
+    }
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Prefill redis instances with memtier's keyspace")
+    parser.add_argument('--plan', required=True, help='Whitespace-separated "cpu:server:port" entries')
+    parser.add_argument('--data-size', type=int, required=True, help="Value size in bytes")
+    parser.add_argument('--key-prefix', default='memtier-')
+    parser.add_argument('--key-minimum', type=int, default=0)
+    parser.add_argument('--key-maximum', type=int, default=10000000)
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    report = run(parse_plan(args.plan), args.key_prefix, args.key_minimum, args.key_maximum,
+                 args.data_size)
+    json.dump(report, sys.stdout)
+    sys.stdout.write('\n')
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
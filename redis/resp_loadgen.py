@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+RESP Load Generator
+Pure-Python, memtier-compatible fallback engine: one asyncio event loop
+driving --clients connections, each keeping --pipeline requests in flight
+over raw RESP as a sliding window, like memtier: every reply consumed sends
+the next request. Requests are encoded once up front and reused, and
+replies are counted in place, so the loop does no per-request encoding.
+Writes memtier-style --out-file / --json-out-file results (with an
+HDR-style latency histogram and per-second time series), so
+memtier_launcher.py and memtier_parser.py work with it unchanged. Run one
+process per core (memtier_launcher.py pins them) to scale out.
+Standard library only.
+
+Usage: python3 resp_loadgen.py -s HOST -p PORT [memtier options]
+Example: python3 resp_loadgen.py -s 127.0.0.1 -p 16001 --test-time=30 --clients=50 \
+             --pipeline=16 --ratio=1:1 --data-size=64 --out-file=log_16001
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import time
+
+# Request types, in memtier's table order (CMD is named after --command)
+SET, GET, CMD = 0, 1, 2
+TYPE_NAMES = {SET: 'Sets', GET: 'Gets', CMD: 'Cmds'}
+
+# Key index step between consecutive requests (a prime, so keys spread
+# over the whole --key-minimum..--key-maximum range)
+KEY_STRIDE = 104729
+
+# Pre-encoded requests per connection (the ring the sender cycles through)
+REQUEST_RING = 4096
+
+
+class Histogram:
+    """Log-linear latency histogram in microseconds (HDR-style).
+
+    Values below 2**SUB_BITS are exact; above that every power of two is
+    split into 2**(SUB_BITS - 1) buckets, so any value is kept within
+    ~1.6% of its true magnitude in a few thousand counters.
+    """
+
+    SUB_BITS = 7
+
+    def __init__(self):
+        self.counts = [0] * ((1 << self.SUB_BITS) + (40 - self.SUB_BITS) * (1 << (self.SUB_BITS - 1)))
+        self.total = 0
+        self.sum = 0
+
+    def index(self, value):
+        exponent = value.bit_length() - self.SUB_BITS
+        if exponent <= 0:
+            return value
+        half = 1 << (self.SUB_BITS - 1)
+        return (1 << self.SUB_BITS) + (exponent - 1) * half + (value >> exponent) - half
+
+    def upper(self, index):
+        """Highest value that lands in bucket index"""
+        if index < (1 << self.SUB_BITS):
+            return index
+        half = 1 << (self.SUB_BITS - 1)
+        exponent = (index - (1 << self.SUB_BITS)) // half + 1
+        mantissa = (index - (1 << self.SUB_BITS)) % half + half
+        return ((mantissa + 1) << exponent) - 1
+
+    def record(self, value, count=1):
+        self.counts[self.index(value)] += count
+        self.total += count
+        self.sum += value * count
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            if count:
+                self.counts[i] += count
+        self.total += other.total
+        self.sum += other.sum
+
+    def percentile(self, pct):
+        """Value (us) at percentile pct, or None if empty"""
+        if not self.total:
+            return None
+        target = self.total * pct / 100.0
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return self.upper(i)
+        return None
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def distribution(self):
+        """[(upper_ms, cumulative_percent)] for every non-empty bucket"""
+        rows = []
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count:
+                seen += count
+                rows.append((self.upper(i) / 1000.0, seen * 100.0 / self.total))
+        return rows
+
+
+def encode(*parts):
+    """RESP array of bulk strings"""
+    out = [b'*%d\r\n' % len(parts)]
+    for part in parts:
+        out.append(b'$%d\r\n%s\r\n' % (len(part), part))
+    return b''.join(out)
+
+
+def parse_ratio(value):
+    sets, gets = (int(x) for x in value.split(':'))
+    if sets < 0 or gets < 0 or sets + gets == 0:
+        raise argparse.ArgumentTypeError(f"invalid ratio '{value}'")
+    return sets, gets
+
+
+def build_requests(args, client_id):
+    """Pre-encode the ring of requests one client cycles through.
+
+    Returns (payloads, types): one encoded request and its type per ring
+    slot, sent in ring order (replies come back in the same order). The
+    ring holds at least args.pipeline requests.
+    """
+    size = max(REQUEST_RING, args.pipeline)
+    if args.command:
+        request = encode(*(part.encode() for part in args.command.split()))
+        return [request] * size, bytes([CMD]) * size
+    value = b'x' * args.data_size
+    sets, gets = args.ratio
+    pattern = [SET] * sets + [GET] * gets
+    key_range = max(1, args.key_maximum - args.key_minimum + 1)
+    payloads, types = [], []
+    for n in range(size):
+        kind = pattern[n % len(pattern)]
+        index = (client_id * size + n) * KEY_STRIDE % key_range
+        key = b'%s%d' % (args.key_prefix.encode(), args.key_minimum + index)
+        payloads.append(encode(b'SET', key, value) if kind == SET else encode(b'GET', key))
+        types.append(kind)
+    return payloads, bytes(types)
+
+
+class Stats:
+    """Per-type counters, histograms and the per-second series of one run"""
+
+    def __init__(self):
+        self.ops = {SET: 0, GET: 0, CMD: 0}
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.histograms = {SET: Histogram(), GET: Histogram(), CMD: Histogram()}
+        self.series = []  # [count, latency_sum_us, max_us] per second
+        self.start = None
+        self.duration = None
+
+    def second(self, now):
+        index = int(now - self.start)
+        while len(self.series) <= index:
+            self.series.append([0, 0, 0])
+        return self.series[index]
+
+
+class Client(asyncio.Protocol):
+    """One connection keeping pipeline requests in flight.
+
+    Each read event consumes the complete replies it holds and sends as
+    many new requests in one write, so the window stays full. Every
+    request is timestamped when it is sent.
+    """
+
+    def __init__(self, requests, pipeline, stats, done):
+        self.payloads, self.types = requests
+        self.pipeline = pipeline
+        self.stats = stats
+        self.done = done
+        self.transport = None
+        self.buffer = bytearray()
+        self.next = 0  # ring slot of the next request to send
+        self.oldest = 0  # ring slot of the oldest request awaiting its reply
+        self.sent_at = collections.deque()
+        self.running = True
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def send(self, count):
+        """Send the next count requests of the ring in one write"""
+        ring = len(self.payloads)
+        start, end = self.next, self.next + count
+        if end <= ring:
+            payload = b''.join(self.payloads[start:end])
+        else:
+            payload = b''.join(self.payloads[start:] + self.payloads[:end - ring])
+        self.next = end % ring
+        self.sent_at.extend([time.perf_counter()] * count)
+        self.transport.write(payload)
+        self.stats.bytes_out += len(payload)
+
+    def data_received(self, data):
+        stats = self.stats
+        stats.bytes_in += len(data)
+        buf = self.buffer
+        buf += data
+        now = time.perf_counter()
+        pos = 0
+        end_of_data = len(buf)
+        completed = 0
+        latency_sum = 0
+        latency_max = 0
+        types = self.types
+        ring = len(types)
+        sent_at = self.sent_at
+        while sent_at and pos < end_of_data:
+            line_end = buf.find(b'\r\n', pos)
+            if line_end < 0:
+                break
+            first = buf[pos]
+            if first == 36:  # '$' bulk string
+                length = int(buf[pos + 1:line_end])
+                if length < 0:
+                    stats.misses += 1
+                    pos = line_end + 2
+                else:
+                    if line_end + 4 + length > end_of_data:
+                        break
+                    stats.hits += 1
+                    pos = line_end + 4 + length
+            else:
+                if first == 45:  # '-' error
+                    stats.errors += 1
+                pos = line_end + 2
+            kind = types[self.oldest]
+            self.oldest = (self.oldest + 1) % ring
+            latency = int((now - sent_at.popleft()) * 1e6)
+            stats.ops[kind] += 1
+            stats.histograms[kind].record(latency)
+            latency_sum += latency
+            if latency > latency_max:
+                latency_max = latency
+            completed += 1
+        del buf[:pos]
+        if completed:
+            bucket = stats.second(time.time())
+            bucket[0] += completed
+            bucket[1] += latency_sum
+            if latency_max > bucket[2]:
+                bucket[2] = latency_max
+            if self.running:
+                self.send(completed)
+        if not (self.running or sent_at or self.done.done()):
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        self.running = False
+        if not self.done.done():
+            self.done.set_result(exc)
+
+
+async def run(args):
+    """Connect args.clients clients, run for args.test_time and return Stats"""
+    loop = asyncio.get_running_loop()
+    stats = Stats()
+    clients = []
+    for client_id in range(args.clients):
+        done = loop.create_future()
+        requests = build_requests(args, client_id)
+        _, client = await loop.create_connection(
+            lambda: Client(requests, args.pipeline, stats, done), args.server, args.port)
+        clients.append(client)
+
+    stats.start = time.time()
+    for client in clients:
+        client.send(args.pipeline)
+    await asyncio.sleep(args.test_time)
+    stats.duration = time.time() - stats.start
+    for client in clients:
+        client.running = False
+    # Let in-flight requests drain briefly; their replies still count
+    await asyncio.wait([c.done for c in clients], timeout=1.0)
+    for client in clients:
+        client.transport.close()
+    return stats
+
+
+def summarize(stats):
+    """memtier-style rows: {row_type: {column: value}} incl. Totals"""
+    duration = stats.duration or 1.0
+    rows = {}
+    totals = Histogram()
+    for kind, name in TYPE_NAMES.items():
+        if not stats.ops[kind]:
+            continue
+        histogram = stats.histograms[kind]
+        totals.merge(histogram)
+        rows[name] = row_metrics(histogram, stats.ops[kind] / duration)
+    rows['Totals'] = row_metrics(totals, sum(stats.ops.values()) / duration)
+    if stats.ops[GET]:
+        rows['Gets']['hits_sec'] = stats.hits / duration
+        rows['Gets']['misses_sec'] = stats.misses / duration
+        rows['Totals']['hits_sec'] = stats.hits / duration
+        rows['Totals']['misses_sec'] = stats.misses / duration
+    rows['Totals']['kb_sec'] = (stats.bytes_in + stats.bytes_out) / 1024.0 / duration
+    return rows, totals
+
+
+def row_metrics(histogram, ops_sec):
+    def ms(value):
+        return None if value is None else value / 1000.0
+    return {'ops_sec': ops_sec, 'hits_sec': None, 'misses_sec': None,
+            'avg_latency': ms(histogram.mean()), 'p50_latency': ms(histogram.percentile(50)),
+            'p99_latency': ms(histogram.percentile(99)), 'p999_latency': ms(histogram.percentile(99.9)),
+            'kb_sec': None}
+
+
+def format_text(rows, histograms):
+    """memtier --out-file style table followed by the latency distribution"""
+    def cell(value, digits):
+        return '---' if value is None else f"{value:.{digits}f}"
+    lines = ['', 'ALL STATS', '=' * 124,
+             f"{'Type':<8}{'Ops/sec':>12}{'Hits/sec':>13}{'Misses/sec':>13}{'Avg. Latency':>16}"
+             f"{'p50 Latency':>16}{'p99 Latency':>16}{'p99.9 Latency':>16}{'KB/sec':>13} ",
+             '-' * 124]
+    for name, row in rows.items():
+        lines.append(f"{name:<8}{cell(row['ops_sec'], 2):>12}{cell(row['hits_sec'], 2):>13}"
+                     f"{cell(row['misses_sec'], 2):>13}{cell(row['avg_latency'], 5):>16}"
+                     f"{cell(row['p50_latency'], 5):>16}{cell(row['p99_latency'], 5):>16}"
+                     f"{cell(row['p999_latency'], 5):>16}{cell(row['kb_sec'], 2):>13} ")
+    lines += ['', '', 'Request Latency Distribution',
+              f"{'Type':<8}{'<= msec':>12}{'Percent':>16}", '-' * 72]
+    for kind, name in TYPE_NAMES.items():
+        for upper_ms, percent in histograms[kind].distribution() if histograms[kind].total else []:
+            lines.append(f"{name.upper()[:-1]:<8}{upper_ms:>12.3f}{percent:>16.3f}")
+    return '\n'.join(lines) + '\n'
+
+
+def format_json(rows, totals, stats):
+    """memtier --json-out-file style document (ALL STATS, Runtime)"""
+    def section(row, histogram=None):
+        out = {'Ops/sec': row['ops_sec'], 'Hits/sec': row['hits_sec'] or 0.0,
+               'Misses/sec': row['misses_sec'] or 0.0, 'Average Latency': row['avg_latency'],
+               'KB/sec': row['kb_sec'] or 0.0,
+               'Percentile Latencies': {'p50.00': row['p50_latency'], 'p99.00': row['p99_latency'],
+                                        'p99.90': row['p999_latency']}}
+        if histogram is not None:
+            out['Histogram'] = [{'<=msec': upper, 'percent': percent}
+                                for upper, percent in histogram.distribution()]
+        return out
+    all_stats = {name: section(row) for name, row in rows.items() if name != 'Totals'}
+    all_stats['Totals'] = section(rows['Totals'], totals)
+    all_stats['Totals']['Time-Serie'] = {
+        str(i): {'Count': count, 'Average Latency': (total / count / 1000.0) if count else None,
+                 'Max Latency': peak / 1000.0}
+        for i, (count, total, peak) in enumerate(stats.series)}
+    all_stats['Runtime'] = {'Start time': int(stats.start * 1000),
+                            'Finish time': int((stats.start + stats.duration) * 1000),
+                            'Total duration': int(stats.duration * 1000),
+                            'Time unit': 'MILLISECONDS'}
+    return {'configuration': {'engine': 'resp_loadgen'}, 'ALL STATS': all_stats}
+
+
+def parse_args(argv=None):
+    """Parse memtier-compatible command line arguments"""
+    parser = argparse.ArgumentParser(description="Pure-Python RESP load generator "
+                                                 "(memtier_benchmark-compatible options)")
+    parser.add_argument('-s', '--server', default='127.0.0.1')
+    parser.add_argument('-p', '--port', type=int, default=6379)
+    parser.add_argument('--test-time', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--pipeline', type=int, default=1)
+    parser.add_argument('--data-size', type=int, default=32)
+    parser.add_argument('--ratio', type=parse_ratio, default=(1, 10))
+    parser.add_argument('--command', default=None, help="Run this command instead of SET/GET")
+    parser.add_argument('--key-prefix', default='memtier-')
+    parser.add_argument('--key-minimum', type=int, default=0)
+    parser.add_argument('--key-maximum', type=int, default=10000000)
+    parser.add_argument('--out-file', default=None)
+    parser.add_argument('--json-out-file', default=None)
+    # memtier options that do not apply to a single event loop are accepted and ignored
+    args, ignored = parser.parse_known_args(argv)
+    args.ignored = ignored
+    if args.command:
+        TYPE_NAMES[CMD] = args.command.split()[0].capitalize() + 's'
+    return args
+
+
+def main(argv=None):
+    """Main execution function"""
+    args = parse_args(argv)
+    try:
+        stats = asyncio.run(run(args))
+    except OSError as e:
+        print(f"ERROR: cannot connect to {args.server}:{args.port}: {e}", file=sys.stderr)
+        return 1
+    rows, totals = summarize(stats)
+    text = format_text(rows, stats.histograms)
+    if args.out_file:
+        with open(args.out_file, 'w') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    if args.json_out_file:
+        with open(args.json_out_file, 'w') as f:
+            json.dump(format_json(rows, totals, stats), f)
+    return 0 if sum(stats.ops.values()) > stats.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
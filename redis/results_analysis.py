@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Benchmark Results Analysis
+Reads the tables written by scaling.sh / benchmark_unified.py
+(output_<name>.csv sweep tables and the results_summary.csv history).
+
+scaling: per (operation, size, pipe) series, per-core throughput, speedup
+and scaling efficiency against the smallest core count, fitted Amdahl and
+USL (Universal Scalability Law) coefficients, and the first core count
+whose efficiency falls below a threshold.
+
+regress: compares one run of results_summary.csv against the earlier runs
+of the same (operation, core, size, pipe) points. Each point gets a noise
+band from the history (median +/- k robust sigmas) and a one-sided
+Mann-Whitney test (or a bootstrap CI of the median difference); points
+that drop significantly and by more than --min-drop are regressions, and
+the exit status is 1 if there are any.
+
+Usage: python3 results_analysis.py scaling <csv> [...] [--threshold 0.8] [--json]
+       python3 results_analysis.py regress <results_summary.csv> [--run-name NAME] [--alpha 0.05]
+Example: python3 results_analysis.py scaling results/Scale1/output_Scale1.csv
+         python3 results_analysis.py regress results_summary.csv --run-name Nightly_2026-10-18
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import statistics
+import sys
+
+# Point key columns of both table formats
+KEY_COLUMNS = ('operation', 'size', 'pipe')
+
+# Iterations of the golden-section search over the USL lambda
+FIT_ITERATIONS = 60
+
+# Regression keys: one benchmark point across runs
+POINT_COLUMNS = ('operation', 'core', 'size', 'pipe')
+
+# MAD -> standard deviation for normally distributed noise
+MAD_SCALE = 1.4826
+
+# Largest sample sizes for the exact Mann-Whitney distribution
+EXACT_LIMIT = 30
+
+# Resamples of the bootstrap test (fixed seed: reruns give the same verdict)
+BOOTSTRAP_SAMPLES = 4000
+BOOTSTRAP_SEED = 1
+
+
+def load_rows(paths, run_names=None):
+    """Read completed points from sweep tables / results_summary.csv files.
+
+    Rows with a status other than 'ok' (failed points, search probes) and
+    rows of other runs when run_names is given are dropped. core, size and
+    pipe become ints, total_iops a float.
+    """
+    rows = []
+    for path in paths:
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                if row.get('status', 'ok') != 'ok' or not row.get('total_iops'):
+                    continue
+                if run_names and row.get('run_name') not in run_names:
+                    continue
+                try:
+                    row.update({'core': int(row['core']), 'size': int(row['size']),
+                                'pipe': int(row['pipe']), 'total_iops': float(row['total_iops'])})
+                except (KeyError, ValueError):
+                    continue
+                rows.append(row)
+    return rows
+
+
+def group_series(rows):
+    """Return {(operation, size, pipe): {core: [total_iops, ...]}}"""
+    series = {}
+    for row in rows:
+        key = tuple(row[column] for column in KEY_COLUMNS)
+        series.setdefault(key, {}).setdefault(row['core'], []).append(row['total_iops'])
+    return series
+
+
+def _contention_fit(points, lam, coherency):
+    """Least-squares (sigma, kappa) >= 0 for a fixed lambda.
+
+    Linearizes USL as n*lam/X - 1 = sigma*(n-1) + kappa*n*(n-1); with
+    coherency False kappa is 0 (Amdahl).
+    """
+    xs = [(n - 1, n * (n - 1)) for n, _ in points]
+    ys = [n * lam / x - 1 for n, x in points]
+    saa = sum(a * a for a, _ in xs)
+    if not saa:
+        return 0.0, 0.0
+    say = sum(a * y for (a, _), y in zip(xs, ys))
+    if coherency:
+        sbb = sum(b * b for _, b in xs)
+        sab = sum(a * b for a, b in xs)
+        sby = sum(b * y for (_, b), y in zip(xs, ys))
+        det = saa * sbb - sab * sab
+        if det > 0:
+            sigma = (say * sbb - sby * sab) / det
+            kappa = (saa * sby - sab * say) / det
+            if sigma >= 0 and kappa >= 0:
+                return sigma, kappa
+            if sigma < 0:
+                return 0.0, max(0.0, sby / sbb)
+    return max(0.0, say / saa), 0.0
+
+
+def usl_model(n, lam, sigma, kappa):
+    """USL throughput at n cores (kappa = 0 is Amdahl's law)"""
+    return lam * n / (1 + sigma * (n - 1) + kappa * n * (n - 1))
+
+
+def fit_scaling(points, coherency=True):
+    """Fit USL (or Amdahl with coherency False) to [(cores, throughput)].
+
+    lambda (single-core throughput) is found by golden-section search,
+    with sigma/kappa solved in closed form for each candidate. Returns
+    {'lambda', 'sigma', 'kappa', 'r2', 'peak_cores'} or None with fewer
+    than three core counts.
+    """
+    if len(points) < 3:
+        return None
+
+    def sse(lam):
+        sigma, kappa = _contention_fit(points, lam, coherency)
+        return sum((x - usl_model(n, lam, sigma, kappa)) ** 2 for n, x in points)
+
+    per_core = max(x / n for n, x in points)
+    lo, hi = per_core * 0.5, per_core * 4
+    ratio = (5 ** 0.5 - 1) / 2
+    for _ in range(FIT_ITERATIONS):
+        a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        if sse(a) <= sse(b):
+            hi = b
+        else:
+            lo = a
+    lam = (lo + hi) / 2
+    sigma, kappa = _contention_fit(points, lam, coherency)
+    mean = statistics.fmean(x for _, x in points)
+    total = sum((x - mean) ** 2 for _, x in points)
+    return {
+        'lambda': lam,
+        'sigma': sigma,
+        'kappa': kappa,
+        'r2': 1 - sse(lam) / total if total else 1.0,
+        'peak_cores': ((1 - sigma) / kappa) ** 0.5 if kappa > 0 and sigma < 1 else None,
+    }
+
+
+def analyze_series(by_core, threshold):
+    """Scaling metrics of one series ({core: [total_iops, ...]})"""
+    cores = sorted(by_core)
+    iops = {core: statistics.median(by_core[core]) for core in cores}
+    base = cores[0]
+    base_per_core = iops[base] / base
+    points = []
+    knee = None
+    for core in cores:
+        per_core = iops[core] / core
+        efficiency = per_core / base_per_core if base_per_core else 0.0
+        if knee is None and efficiency < threshold:
+            knee = core
+        points.append({'core': core, 'runs': len(by_core[core]), 'total_iops': iops[core],
+                       'per_core_iops': per_core, 'speedup': iops[core] / iops[base] if iops[base] else 0.0,
+                       'efficiency': efficiency})
+    measured = [(core, iops[core]) for core in cores]
+    return {
+        'base_core': base,
+        'points': points,
+        'efficiency_knee': knee,
+        'amdahl': fit_scaling(measured, coherency=False),
+        'usl': fit_scaling(measured),
+    }
+
+
+def scaling_report(rows, threshold):
+    """Return [{'operation', 'size', 'pipe', ...analyze_series}] per series"""
+    report = []
+    for key, by_core in sorted(group_series(rows).items()):
+        report.append({**dict(zip(KEY_COLUMNS, key)), **analyze_series(by_core, threshold)})
+    return report
+
+
+def print_scaling(report, threshold):
+    """Human-readable scaling tables"""
+    for series in report:
+        print(f"\n{series['operation']} size={series['size']} pipe={series['pipe']} "
+              f"(efficiency vs {series['base_core']} cores)")
+        print(f"  {'Cores':>6} {'Runs':>5} {'Total IOPS':>16} {'IOPS/Core':>12} "
+              f"{'Speedup':>8} {'Efficiency':>10}")
+        for p in series['points']:
+            flag = '  <' if p['efficiency'] < threshold else ''
+            print(f"  {p['core']:>6} {p['runs']:>5} {p['total_iops']:>16,.2f} "
+                  f"{p['per_core_iops']:>12,.2f} {p['speedup']:>8.2f} {p['efficiency'] * 100:>9.1f}%{flag}")
+        amdahl, usl = series['amdahl'], series['usl']
+        if amdahl:
+            bound = f"max speedup {1 / amdahl['sigma']:,.0f}x" if amdahl['sigma'] else "no speedup bound"
+            print(f"  Amdahl: serial fraction {amdahl['sigma']:.5f} ({bound}), R^2 {amdahl['r2']:.4f}")
+        if usl:
+            peak = f", peak at ~{usl['peak_cores']:.0f} cores" if usl['peak_cores'] else ''
+            print(f"  USL:    sigma {usl['sigma']:.5f}, kappa {usl['kappa']:.2e}{peak}, "
+                  f"R^2 {usl['r2']:.4f}")
+        if not amdahl:
+            print("  (fewer than 3 core counts: no fit)")
+        if series['efficiency_knee'] is not None:
+            print(f"  Efficiency drops below {threshold * 100:.0f}% at {series['efficiency_knee']} cores")
+        else:
+            print(f"  Efficiency stays at or above {threshold * 100:.0f}%")
+
+
+def noise_band(values, k):
+    """(median, low, high): median +/- k robust sigmas (MAD-based)"""
+    center = statistics.median(values)
+    sigma = MAD_SCALE * statistics.median(abs(v - center) for v in values)
+    return center, center - k * sigma, center + k * sigma
+
+
+def _mann_whitney_exact(u, m, n):
+    """P(U <= u) for sample sizes m, n without ties"""
+    # counts[j][x]: orderings of i first-sample and j second-sample values with U = x
+    counts = [[1] for _ in range(n + 1)]
+    for _ in range(m):
+        updated = [[1]]
+        for j in range(1, n + 1):
+            left, below = updated[j - 1], counts[j]
+            row = [0] * max(len(left), len(below) + j)
+            for x, c in enumerate(left):
+                row[x] += c
+            for x, c in enumerate(below):
+                row[x + j] += c
+            updated.append(row)
+        counts = updated
+    dist = counts[n]
+    return sum(dist[:int(u) + 1]) / math.comb(m + n, m)
+
+
+def mann_whitney_less(sample, baseline):
+    """One-sided Mann-Whitney p-value for "sample is stochastically smaller".
+
+    Exact for small samples without ties, normal approximation with tie
+    and continuity correction otherwise.
+    """
+    m, n = len(sample), len(baseline)
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in sample for y in baseline)
+    values = sorted(sample + baseline)
+    ties = [values.count(v) for v in set(values)]
+    if max(ties) == 1 and m + n <= EXACT_LIMIT:
+        return _mann_whitney_exact(u, m, n)
+    total = m + n
+    variance = m * n / 12.0 * ((total + 1) - sum(t ** 3 - t for t in ties) / (total * (total - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u + 0.5 - m * n / 2.0) / math.sqrt(variance)
+    return 0.5 * math.erfc(-z / math.sqrt(2))
+
+
+def bootstrap_less(sample, baseline, alpha):
+    """Bootstrap one-sided test on the relative median difference.
+
+    Returns (p, upper) where upper is the 1 - alpha bound of
+    (median(sample) - median(baseline)) / median(baseline) and p the
+    share of resamples in which sample's median is not below baseline's.
+    """
+    rng = random.Random(BOOTSTRAP_SEED)
+    diffs = []
+    for _ in range(BOOTSTRAP_SAMPLES):
+        new = statistics.median(rng.choices(sample, k=len(sample)))
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        diffs.append((new - base) / base if base else 0.0)
+    diffs.sort()
+    upper = diffs[min(len(diffs) - 1, int((1 - alpha) * len(diffs)))]
+    return sum(1 for d in diffs if d >= 0) / len(diffs), upper
+
+
+def select_runs(rows, run_name=None, baseline_runs=None):
+    """Split rows into (run name, candidate rows, baseline rows).
+
+    The candidate defaults to the last run appended to the history; the
+    baseline is every earlier-appearing other run, or the baseline_runs
+    most recent of them.
+    """
+    order = list(dict.fromkeys(row.get('run_name') for row in rows))
+    if run_name is None:
+        run_name = rows[-1].get('run_name')
+    others = [name for name in order if name != run_name]
+    if run_name in order:
+        others = [name for name in order[:order.index(run_name)] if name != run_name]
+    if baseline_runs:
+        others = others[-baseline_runs:]
+    others = set(others)
+    return (run_name, [row for row in rows if row.get('run_name') == run_name],
+            [row for row in rows if row.get('run_name') in others])
+
+
+def regression_report(rows, run_name=None, baseline_runs=None, alpha=0.05, min_drop=0.02,
+                      band_k=3.0, test='mannwhitney'):
+    """Compare one run against the history, point by point.
+
+    Returns (run name, [per-point dicts]); each point's 'verdict' is
+    'regression', 'improved', 'ok' or 'no-history' (fewer than two
+    baseline samples).
+    """
+    name, candidate, baseline = select_runs(rows, run_name, baseline_runs)
+    history = {}
+    for row in baseline:
+        history.setdefault(tuple(row[c] for c in POINT_COLUMNS), []).append(row['total_iops'])
+    current = {}
+    for row in candidate:
+        current.setdefault(tuple(row[c] for c in POINT_COLUMNS), []).append(row['total_iops'])
+
+    points = []
+    for key, values in sorted(current.items()):
+        point = {**dict(zip(POINT_COLUMNS, key)), 'samples': len(values),
+                 'median': statistics.median(values)}
+        base = history.get(key, [])
+        point['baseline_samples'] = len(base)
+        if len(base) < 2:
+            point['verdict'] = 'no-history'
+            points.append(point)
+            continue
+        center, low, high = noise_band(base, band_k)
+        change = (point['median'] - center) / center if center else 0.0
+        point.update({'baseline_median': center, 'band_low': low, 'band_high': high,
+                      'change': change})
+        if test == 'bootstrap':
+            point['p_value'], point['change_upper'] = bootstrap_less(values, base, alpha)
+        else:
+            point['p_value'] = mann_whitney_less(values, base)
+        # A single new sample cannot reach significance against a short
+        # history on ranks alone; it must then also leave the noise band
+        significant = point['p_value'] < alpha or (len(values) == 1 and point['median'] < low)
+        if significant and -change >= min_drop:
+            point['verdict'] = 'regression'
+        elif point['median'] > high and change >= min_drop:
+            point['verdict'] = 'improved'
+        else:
+            point['verdict'] = 'ok'
+        points.append(point)
+    return name, points
+
+
+def print_regressions(name, points):
+    """Human-readable regression table"""
+    print(f"\nRun {name} vs history")
+    print(f"  {'Operation':<10} {'Core':>5} {'Size':>6} {'Pipe':>5} {'N':>3} {'Median':>16} "
+          f"{'Hist N':>6} {'Hist Median':>16} {'Noise Band':>29} {'Change':>8} {'p':>7}  Verdict")
+    for p in points:
+        line = (f"  {p['operation']:<10} {p['core']:>5} {p['size']:>6} {p['pipe']:>5} "
+                f"{p['samples']:>3} {p['median']:>16,.2f} {p['baseline_samples']:>6}")
+        if p['verdict'] != 'no-history':
+            band = f"{p['band_low']:,.0f} - {p['band_high']:,.0f}"
+            line += (f" {p['baseline_median']:>16,.2f} {band:>29} {p['change'] * 100:>7.1f}% "
+                     f"{p['p_value']:>7.4f}")
+        else:
+            line += f" {'':>16} {'':>29} {'':>8} {'':>7}"
+        print(f"{line}  {p['verdict'].upper() if p['verdict'] == 'regression' else p['verdict']}")
+    regressions = sum(1 for p in points if p['verdict'] == 'regression')
+    print(f"\n  {regressions} regression(s) in {len(points)} points")
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Analyze benchmark results tables")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    scaling = sub.add_parser('scaling', help="Core-scaling efficiency and Amdahl/USL fits")
+    scaling.add_argument('paths', nargs='+', help="output_<name>.csv or results_summary.csv files")
+    scaling.add_argument('--run-name', action='append', default=None,
+                         help="Only use rows of this run (repeatable)")
+    scaling.add_argument('--threshold', type=float, default=0.8,
+                         help="Flag the first core count with efficiency below this (default: 0.8)")
+    scaling.add_argument('--json', action='store_true', help="Print the report as JSON")
+    regress = sub.add_parser('regress', help="Detect throughput regressions against earlier runs")
+    regress.add_argument('paths', nargs='+', help="results_summary.csv history file(s)")
+    regress.add_argument('--run-name', default=None,
+                         help="Run to check (default: the last run in the history)")
+    regress.add_argument('--baseline-runs', type=int, default=None,
+                         help="Compare against only the N most recent earlier runs")
+    regress.add_argument('--test', choices=['mannwhitney', 'bootstrap'], default='mannwhitney',
+                         help="Significance test (default: mannwhitney)")
+    regress.add_argument('--alpha', type=float, default=0.05, help="Significance level (default: 0.05)")
+    regress.add_argument('--min-drop', type=float, default=2.0,
+                         help="Smallest drop in percent reported as a regression (default: 2)")
+    regress.add_argument('--band', type=float, default=3.0,
+                         help="Noise band half-width in robust sigmas (default: 3)")
+    regress.add_argument('--json', action='store_true', help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    try:
+        rows = load_rows(args.paths, args.run_name if args.cmd == 'scaling' else None)
+    except OSError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if not rows:
+        print("ERROR: no completed points found", file=sys.stderr)
+        return 1
+
+    if args.cmd == 'regress':
+        name, points = regression_report(rows, args.run_name, args.baseline_runs, args.alpha,
+                                         args.min_drop / 100.0, args.band, args.test)
+        if not points:
+            print(f"ERROR: no completed points for run {name}", file=sys.stderr)
+            return 1
+        if args.json:
+            print(json.dumps({'run_name': name, 'points': points}, indent=2))
+        else:
+            print_regressions(name, points)
+        return 1 if any(p['verdict'] == 'regression' for p in points) else 0
+
+    report = scaling_report(rows, args.threshold)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_scaling(report, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
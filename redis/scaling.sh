@@ -1,12 +1,28 @@
 #!/bin/bash
 
 # Unified Scaling Script for Redis Benchmarks
-# Usage: ./scaling_unified.sh <operation> <name>
+# Usage: ./scaling.sh <operation> <name>
 # Operations: ping, read, write, readwrite
+#
+# The whole core/size/pipeline grid runs inside one benchmark_unified.py
+# process (one SSH connection per client, scripts uploaded once). Override
+# the grid with CORES/SIZES/PIPES (comma lists or start:stop:step ranges),
+# and set PLATEAU_GAIN (percent) to stop a core sweep once it flattens out.
+# REPEAT=N runs every point up to N times in randomized order and reports
+# medians with confidence intervals. EFFICIENCY_THRESHOLD (default 0.8) sets where the scaling report flags
+# the efficiency knee. REGRESSION_CHECK=1 compares the run against the
+# earlier runs in results_summary.csv and exits 1 on a regression.
+#   CORES=16:288:16 PIPES=1,8 PLATEAU_GAIN=2 ./scaling.sh ping Core_Scaling_Test_Run1
 
 OPERATION=$1
 NAME=$2
 
+CORES="${CORES:-288}"
+SIZES="${SIZES:-64}"
+PIPES="${PIPES:-1}"
+PLATEAU_GAIN="${PLATEAU_GAIN:-}"
+REPEAT="${REPEAT:-}"
+
 if [ -z "$OPERATION" ] || [ -z "$NAME" ]; then
     echo "Usage: $0 <operation> <name>"
     echo "Operations: ping, read, write, readwrite"
@@ -31,158 +47,61 @@ RESULTS_DIR="results/${NAME}"
 mkdir -p "$RESULTS_DIR"
 echo "Results will be saved to: $RESULTS_DIR"
 
-# Loop through pipeline depths (modify as needed)
-for pipe in 1
-do
-    # Loop through core counts (modify as needed)
-    #for core in $(seq 16 16 144);
-    for core in 288
-    do 
-        # Loop through data sizes (modify as needed)
-        for size in 64
-        do
-            echo ""
-            echo "=============================================="
-            echo "Running: Operation=$OPERATION Pipe=$pipe Core=$core Size=$size"
-            echo "=============================================="
-            echo ""
-            
-            # Run the unified benchmark
-            echo "python3 benchmark_unified.py -o ${OPERATION} -p ${pipe} -c ${core} -s ${size}"
-            
-            # Output file path in results directory
-            OUTPUT_FILE="${RESULTS_DIR}/Redis_${OPERATION}_pipe-${pipe}_size-${size}_core-${core}_${NAME}.txt"
-            
-            # Direct execution with output saved to results directory
-            python3 benchmark_unified.py -o ${OPERATION} -p ${pipe} -c ${core} -s ${size} 2>&1 | tee "$OUTPUT_FILE"
-            
-            # Option 2: With TMC wrapper (uncomment if using TMC)
-            # python3 /root/tmc/tmc.py -u -Z metrics2 -n -x ntamraka -d /root/tmc/redis \
-            #     -G Redis_study_scale -r 30 -t 60 -i redis \
-            #     -a ${OPERATION}_pipe-${pipe}_size-${size}_core-${core}_${NAME} \
-            #     -c "python3 benchmark_unified.py -o ${OPERATION} -p ${pipe} -c ${core} -s ${size} 2>&1 | tee Redis_${OPERATION}_pipe-${pipe}_size-${size}_core-${core}_${NAME}.txt"
-            
-            sleep 5
-        done
-    done
-done
+# Output CSV file in results directory, and the global history
+OUTPUT_CSV="${RESULTS_DIR}/output_${NAME}.csv"
+GLOBAL_SUMMARY="results_summary.csv"
+LOG_FILE="${RESULTS_DIR}/Redis_${OPERATION}_${NAME}.txt"
+
+SWEEP_ARGS=(-o "$OPERATION" -c "$CORES" -s "$SIZES" -p "$PIPES"
+            --run-name "$NAME"
+            --results-dir "$RESULTS_DIR"
+            --sweep-csv "$OUTPUT_CSV"
+            --summary-csv "$GLOBAL_SUMMARY")
+if [ -n "$PLATEAU_GAIN" ]; then
+    SWEEP_ARGS+=(--plateau-gain "$PLATEAU_GAIN")
+fi
+if [ -n "$REPEAT" ]; then
+    SWEEP_ARGS+=(--repeat "$REPEAT")
+fi
 
 echo ""
 echo "=============================================="
-echo "Benchmarking completed!"
+echo "Running: Operation=$OPERATION Pipes=$PIPES Cores=$CORES Sizes=$SIZES"
 echo "=============================================="
-
-# Aggregate results into CSV
 echo ""
-echo "=============================================="
-echo "Aggregating Results..."
-echo "=============================================="
-
-# Determine number of clients based on operation
-case "$OPERATION" in
-    ping)
-        NUM_CLIENTS=6
-        ;;
-    read|write|readwrite)
-        NUM_CLIENTS=2
-        ;;
-esac
-
-echo "Operation: $OPERATION has $NUM_CLIENTS clients"
-
-# Output CSV file in results directory
-OUTPUT_CSV="${RESULTS_DIR}/output_${NAME}.csv"
 
-# Build dynamic header based on number of clients
-HEADER="file,core,size,pipe"
-for i in $(seq 1 $NUM_CLIENTS); do
-    HEADER="${HEADER},client${i}_iops"
-done
-HEADER="${HEADER},total_iops,average_iops"
-echo "$HEADER" > "$OUTPUT_CSV"
+echo "python3 benchmark_unified.py ${SWEEP_ARGS[*]}"
+python3 benchmark_unified.py "${SWEEP_ARGS[@]}" 2>&1 | tee "$LOG_FILE"
 
-# Loop through each file matching the pattern in results directory
-for FILE in ${RESULTS_DIR}/Redis_${OPERATION}_pipe-*_${NAME}.txt ; do
-    if [ -f "$FILE" ]; then
-        # Extract core, size, and pipe from the filename
-        BASENAME=$(basename "$FILE")
-        CORE=$(echo "$BASENAME" | grep -oP 'core-\K\d+')
-        SIZE=$(echo "$BASENAME" | grep -oP 'size-\K\d+')
-        PIPE=$(echo "$BASENAME" | grep -oP 'pipe-\K\d+')
+# Option 2: With TMC wrapper (uncomment if using TMC)
+# python3 /root/tmc/tmc.py -u -Z metrics2 -n -x ntamraka -d /root/tmc/redis \
+#     -G Redis_study_scale -r 30 -t 60 -i redis \
+#     -a ${OPERATION}_${NAME} \
+#     -c "python3 benchmark_unified.py ${SWEEP_ARGS[*]} 2>&1 | tee $LOG_FILE"
 
-        # Extract all IOPS outputs from the file
-        OUTPUTS=$(grep "total number of IOPS for" "$FILE" | awk '{print $NF}')
-        
-        # Read outputs into array
-        OUTPUT_ARRAY=()
-        TOTAL=0
-        COUNT=0
-        while IFS= read -r line; do
-            if [ -n "$line" ]; then
-                OUTPUT_ARRAY+=("$line")
-                TOTAL=$(echo "scale=2; $TOTAL + $line" | bc)
-                COUNT=$((COUNT + 1))
-            fi
-        done <<< "$OUTPUTS"
-        
-        # Ensure we have exactly NUM_CLIENTS outputs (pad with 0 if missing)
-        while [ ${#OUTPUT_ARRAY[@]} -lt $NUM_CLIENTS ]; do
-            OUTPUT_ARRAY+=(0)
-        done
-        
-        # Calculate average
-        if [ $COUNT -gt 0 ]; then
-            AVERAGE=$(echo "scale=2; $TOTAL / $COUNT" | bc)
-        else
-            AVERAGE=0
-        fi
-
-        # Build CSV row
-        CSV_ROW="$FILE,$CORE,$SIZE,$PIPE"
-        for output in "${OUTPUT_ARRAY[@]}"; do
-            CSV_ROW="${CSV_ROW},${output}"
-        done
-        CSV_ROW="${CSV_ROW},${TOTAL},${AVERAGE}"
-        
-        # Write the results to the CSV file
-        echo "$CSV_ROW" >> "$OUTPUT_CSV"
-        
-        echo "Processed: $FILE -> Total IOPS: $TOTAL (Avg per client: $AVERAGE)"
-    fi
-done
+echo ""
+echo "=============================================="
+echo "Benchmarking completed!"
+echo "=============================================="
 
 if [ -f "$OUTPUT_CSV" ]; then
     echo ""
     echo "=============================================="
     echo "Results Summary (${OUTPUT_CSV}):"
     echo "=============================================="
-    cat "$OUTPUT_CSV"
+    column -t -s ',' "$OUTPUT_CSV"
     echo ""
     echo "CSV file created: $OUTPUT_CSV"
+    echo ""
+    echo "=============================================="
+    echo "Scaling Efficiency (${OUTPUT_CSV}):"
+    echo "=============================================="
+    python3 results_analysis.py scaling "$OUTPUT_CSV" --threshold "${EFFICIENCY_THRESHOLD:-0.8}"
 else
-    echo "No results files found matching pattern: Redis_${OPERATION}_pipe-*_${NAME}.txt"
-fi
-
-# Append to global results summary
-GLOBAL_SUMMARY="results_summary.csv"
-TIMESTAMP=$(date '+%Y-%m-%d %H:%M:%S')
-
-# Create global summary file with header if it doesn't exist
-if [ ! -f "$GLOBAL_SUMMARY" ]; then
-    echo "timestamp,run_name,operation,core,size,pipe,total_iops,avg_iops_per_client" > "$GLOBAL_SUMMARY"
-    echo "Global results summary created: $GLOBAL_SUMMARY"
+    echo "No results table produced: $OUTPUT_CSV"
 fi
 
-# Append results from this run to global summary
-if [ -f "$OUTPUT_CSV" ]; then
-    # Skip header line and append data with timestamp and run info
-    tail -n +2 "$OUTPUT_CSV" | while IFS=',' read -r file core size pipe rest; do
-        # Extract total and average from the end of the line
-        # The format is: file,core,size,pipe,client1,...,clientN,total,average
-        TOTAL=$(echo "$rest" | awk -F',' '{print $(NF-1)}')
-        AVERAGE=$(echo "$rest" | awk -F',' '{print $NF}')
-        echo "$TIMESTAMP,$NAME,$OPERATION,$core,$size,$pipe,$TOTAL,$AVERAGE" >> "$GLOBAL_SUMMARY"
-    done
+if [ -f "$GLOBAL_SUMMARY" ]; then
     echo ""
     echo "=============================================="
     echo "Global summary updated: $GLOBAL_SUMMARY"
@@ -190,4 +109,12 @@ if [ -f "$OUTPUT_CSV" ]; then
     echo ""
     echo "Recent entries:"
     tail -5 "$GLOBAL_SUMMARY" | column -t -s ','
+
+    if [ -n "$REGRESSION_CHECK" ]; then
+        echo ""
+        echo "=============================================="
+        echo "Regression Check (${NAME} vs history):"
+        echo "=============================================="
+        python3 results_analysis.py regress "$GLOBAL_SUMMARY" --run-name "$NAME" || exit 1
+    fi
 fi
@@ -1,30 +1,23 @@
 #!/bin/bash
 
-pcpu=$1  # Number of instances (each bound to a different physical core)
-x=0      # Start binding from core
-
-for j in $(seq 1 ${pcpu}); do
-    portp=$((16000 + j))  # Redis port
-
-    # Determine NUMA node based on core number
-    if [ "$x" -ge 0 ] && [ "$x" -le 288 ]; then
-        node=0
-    elif [ "$x" -ge 64 ] && [ "$x" -le 127 ]; then
-        node=1
-    elif [ "$x" -ge 128 ] && [ "$x" -le 191 ]; then
-        node=2
-    else
-        echo "CPU core $x is out of supported range (0–143). Stopping..."
-        break
-    fi
-
-    echo "Starting Redis on core $x (NUMA node $node) using port $portp"
-
-    numactl --physcpubind=$x --membind=$node \
-        redis-server --save "" --protected-mode no --port $portp --daemonize yes &
-
-    let x+=1
-done
-
-
+# Usage: ./server_script.sh <instances> [topology.json] [redis_fleet.py start options]
+# Starts the instances through redis_fleet.py: cores and NUMA nodes come
+# from sysfs (or from the topology file), all instances start in parallel,
+# and the script returns once every port answers PING.
+# Stop them with: python3 redis_fleet.py stop
 
+pcpu=$1  # Number of instances (each bound to a different physical core)
+TOPOLOGY=$2
+
+if [ -z "$pcpu" ]; then
+    echo "Usage: $0 <instances> [topology.json] [redis_fleet.py start options]"
+    exit 1
+fi
+shift
+ARGS=()
+if [ -n "$TOPOLOGY" ] && [ "${TOPOLOGY#-}" = "$TOPOLOGY" ]; then
+    ARGS+=(--topology "$TOPOLOGY")
+    shift
+fi
+
+exec python3 "$(dirname "$0")/redis_fleet.py" start -n "$pcpu" "${ARGS[@]}" "$@"
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Redis Benchmark Topology
+Loads and validates a JSON inventory of the Redis server and client hosts
+(NUMA nodes, CPU lists, NICs, port ranges) and computes a NUMA-aligned
+mapping of memtier client cores to redis-server ports.
+
+Usage: python3 topology.py <topology.json> <command> [options]
+Example: python3 topology.py topology.example.json plan -o ping -n 288
+"""
+
+import argparse
+import json
+import sys
+
+
+class TopologyError(ValueError):
+    """Raised when a topology file is malformed or inconsistent"""
+
+
+def parse_cpu_list(value):
+    """Parse a Linux cpulist string ("0-3,8,10-11") or a list of ints"""
+    if isinstance(value, list):
+        return [int(cpu) for cpu in value]
+    cpus = []
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                start, end = (int(x) for x in part.split('-'))
+                cpus.extend(range(start, end + 1))
+            else:
+                cpus.append(int(part))
+        except ValueError:
+            raise TopologyError(f"invalid cpu list '{value}'")
+    return cpus
+
+
+def _require(mapping, key, where):
+    if key not in mapping:
+        raise TopologyError(f"{where}: missing required key '{key}'")
+    return mapping[key]
+
+
+def _validate_nodes(machine, where):
+    """Normalize a machine's numa_nodes, returning {node_id: node_dict}"""
+    nodes = {}
+    seen_cpus = set()
+    for i, node in enumerate(_require(machine, 'numa_nodes', where)):
+        node_where = f"{where}.numa_nodes[{i}]"
+        node_id = int(_require(node, 'node', node_where))
+        if node_id in nodes:
+            raise TopologyError(f"{node_where}: duplicate NUMA node {node_id}")
+        cpus = parse_cpu_list(_require(node, 'cpus', node_where))
+        if not cpus:
+            raise TopologyError(f"{node_where}: empty cpu list")
+        overlap = seen_cpus.intersection(cpus)
+        if overlap:
+            raise TopologyError(f"{node_where}: cpus {sorted(overlap)[:8]} listed on more than one node")
+        seen_cpus.update(cpus)
+        nodes[node_id] = {'node': node_id, 'cpus': cpus}
+    if not nodes:
+        raise TopologyError(f"{where}: at least one NUMA node is required")
+    return nodes
+
+
+def load_topology(path):
+    """Load and validate a topology file.
+
+    Returns the parsed dict with CPU lists expanded and NUMA nodes keyed by
+    node id. Raises TopologyError describing the first problem found.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise TopologyError(f"cannot read topology {path}: {e}")
+    return validate_topology(data)
+
+
+def validate_topology(data):
+    """Validate an already-parsed topology dict (see load_topology)"""
+    server = _require(data, 'server', 'topology')
+    _require(server, 'host', 'server')
+    server['port_base'] = int(server.get('port_base', 16000))
+    server['nodes'] = _validate_nodes(server, 'server')
+    server_cpus = server_cpu_order(server)
+    max_instances = int(server.get('max_instances', len(server_cpus)))
+    if max_instances > len(server_cpus):
+        raise TopologyError(f"server: max_instances {max_instances} exceeds "
+                            f"{len(server_cpus)} listed cpus")
+    server['max_instances'] = max_instances
+    if server['port_base'] + max_instances > 65535:
+        raise TopologyError("server: port range exceeds 65535")
+    nics = {}
+    for i, nic in enumerate(server.get('nics', [])):
+        where = f"server.nics[{i}]"
+        name = _require(nic, 'name', where)
+        node_id = int(_require(nic, 'node', where))
+        if node_id not in server['nodes']:
+            raise TopologyError(f"{where}: NIC {name} on unknown NUMA node {node_id}")
+        nics[name] = {'name': name, 'ip': _require(nic, 'ip', where), 'node': node_id,
+                      'queues': parse_cpu_list(nic.get('queues', []))}
+    server['nics'] = nics
+
+    clients = {}
+    for i, client in enumerate(_require(data, 'clients', 'topology')):
+        where = f"clients[{i}]"
+        host = _require(client, 'host', where)
+        if host in clients:
+            raise TopologyError(f"{where}: duplicate client host {host}")
+        client['nodes'] = _validate_nodes(client, where)
+        clients[host] = client
+    data['clients'] = clients
+
+    for name, op in _require(data, 'operations', 'topology').items():
+        where = f"operations.{name}"
+        for host in _require(op, 'clients', where):
+            if host not in clients:
+                raise TopologyError(f"{where}: unknown client host {host}")
+        for nic in op.setdefault('nics', []):
+            if nic not in server['nics']:
+                raise TopologyError(f"{where}: unknown server NIC {nic}")
+        _require(op, 'test_time', where)
+        op.setdefault('command', None)
+        op.setdefault('ratio', None)
+    return data
+
+
+def server_cpu_order(server):
+    """Server CPUs in instance order: node by node, ascending within a node"""
+    return [cpu for node_id in sorted(server['nodes']) for cpu in server['nodes'][node_id]['cpus']]
+
+
+def server_instances(topology, count, operation=None):
+    """Return [{port, cpu, node, ip, nic, queue}] for the first count redis instances.
+
+    Instance j (1-based) listens on port_base + j, matching server_script.sh,
+    and is pinned to the j-th server CPU in server_cpu_order(). When an
+    operation is given, each instance is reached through that operation's
+    server NIC on the same NUMA node (any of its NICs if none is local), and
+    gets one of that NIC's RX queues round-robin.
+    """
+    server = topology['server']
+    if count > server['max_instances']:
+        raise TopologyError(f"{count} instances requested, server has {server['max_instances']}")
+    op_nics = [server['nics'][name] for name in
+               (topology['operations'][operation]['nics'] if operation else [])]
+    node_of = {cpu: node_id for node_id, node in server['nodes'].items() for cpu in node['cpus']}
+    used = {}
+    instances = []
+    for j, cpu in enumerate(server_cpu_order(server)[:count], start=1):
+        node_id = node_of[cpu]
+        local = [nic for nic in op_nics if nic['node'] == node_id] or op_nics
+        inst = {'port': server['port_base'] + j, 'cpu': cpu, 'node': node_id,
+                'ip': server.get('ip', server['host']), 'nic': None, 'queue': None}
+        if local:
+            # Spread this node's instances over its NICs, then over their queues
+            n = used.get(node_id, 0)
+            used[node_id] = n + 1
+            nic = local[n % len(local)]
+            inst['ip'] = nic['ip']
+            inst['nic'] = nic['name']
+            if nic['queues']:
+                inst['queue'] = nic['queues'][(n // len(local)) % len(nic['queues'])]
+        instances.append(inst)
+    return instances
+
+
+def plan_clients(topology, operation, count):
+    """Map count redis instances onto memtier client cores, NUMA-aligned.
+
+    Each instance on server node N is driven from a core on node N of some
+    client, through the server IP attached to node N. Hosts are interleaved
+    round-robin so load stays balanced across clients. Only when node N has
+    no free client cores left does an instance spill to another node; those
+    pairings are counted as cross-NUMA.
+
+    Returns {'hosts': {host: [{cpu, node, ip, port}]}, 'cross_numa': n}.
+    """
+    op = topology['operations'].get(operation)
+    if op is None:
+        raise TopologyError(f"operation '{operation}' not defined in topology")
+    hosts = op['clients']
+
+    # Free client slots per NUMA node, interleaved across hosts
+    free = {}
+    for node_id in sorted({n for host in hosts for n in topology['clients'][host]['nodes']}):
+        per_host = [[(host, cpu) for cpu in topology['clients'][host]['nodes'][node_id]['cpus']]
+                    for host in hosts if node_id in topology['clients'][host]['nodes']]
+        free[node_id] = [slot for group in _interleave(per_host) for slot in group]
+
+    total = sum(len(slots) for slots in free.values())
+    if count > total:
+        raise TopologyError(f"{count} instances requested, clients of '{operation}' "
+                            f"only have {total} cores")
+
+    plan = {host: [] for host in hosts}
+    cross_numa = 0
+    pending = []
+    for inst in server_instances(topology, count, operation):
+        slots = free.get(inst['node'])
+        if slots:
+            host, cpu = slots.pop(0)
+            plan[host].append({'cpu': cpu, 'node': inst['node'], 'ip': inst['ip'],
+                               'port': inst['port']})
+        else:
+            pending.append(inst)
+    for inst in pending:
+        node_id = max(free, key=lambda n: len(free[n]))
+        host, cpu = free[node_id].pop(0)
+        plan[host].append({'cpu': cpu, 'node': node_id, 'ip': inst['ip'], 'port': inst['port']})
+        cross_numa += 1
+    return {'hosts': plan, 'cross_numa': cross_numa}
+
+
+def _interleave(groups):
+    """Round-robin over lists: [[a1, a2], [b1]] -> [(a1, b1), (a2,)]"""
+    rows = []
+    for i in range(max((len(g) for g in groups), default=0)):
+        rows.append(tuple(g[i] for g in groups if i < len(g)))
+    return rows
+
+
+def operation_config(topology, operation):
+    """Build a BENCHMARK_CONFIGS-style dict for an operation.
+
+    startports/seq_step reproduce the legacy interleaved layout for callers
+    that do not use plan_clients().
+    """
+    op = topology['operations'][operation]
+    port_base = topology['server']['port_base']
+    return {
+        'hostnames': list(op['clients']),
+        'startports': [str(port_base + i) for i in range(len(op['clients']))],
+        'seq_step': len(op['clients']),
+        'redis_server': topology['server'].get('ip', topology['server']['host']),
+        'test_time': op['test_time'],
+        'command': op['command'],
+        'ratio': op['ratio'],
+    }
+
+
+def flow_rules(topology, operation, count):
+    """ethtool ntuple rules steering each redis port to a NUMA-local RX queue"""
+    rules = []
+    for inst in server_instances(topology, count, operation):
+        if inst['nic'] and inst['queue'] is not None:
+            rules.append(f"ethtool -N {inst['nic']} flow-type tcp4 dst-port {inst['port']} "
+                         f"action {inst['queue']}")
+    return rules
+
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Validate a topology and print instance mappings")
+    parser.add_argument('topology', help="Topology JSON file")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('validate', help="Validate the topology file")
+    server = sub.add_parser('server-plan', help="Print 'port cpu node' per redis instance")
+    server.add_argument('-n', '--instances', type=int, required=True)
+    plan = sub.add_parser('plan', help="Print the client core to server port mapping")
+    plan.add_argument('-o', '--operation', required=True)
+    plan.add_argument('-n', '--instances', type=int, required=True)
+    rules = sub.add_parser('flow-rules', help="Print ethtool ntuple rules for the server NICs")
+    rules.add_argument('-o', '--operation', required=True)
+    rules.add_argument('-n', '--instances', type=int, required=True)
+    return parser.parse_args()
+
+
+def main():
+    """Main execution function"""
+    args = parse_args()
+    try:
+        topology = load_topology(args.topology)
+        if args.cmd == 'validate':
+            print(f"OK: {len(topology['clients'])} clients, "
+                  f"{topology['server']['max_instances']} server instances, "
+                  f"operations: {', '.join(topology['operations'])}")
+        elif args.cmd == 'server-plan':
+            for inst in server_instances(topology, args.instances):
+                print(f"{inst['port']} {inst['cpu']} {inst['node']}")
+        elif args.cmd == 'plan':
+            plan = plan_clients(topology, args.operation, args.instances)
+            for host, entries in plan['hosts'].items():
+                print(f"{host}: {len(entries)} instances")
+                for e in entries:
+                    print(f"  cpu {e['cpu']:>4} (node {e['node']}) -> {e['ip']}:{e['port']}")
+            print(f"cross-NUMA pairings: {plan['cross_numa']}")
+        elif args.cmd == 'flow-rules':
+            print('\n'.join(flow_rules(topology, args.operation, args.instances)))
+    except TopologyError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())